@@ -88,6 +88,7 @@ setup(
         # eg:
         #   'rst': ['docutils>=0.11'],
         #   ':python_version=="2.6"': ['argparse'],
+        'asgi': ['uvicorn>=0.23.0'],
     },
     tests_require=[
         'coverage>=5.5',
@@ -4,8 +4,12 @@ KERIA
 keria.app.agenting module
 
 """
+import datetime
+import itertools
 import json
 import os
+import time
+from collections import OrderedDict
 from dataclasses import asdict
 from urllib.parse import urlparse, urljoin
 
@@ -19,7 +23,7 @@ from hio.base import doing
 from hio.core import http, tcp
 from hio.help import decking
 from keri.app import configing, keeping, habbing, storing, signaling, oobiing, agenting, \
-    forwarding, querying, connecting, grouping
+    querying, connecting, grouping
 from keri.app.grouping import Counselor
 from keri.app.keeping import Algos
 from keri.core import coring, parsing, eventing, routing, serdering
@@ -32,11 +36,12 @@ from keria.end import ending
 from keri.help import helping, ogler, nowIso8601
 from keri.peer import exchanging
 from keri.vdr import verifying
-from keri.vdr.credentialing import Regery, sendArtifacts
+from keri.vdr.credentialing import Regery
 from keri.vdr.eventing import Tevery
 from keri.app import challenging
 
-from . import aiding, notifying, indirecting, credentialing, ipexing, delegating
+from . import aiding, notifying, indirecting, credentialing, ipexing, delegating, streaming, serving, sharding
+from . import forwarding as keriaforwarding
 from . import grouping as keriagrouping
 from ..peer import exchanging as keriaexchanging
 from .specing import AgentSpecResource
@@ -49,46 +54,47 @@ logger = ogler.getLogger()
 
 
 def setup(name, bran, adminPort, bootPort, base='', httpPort=None, configFile=None, configDir=None,
-          keypath=None, certpath=None, cafilepath=None):
+          keypath=None, certpath=None, cafilepath=None, maxAgents=None, idleTimeout=None, opTTL=None, maxOps=None,
+          asgi=False, asgiLimit=None, shard=None):
     """ Set up an ahab in Signify mode """
 
-    agency = Agency(name=name, base=base, bran=bran, configFile=configFile, configDir=configDir)
+    agency = Agency(name=name, base=base, bran=bran, configFile=configFile, configDir=configDir,
+                    maxAgents=maxAgents, idleTimeout=idleTimeout, opTTL=opTTL, maxOps=maxOps, shard=shard)
     bootApp = falcon.App(middleware=falcon.CORSMiddleware(
         allow_origins='*', allow_credentials='*',
         expose_headers=['cesr-attachment', 'cesr-date', 'content-type', 'signature', 'signature-input',
                         'signify-resource', 'signify-timestamp']))
 
-    bootServer = createHttpServer(bootPort, bootApp, keypath, certpath, cafilepath)
-    if not bootServer.reopen():
-        raise RuntimeError(f"cannot create boot http server on port {bootPort}")
-    bootServerDoer = http.ServerDoer(server=bootServer)
+    bootServerDoer = createServerDoer("boot", bootPort, bootApp, keypath, certpath, cafilepath, asgi=asgi,
+                                      limit=asgiLimit)
+    bootApp.add_error_handler(sharding.ShardError, sharding.onShardError)
     bootEnd = BootEnd(agency)
     bootApp.add_route("/boot", bootEnd)
     bootApp.add_route("/health", HealthEnd())
 
-    # Create Authenticater for verifying signatures on all requests
-    authn = Authenticater(agency=agency)
+    # Create Authenticater for verifying signatures on all requests, rejecting requests with stale timestamps
+    authn = Authenticater(agency=agency, skew=Authenticater.DefaultSkew)
 
     app = falcon.App(middleware=falcon.CORSMiddleware(
         allow_origins='*', allow_credentials='*',
         expose_headers=['cesr-attachment', 'cesr-date', 'content-type', 'signature', 'signature-input',
-                        'signify-resource', 'signify-timestamp']))
+                        'signify-resource', 'signify-timestamp', 'continuation-token']))
     if os.getenv("KERI_AGENT_CORS", "false").lower() in ("true", "1"):
         app.add_middleware(middleware=httping.HandleCORS())
     app.add_middleware(authing.SignatureValidationComponent(agency=agency, authn=authn, allowed=["/agent"]))
+    app.add_error_handler(sharding.ShardError, sharding.onShardError)
     app.req_options.media_handlers.update(media.Handlers())
     app.resp_options.media_handlers.update(media.Handlers())
 
-    adminServer = createHttpServer(adminPort, app, keypath, certpath, cafilepath)
-    if not adminServer.reopen():
-        raise RuntimeError(f"cannot create admin http server on port {adminPort}")
-    adminServerDoer = http.ServerDoer(server=adminServer)
+    adminServerDoer = createServerDoer("admin", adminPort, app, keypath, certpath, cafilepath, asgi=asgi,
+                                       limit=asgiLimit)
 
     doers = [agency, bootServerDoer, adminServerDoer]
     loadEnds(app=app)
     aidEnd = aiding.loadEnds(app=app, agency=agency, authn=authn)
     credentialing.loadEnds(app=app, identifierResource=aidEnd)
     notifying.loadEnds(app=app)
+    streaming.loadEnds(app=app)
     keriagrouping.loadEnds(app=app)
     keriaexchanging.loadEnds(app=app)
     ipexing.loadEnds(app=app)
@@ -100,14 +106,13 @@ def setup(name, bran, adminPort, bootPort, base='', httpPort=None, configFile=No
                             'signify-resource', 'signify-timestamp']))
         happ.req_options.media_handlers.update(media.Handlers())
         happ.resp_options.media_handlers.update(media.Handlers())
+        happ.add_error_handler(sharding.ShardError, sharding.onShardError)
 
         ending.loadEnds(agency=agency, app=happ)
         indirecting.loadEnds(agency=agency, app=happ)
 
-        server = createHttpServer(httpPort, happ, keypath, certpath, cafilepath)
-        if not server.reopen():
-            raise RuntimeError(f"cannot create local http server on port {httpPort}")
-        httpServerDoer = http.ServerDoer(server=server)
+        httpServerDoer = createServerDoer("local", httpPort, happ, keypath, certpath, cafilepath, asgi=asgi,
+                                          limit=asgiLimit)
         doers.append(httpServerDoer)
 
         swagsink = http.serving.StaticSink(staticDirPath="./static")
@@ -121,6 +126,32 @@ def setup(name, bran, adminPort, bootPort, base='', httpPort=None, configFile=No
     return doers
 
 
+def createServerDoer(name, port, app, keypath=None, certpath=None, cafilepath=None, asgi=False, limit=None):
+    """
+    Create the Doer serving app on port with either the hio HTTP server or an ASGI server
+
+    Parameters:
+        name (str)         : name of the server for error messages
+        port (int)         : port to listen on
+        app (falcon.App)   : application to serve
+        keypath (string)   : the file path to the TLS private key
+        certpath (string)  : the file path to the TLS signed certificate (public key)
+        cafilepath (string): the file path to the TLS CA certificate chain file
+        asgi (bool)        : True means serve with uvicorn from within the hio scheduler
+        limit (int)        : maximum number of concurrent ASGI connections, None means no limit
+    Returns:
+        Doer: server doer
+    """
+    if asgi:
+        return serving.AsgiServerDoer(app=app, port=port, keypath=keypath, certpath=certpath, cafilepath=cafilepath,
+                                      limit=limit)
+
+    server = createHttpServer(port, app, keypath, certpath, cafilepath)
+    if not server.reopen():
+        raise RuntimeError(f"cannot create {name} http server on port {port}")
+    return http.ServerDoer(server=server)
+
+
 def createHttpServer(port, app, keypath=None, certpath=None, cafilepath=None):
     """
     Create an HTTP or HTTPS server depending on whether TLS key material is present
@@ -149,16 +180,43 @@ def createHttpServer(port, app, keypath=None, certpath=None, cafilepath=None):
 class Agency(doing.DoDoer):
     """
     Agency
-    
+
+    Manages the Agents of all tenants of this KERIA instance.  Agents are loaded from disk on first use and kept
+    resident in .agents ordered from least to most recently used.  When configured with .maxAgents or .idleTimeout,
+    least recently used or idle Agents are hibernated: their doers are removed from the Agency and all of their
+    databases are closed.  A hibernated Agent is transparently reloaded from disk on the next `get` or `lookup`.
+
+    Attributes:
+        agents (dict): resident Agents keyed by controller AID, least recently used first
+        touched (dict): datetime of last access of each resident Agent keyed by controller AID
+        maxAgents (int): maximum number of resident Agents, None means no limit
+        idleTimeout (float): seconds an Agent can go unused before being hibernated, None means never
+        opTTL (float): seconds completed long running operations of each Agent are retained, None means until deleted
+        maxOps (int): maximum number of long running operations retained by each Agent, None means no limit
+        shard (int): index of the shard of this Agency in a multi-process Agency, None means not sharded
+        ring (HashRing): consistent hash ring of the current number of shards when sharded
+        next (HashRing): consistent hash ring of the number of shards a handoff in progress moves to, if any
+        pool (ClientPool): keep-alive HTTP connections shared by all Agents for delivering messages
+
     """
 
-    def __init__(self, name, bran, base="", configFile=None, configDir=None, adb=None, temp=False):
+    def __init__(self, name, bran, base="", configFile=None, configDir=None, adb=None, temp=False, maxAgents=None,
+                 idleTimeout=None, opTTL=None, maxOps=None, shard=None):
         self.name = name
         self.base = base
         self.bran = bran
         self.temp = temp
         self.configFile = configFile
         self.configDir = configDir
+        self.maxAgents = maxAgents
+        self.idleTimeout = idleTimeout
+        self.opTTL = opTTL
+        self.maxOps = maxOps
+        self.shard = shard
+        self.ring = None
+        self.next = None
+        self.leaving = set()  # controller AIDs of resident Agents owned by another shard
+        self.handoff = False  # True means the handoff to .next is acknowledged once no Agent is leaving
         self.cf = None
         if self.configFile is not None:  # Load config file if creating database
             self.cf = configing.Configer(name=self.configFile,
@@ -169,9 +227,17 @@ class Agency(doing.DoDoer):
                                          clear=False)
 
         self.agents = dict()
+        self.touched = dict()
 
         self.adb = adb if adb is not None else basing.AgencyBaser(name="TheAgency", base=base, reopen=True, temp=temp)
-        super(Agency, self).__init__(doers=[], always=True)
+        self.pool = keriaforwarding.ClientPool()
+        super(Agency, self).__init__(doers=[self.pool], always=True)
+
+    def recur(self, tyme, deeds=None):
+        """ Hibernate idle Agents and Agents of other shards before running all resident Agents once """
+        self.sweep()
+        self.rebalance()
+        return super(Agency, self).recur(tyme, deeds)
 
     def create(self, caid):
         ks = keeping.Keeper(name=caid,
@@ -214,8 +280,10 @@ class Agency(doing.DoDoer):
 
         # add agent to cache
         self.agents[caid] = agent
+        self.touched[caid] = helping.nowUTC()
         # start agents processes running
         self.extend([agent])
+        self.evict(keep=caid)
 
         return agent
 
@@ -226,10 +294,18 @@ class Agency(doing.DoDoer):
         agent.hby.close(clear=True)
 
         del self.agents[agent.caid]
+        self.touched.pop(agent.caid, None)
 
     def get(self, caid):
+        if not self.owns(caid):
+            raise sharding.ShardError(f"agent for controller {caid} is served by another shard")
+
         if caid in self.agents:
-            return self.agents[caid]
+            # Move to the most recently used end of the cache
+            agent = self.agents.pop(caid)
+            self.agents[caid] = agent
+            self.touched[caid] = helping.nowUTC()
+            return agent
 
         aaid = self.adb.agnt.get(keys=(caid,))
         if aaid is None:
@@ -250,7 +326,9 @@ class Agency(doing.DoDoer):
         agent = Agent(hby=agentHby, rgy=agentRgy, agentHab=agentHab, agency=self, caid=caid)
 
         self.agents[caid] = agent
+        self.touched[caid] = helping.nowUTC()
         self.extend([agent])
+        self.evict(keep=caid)
 
         return agent
 
@@ -272,6 +350,119 @@ class Agency(doing.DoDoer):
     def incept(self, caid, pre):
         self.adb.aids.pin(keys=(pre,), val=coring.Prefixer(qb64=caid))
 
+    def hibernate(self, caid):
+        """ Stop all processing of the Agent for caid and close its databases
+
+        The Agent remains registered in the Agency database and will be reloaded from disk on next access.
+
+        Parameters:
+            caid (str): qb64 controller AID of the Agent to hibernate
+
+        Returns:
+            bool: True means the Agent was resident and has been hibernated
+
+        """
+        if caid not in self.agents:
+            return False
+
+        agent = self.agents.pop(caid)
+        self.touched.pop(caid, None)
+
+        self.remove([agent])
+        agent.hibernate()
+
+        logger.info("Agent %s for controller %s hibernated", agent.pre, caid)
+        return True
+
+    def evict(self, keep=None):
+        """ Hibernate least recently used Agents until no more than .maxAgents are resident
+
+        Parameters:
+            keep (str): qb64 controller AID of an Agent that must remain resident
+
+        """
+        if self.temp or self.maxAgents is None:  # temporary databases can not be reloaded from disk
+            return
+
+        for caid in list(self.agents.keys()):
+            if len(self.agents) <= self.maxAgents:
+                break
+
+            if caid == keep or self.agents[caid].busy:  # keep Agents with work in flight or open response bodies
+                continue
+
+            self.hibernate(caid)
+
+    def sweep(self):
+        """ Hibernate all Agents that have not been accessed for more than .idleTimeout seconds """
+        if self.temp or self.idleTimeout is None:
+            return
+
+        dtnow = helping.nowUTC()
+        idle = datetime.timedelta(seconds=self.idleTimeout)
+        for caid in list(self.agents.keys()):  # least recently used first so stop at first active Agent
+            if self.agents[caid].busy:  # work in flight or an open response body is continued use of the Agent
+                self.agents[caid] = self.agents.pop(caid)
+                self.touched[caid] = dtnow
+                continue
+
+            touched = self.touched.get(caid)
+            if touched is not None and (dtnow - touched) <= idle:
+                break
+
+            self.hibernate(caid)
+
+    def owns(self, caid):
+        """ Returns True if the Agent of controller caid is served by this shard
+
+        While a handoff is in progress an Agent moving to another shard is owned by neither shard, so it can not be
+        reloaded here after it was hibernated for the handoff and before the routes are switched over.
+
+        """
+        if self.shard is None:
+            return True
+
+        return all(ring.shard(caid) == self.shard for ring in (self.ring, self.next) if ring is not None)
+
+    def rebalance(self):
+        """ Hibernate the Agents owned by another shard when the number of shards changes or a handoff starts
+
+        Agents moving away are no longer served but are only hibernated once they are idle, so queued work, doers in
+        flight and open response bodies are finished first.  Once every Agent moving away is hibernated the handoff
+        is acknowledged in the Agency database so the supervisor can switch the routes over to the new number of
+        shards.
+
+        """
+        if self.temp or self.shard is None:
+            return
+
+        count = sharding.shardCount(self.adb)
+        if count is None:
+            return
+
+        nxt = sharding.nextShardCount(self.adb)
+        ring = self.ring if self.ring is not None and self.ring.shards == count else sharding.HashRing(count)
+        if nxt is None or nxt == count:
+            upcoming = None
+        else:
+            upcoming = self.next if self.next is not None and self.next.shards == nxt else sharding.HashRing(nxt)
+
+        if ring is not self.ring or upcoming is not self.next:
+            self.ring, self.next = ring, upcoming
+            self.leaving = set(caid for caid in self.agents.keys() if not self.owns(caid))
+            self.handoff = self.next is not None
+
+        for caid in list(self.leaving):
+            if caid in self.agents and self.agents[caid].busy:
+                continue
+
+            self.hibernate(caid)
+            self.leaving.remove(caid)
+
+        if self.handoff and not self.leaving:
+            sharding.acknowledge(self.adb, self.shard, self.next.shards)
+            self.handoff = False
+
 
 class Agent(doing.DoDoer):
     """
@@ -280,6 +471,8 @@ class Agent(doing.DoDoer):
 
     """
 
+    Lease = 5.0  # seconds a response body is considered read from after its last read
+
     def __init__(self, hby, rgy, agentHab, agency, caid, **opts):
         self.hby = hby
         self.rgy = rgy
@@ -287,7 +480,7 @@ class Agent(doing.DoDoer):
         self.agency = agency
         self.caid = caid
 
-        self.swain = delegating.Sealer(hby=hby, proxy=agentHab)
+        self.swain = delegating.Sealer(hby=hby, proxy=agentHab, pool=agency.pool)
         self.counselor = Counselor(hby=hby, swain=self.swain, proxy=agentHab)
         self.org = connecting.Organizer(hby=hby)
 
@@ -304,14 +497,13 @@ class Agent(doing.DoDoer):
         self.grants = decking.Deck()
         self.admits = decking.Deck()
 
-        receiptor = agenting.Receiptor(hby=hby)
         self.witq = agenting.WitnessInquisitor(hby=self.hby)
         self.witPub = agenting.WitnessPublisher(hby=self.hby)
         self.witDoer = agenting.WitnessReceiptor(hby=self.hby)
 
         self.rep = storing.Respondant(hby=hby, cues=self.cues, mbx=Mailboxer(name=self.hby.name, temp=self.hby.temp))
 
-        doers = [habbing.HaberyDoer(habery=hby), receiptor, self.witq, self.witPub, self.rep, self.swain,
+        doers = [habbing.HaberyDoer(habery=hby), self.witq, self.witPub, self.rep, self.swain,
                  self.counselor, self.witDoer, *oobiery.doers]
 
         signaler = signaling.Signaler()
@@ -333,10 +525,13 @@ class Agent(doing.DoDoer):
 
         handlers = [challengeHandler]
         self.exc = exchanging.Exchanger(hby=hby, handlers=handlers)
+        self.waiter = ExchangeWaiter()
         grouping.loadHandlers(exc=self.exc, mux=self.mux)
         protocoling.loadHandlers(hby=self.hby, exc=self.exc, notifier=self.notifier)
         self.monitor = longrunning.Monitor(hby=hby, swain=self.swain, counselor=self.counselor, temp=hby.temp,
-                                           registrar=self.registrar, credentialer=self.credentialer, exchanger=self.exc)
+                                           registrar=self.registrar, credentialer=self.credentialer, exchanger=self.exc,
+                                           seekers=dict(credentials=self.seeker, exchanges=self.exnseeker))
+        self.streamer = streaming.Streamer(hby=hby, monitor=self.monitor, notifier=self.notifier)
 
         self.rvy = routing.Revery(db=hby.db, cues=self.cues)
         self.kvy = eventing.Kevery(db=hby.db,
@@ -359,20 +554,33 @@ class Agent(doing.DoDoer):
                                      rvy=self.rvy,
                                      vry=self.verifier)
 
+        self.querier = Querier(hby=hby, agentHab=agentHab, kvy=self.kvy, queries=self.queries)
+        self.witnesser = Witnesser(hby=hby, pool=agency.pool, witners=self.witners)
+        self.sender = ExchangeSender(hby=hby, agentHab=agentHab, exc=self.exc, exchanges=self.exchanges,
+                                     pool=agency.pool, waiter=self.waiter)
+        self.granter = Granter(hby=hby, rgy=rgy, agentHab=agentHab, exc=self.exc, grants=self.grants, pool=agency.pool,
+                               waiter=self.waiter)
+        self.bodies = dict()  # LeasedBody -> perf_counter of its last read
+
         doers.extend([
             Initer(agentHab=agentHab, caid=caid),
-            Querier(hby=hby, agentHab=agentHab, kvy=self.kvy, queries=self.queries),
+            self.querier,
             Escrower(kvy=self.kvy, rgy=self.rgy, rvy=self.rvy, tvy=self.tvy, exc=self.exc, vry=self.verifier,
                      registrar=self.registrar, credentialer=self.credentialer),
             ParserDoer(kvy=self.kvy, parser=self.parser),
-            Witnesser(receiptor=receiptor, witners=self.witners),
+            self.witnesser,
             Delegator(agentHab=agentHab, swain=self.swain, anchors=self.anchors),
-            ExchangeSender(hby=hby, agentHab=agentHab, exc=self.exc, exchanges=self.exchanges),
-            Granter(hby=hby, rgy=rgy,  agentHab=agentHab, exc=self.exc, grants=self.grants),
-            Admitter(hby=hby, witq=self.witq, psr=self.parser, agentHab=agentHab, exc=self.exc, admits=self.admits),
+            self.sender,
+            self.granter,
+            Admitter(hby=hby, witq=self.witq, psr=self.parser, agentHab=agentHab, exc=self.exc, admits=self.admits,
+                     waiter=self.waiter, queries=self.queries),
             GroupRequester(hby=hby, agentHab=agentHab, counselor=self.counselor, groups=self.groups),
             SeekerDoer(seeker=self.seeker, cues=self.verifier.cues),
-            ExchangeCueDoer(seeker=self.exnseeker, cues=self.exc.cues, queries=self.queries)
+            ExchangeCueDoer(seeker=self.exnseeker, cues=self.exc.cues, queries=self.queries, waiter=self.waiter),
+            self.waiter,
+            Reindexer(seekers=[self.seeker, self.exnseeker]),
+            OperationCollector(monitor=self.monitor, ttl=agency.opTTL, maxOps=agency.maxOps),
+            self.streamer
         ])
 
         super(Agent, self).__init__(doers=doers, always=True, **opts)
@@ -381,6 +589,48 @@ class Agent(doing.DoDoer):
     def pre(self):
         return self.agentHab.pre
 
+    @property
+    def reading(self):
+        """ True when at least one response body of this Agent was read from within the last Lease seconds """
+        now = time.perf_counter()
+        for body in [body for body, read in self.bodies.items() if now - read > self.Lease]:
+            del self.bodies[body]
+
+        return len(self.bodies) > 0
+
+    @property
+    def busy(self):
+        """ True while hibernating this Agent would drop work only held in memory
+
+        That is messages queued on any of the decks or parked until their exchange message completes, doers still
+        sending, receipting or querying, and response bodies or event streams the HTTP server is still reading from.
+
+        """
+        decks = (self.cues, self.groups, self.anchors, self.witners, self.queries, self.exchanges, self.grants,
+                 self.admits)
+        if any(len(deck) > 0 for deck in decks) or self.waiter.waiting:
+            return True
+
+        if self.querier.inflight or self.witnesser.receipting:
+            return True
+
+        if self.sender.deeds or self.granter.deeds:  # deliveries still running
+            return True
+
+        return self.streamer.active or self.reading
+
+    def hibernate(self):
+        """ Close all databases opened by this Agent so it can be safely reloaded from disk later """
+        self.seeker.close()
+        self.exnseeker.close()
+        self.monitor.opr.close()
+        self.notifier.noter.close()
+        self.streamer.log.close()
+        self.rep.mbx.close()
+        self.mgr.rb.close()
+        self.rgy.close()
+        self.hby.close()
+
     def inceptSalty(self, pre, **kwargs):
         keeper = self.mgr.get(Algos.salty)
         keeper.incept(pre=pre, **kwargs)
@@ -420,28 +670,184 @@ class ParserDoer(doing.Doer):
         return done  # should never get here except forced close
 
 
-class Witnesser(doing.Doer):
+class Witnesser(doing.DoDoer):
+    """ Collects witness receipts for the events on the witners deck
+
+    Receipting of up to maxParallel events runs concurrently, each sending to all of its witnesses at once over the
+    Agency ClientPool, so one slow witness only holds up the events it witnesses.  Events of the same prefix are
+    receipted in order.
+
+    """
+
+    MaxParallel = 16
+    Timeout = 10.0
+
+    def __init__(self, hby, pool, witners, maxParallel=None, timeout=None):
+        """ Create witness receipt collector
+
+        Parameters:
+            hby (Habery): identifier database environment
+            pool (ClientPool): Agency pool of keep-alive HTTP connections
+            witners (Deck): events to receipt
+            maxParallel (int): maximum number of events receipted concurrently
+            timeout (float): seconds to wait for each witness response
 
-    def __init__(self, receiptor, witners):
-        self.receiptor = receiptor
+        """
+        self.hby = hby
+        self.pool = pool
         self.witners = witners
-        super(Witnesser, self).__init__()
+        self.maxParallel = maxParallel if maxParallel is not None else self.MaxParallel
+        self.timeout = timeout if timeout is not None else self.Timeout
+        self.receipting = dict()  # prefix -> WitnessReceipter
+        super(Witnesser, self).__init__(always=True)
+
+    def recur(self, tyme, deeds=None):
+        for pre, doer in list(self.receipting.items()):
+            if doer.done:
+                self.remove([doer])
+                del self.receipting[pre]
+
+        waiting = []
+        while self.witners and len(self.receipting) < self.maxParallel:
+            msg = self.witners.popleft()
+            serder = msg["serder"]
+            if serder.pre in self.receipting:  # wait for the earlier event of the prefix
+                waiting.append(msg)
+                continue
+
+            doer = WitnessReceipter(hby=self.hby, pool=self.pool, serder=serder, timeout=self.timeout)
+            self.receipting[serder.pre] = doer
+            self.extend([doer])
+
+        self.witners.extendleft(reversed(waiting))
+
+        return super(Witnesser, self).recur(tyme, deeds)
+
+
+class WitnessReceipter(doing.Doer):
+    """ Collects the witness receipts of one event and propagates them to the other witnesses
+
+    For rotations, added witnesses are first caught up to the current KEL.  Requests to different witnesses run in
+    parallel, the requests to one witness in order, and a witness that fails or does not respond within timeout is
+    left out of the receipts.
+
+    """
+
+    def __init__(self, hby, pool, serder, timeout, **kwa):
+        self.hby = hby
+        self.pool = pool
+        self.serder = serder
+        self.timeout = timeout
+        self.rcts = dict()
+        super(WitnessReceipter, self).__init__(**kwa)
 
     def recur(self, tyme=None):
-        while True:
-            if self.witners:
-                msg = self.witners.popleft()
-                serder = msg["serder"]
+        serder = self.serder
+        if serder.pre not in self.hby.habs:
+            logger.error(f"unable to receipt event of {serder.pre}, not a valid AID")
+            return True
+
+        hab = self.hby.habs[serder.pre]
+        urls = dict()
+        for wit in hab.kever.wits:
+            locs = hab.fetchUrls(eid=wit, scheme=kering.Schemes.http) or \
+                   hab.fetchUrls(eid=wit, scheme=kering.Schemes.https)
+            if not locs:
+                logger.error(f"unable to receipt with witness {wit}, no http endpoint")
+                continue
+            urls[wit] = locs[kering.Schemes.http] if kering.Schemes.http in locs else locs[kering.Schemes.https]
+
+        if not urls:
+            return True
+
+        # If we are a rotation event, may need to catch new witnesses up to current key state
+        msg = hab.makeOwnEvent(sn=serder.sn)
+        requests = dict()
+        for wit in urls:
+            requests[wit] = []
+            if serder.ked['t'] in (Ilks.rot, Ilks.drt) and wit in serder.ked["ba"]:
+                for fmsg in self.hby.db.clonePreIter(pre=serder.pre):
+                    requests[wit].extend(keriaforwarding.cesrRequests(ims=bytearray(fmsg), dest=wit))
+            requests[wit].extend(keriaforwarding.cesrRequests(ims=bytearray(msg), dest=wit, path="/receipts"))
+
+        reps = yield from self.send(urls, requests)
+        for wit, rep in reps.items():
+            if rep is None or rep.status != 200:
+                logger.error(f"invalid response {rep.status if rep else None} from witness {wit}")
+                continue
+
+            rct = bytearray(rep.body)
+            hab.psr.parseOne(bytearray(rct))
+            rserder = serdering.SerderKERI(raw=rct)
+            del rct[:rserder.size]
+            coring.Counter(qb64b=rct, strip=True)  # pull off the count code
+            self.rcts[wit] = rct
+
+        # Propagate the receipts of the other witnesses to each witness
+        requests = dict()
+        for wit in self.rcts:
+            ewits = [w for w in self.rcts if w != wit]
+            wigs = [sig for w, sig in self.rcts.items() if w != wit]
+
+            rmsg = bytearray()
+            if serder.ked['t'] in (Ilks.icp, Ilks.dip):  # introduce new witnesses
+                rmsg.extend(agenting.schemes(self.hby.db, eids=ewits))
+            elif serder.ked['t'] in (Ilks.rot, Ilks.drt) and wit in serder.ked["ba"]:  # added witness, introduce all
+                rmsg.extend(agenting.schemes(self.hby.db, eids=ewits))
+
+            rserder = eventing.receipt(pre=hab.pre, sn=serder.sn, said=serder.said)
+            rmsg.extend(rserder.raw)
+            rmsg.extend(coring.Counter(code=coring.CtrDex.NonTransReceiptCouples, count=len(wigs)).qb64b)
+            for wig in wigs:
+                rmsg.extend(wig)
+
+            requests[wit] = keriaforwarding.cesrRequests(ims=rmsg, dest=wit)
+
+        yield from self.send(urls, requests)
+        return True
+
+    def send(self, urls, requests):
+        """ Sends the requests of each witness in order, witnesses in parallel
+
+        Parameters:
+            urls (dict): witness prefix to HTTP endpoint URL
+            requests (dict): witness prefix to list of (method, path, headers, body) to send
+
+        Returns:
+            dict: witness prefix to response of its last request, None when a request failed
+
+        """
+        pending = {wit: list(reqs) for wit, reqs in requests.items() if reqs}
+        current = dict()
+        reps = dict()
+        while pending or current:
+            for wit in list(current):
+                delivery = current[wit]
+                if not delivery.done:
+                    continue
+
+                del current[wit]
+                if delivery.error is not None:
+                    logger.error(f"unable to reach witness {wit}: {delivery.error}")
+                    reps[wit] = None
+                    pending.pop(wit, None)
+                else:
+                    reps[wit] = delivery.rep
+
+            for wit in list(pending):
+                if wit in current:
+                    continue
 
-                # If we are a rotation event, may need to catch new witnesses up to current key state
-                if serder.ked['t'] in (Ilks.rot, Ilks.drt):
-                    adds = serder.ked["ba"]
-                    for wit in adds:
-                        yield from self.receiptor.catchup(serder.pre, wit)
+                method, path, headers, body = pending[wit].pop(0)
+                if not pending[wit]:
+                    del pending[wit]
+                current[wit] = self.pool.request(urls[wit], method=method, path=path, headers=headers, body=body,
+                                                 timeout=self.timeout)
 
-                yield from self.receiptor.receipt(serder.pre, serder.sn)
+            if current:
+                yield self.tock
 
-            yield self.tock
+        return reps
 
 
 class Delegator(doing.Doer):
@@ -463,11 +869,13 @@ class Delegator(doing.Doer):
 
 class ExchangeSender(doing.DoDoer):
 
-    def __init__(self, hby, agentHab, exc, exchanges):
+    def __init__(self, hby, agentHab, exc, exchanges, pool, waiter):
         self.hby = hby
+        self.pool = pool
         self.agentHab = agentHab
         self.exc = exc
         self.exchanges = exchanges
+        self.waiter = waiter
         super(ExchangeSender, self).__init__(always=True)
 
     def recur(self, tyme, deeds=None):
@@ -475,7 +883,7 @@ class ExchangeSender(doing.DoDoer):
             msg = self.exchanges.popleft()
             said = msg['said']
             if not self.exc.complete(said=said):
-                self.exchanges.append(msg)
+                self.waiter.wait(said=said, deck=self.exchanges, msg=msg)
                 return super(ExchangeSender, self).recur(tyme, deeds)
 
             serder, pathed = exchanging.cloneMessage(self.hby, said)
@@ -488,7 +896,8 @@ class ExchangeSender(doing.DoDoer):
                 atc = exchanging.serializeMessage(self.hby, said)
                 del atc[:serder.size]
                 for recp in rec:
-                    postman = forwarding.StreamPoster(hby=self.hby, hab=self.agentHab, recp=recp, topic=topic)
+                    postman = keriaforwarding.StreamPoster(pool=self.pool, hby=self.hby, hab=self.agentHab, recp=recp,
+                                                           topic=topic)
                     try:
                         postman.send(serder=serder,
                                      attachment=atc)
@@ -503,12 +912,14 @@ class ExchangeSender(doing.DoDoer):
 
 class Granter(doing.DoDoer):
 
-    def __init__(self, hby, rgy, agentHab, exc, grants):
+    def __init__(self, hby, rgy, agentHab, exc, grants, pool, waiter):
         self.hby = hby
+        self.pool = pool
         self.rgy = rgy
         self.agentHab = agentHab
         self.exc = exc
         self.grants = grants
+        self.waiter = waiter
         super(Granter, self).__init__(always=True)
 
     def recur(self, tyme, deeds=None):
@@ -516,7 +927,7 @@ class Granter(doing.DoDoer):
             msg = self.grants.popleft()
             said = msg['said']
             if not self.exc.complete(said=said):
-                self.grants.append(msg)
+                self.waiter.wait(said=said, deck=self.grants, msg=msg)
                 return super(Granter, self).recur(tyme, deeds)
 
             serder, pathed = exchanging.cloneMessage(self.hby, said)
@@ -525,21 +936,25 @@ class Granter(doing.DoDoer):
             rec = msg["rec"]
             hab = self.hby.habs[pre]
             if self.exc.lead(hab, said=said):
+                try:
+                    credSaid = serder.ked['e']['acdc']['d']
+                    creder = self.rgy.reger.creds.get(keys=(credSaid,))
+                    artifacts = grantArtifacts(self.hby, self.rgy.reger, creder)
+                except KeyError:
+                    logger.info(f"invalid grant message={serder.ked}")
+                    return super(Granter, self).recur(tyme, deeds)
+
                 for recp in rec:
-                    postman = forwarding.StreamPoster(hby=self.hby, hab=self.agentHab, recp=recp, topic="credential")
+                    postman = keriaforwarding.StreamPoster(pool=self.pool, hby=self.hby, hab=self.agentHab, recp=recp,
+                                                           topic="credential")
                     try:
-                        credSaid = serder.ked['e']['acdc']['d']
-                        creder = self.rgy.reger.creds.get(keys=(credSaid,))
-                        sendArtifacts(self.hby, self.rgy.reger, postman, creder, recp)
-                        sources = self.rgy.reger.sources(self.hby.db, creder)
-                        for source, atc in sources:
-                            sendArtifacts(self.hby, self.rgy.reger, postman, source, recp)
-                            postman.send(serder=source, attachment=atc)
+                        for aserder, atc, isse in artifacts:
+                            if isse is not None and isse == recp:  # the issuee already has its own KEL
+                                continue
+                            postman.send(serder=aserder, attachment=atc)
 
                     except kering.ValidationError:
                         logger.info(f"unable to send to recipient={recp}")
-                    except KeyError:
-                        logger.info(f"invalid grant message={serder.ked}")
                     else:
                         doer = doing.DoDoer(doers=postman.deliver())
                         self.extend([doer])
@@ -547,15 +962,86 @@ class Granter(doing.DoDoer):
         return super(Granter, self).recur(tyme, deeds)
 
 
+def grantArtifacts(hby, reger, creder):
+    """ Returns list of the artifacts to send with a grant of creder, each KEL and TEL only once
+
+    The artifacts are the KELs of the issuer and issuee with their delegation chains, the registry TEL and the TEL of
+    the granted credential and of each of its chained source credentials, followed by the source credential itself.
+    Logs shared by several credentials are read from the database once.  Issuee KELs unknown locally are left out.
+
+    Parameters:
+        hby (Habery): database access for KELs
+        reger (Reger): database access for credentials and TELs
+        creder (SerderACDC): granted credential
+
+    Returns:
+        list: (serder, atc, isse) of each artifact where isse is the qb64 prefix of the issuee when the artifact is
+              only needed by recipients other than the issuee, None when needed by all recipients
+
+    """
+    logs = dict()  # key -> [set of issuees the log is only added for or None when needed by all, [(serder, atc)]]
+    entries = []
+
+    def log(key, msgs, isse=None):
+        if key in logs:
+            if logs[key][0] is not None:
+                logs[key][0] = logs[key][0] | {isse} if isse is not None else None
+            return
+
+        logs[key] = [{isse} if isse is not None else None, []]
+        entries.append(("log", key))
+        for msg in msgs:  # lazily cloned, so logs already added are never read again
+            serder = serdering.SerderKERI(raw=msg)
+            logs[key][1].append((serder, msg[serder.size:]))
+
+    def kel(pre, isse=None):
+        chain = [pre]
+        kever = hby.db.kevers[pre]
+        while kever.delegated:
+            chain.insert(0, kever.delegator)
+            kever = hby.db.kevers[kever.delegator]
+
+        for dpre in chain:
+            log(("kel", dpre), hby.db.clonePreIter(pre=dpre), isse=isse)
+
+    def artifacts(acdc):
+        kel(acdc.issuer)
+        if "i" in acdc.attrib and acdc.attrib["i"] in hby.db.kevers:
+            kel(acdc.attrib["i"], isse=acdc.attrib["i"])
+        if acdc.regi is not None:
+            log(("tel", acdc.regi), reger.clonePreIter(pre=acdc.regi))
+        log(("tel", acdc.said), reger.clonePreIter(pre=acdc.said))
+
+    artifacts(creder)
+    for source, atc in reger.sources(hby.db, creder):
+        artifacts(source)
+        entries.append(("acdc", source, atc))
+
+    bundle = []
+    for kind, *entry in entries:
+        if kind == "log":
+            isses, msgs = logs[entry[0]]
+            # a log added for several issuees, like the KEL of their common delegator, is needed by all recipients
+            isse = next(iter(isses)) if isses is not None and len(isses) == 1 else None
+            bundle.extend((serder, atc, isse) for serder, atc in msgs)
+        else:
+            source, atc = entry
+            bundle.append((source, atc, None))
+
+    return bundle
+
+
 class Admitter(doing.Doer):
 
-    def __init__(self, hby, witq, psr, agentHab, exc, admits):
+    def __init__(self, hby, witq, psr, agentHab, exc, admits, waiter, queries):
         self.hby = hby
         self.agentHab = agentHab
         self.witq = witq
         self.psr = psr
         self.exc = exc
         self.admits = admits
+        self.waiter = waiter
+        self.queries = queries
         super(Admitter, self).__init__()
 
     def recur(self, tyme):
@@ -563,7 +1049,7 @@ class Admitter(doing.Doer):
             msg = self.admits.popleft()
             said = msg['said']
             if not self.exc.complete(said=said):
-                self.admits.append(msg)
+                self.waiter.wait(said=said, deck=self.admits, msg=msg)
                 return False
 
             admit, _ = exchanging.cloneMessage(self.hby, said)
@@ -578,8 +1064,8 @@ class Admitter(doing.Doer):
             acdc = embeds["acdc"]
             issr = acdc['i']
 
-            # Lets get the latest KEL and Registry if needed
-            self.witq.query(hab=self.agentHab, pre=issr)
+            # Lets get the latest KEL and Registry if needed, KEL queries are coalesced by the Querier
+            self.queries.append(dict(pre=issr))
             if "ri" in acdc:
                 self.witq.telquery(hab=self.agentHab, pre=issr, ri=acdc["ri"], i=acdc["d"])
 
@@ -595,6 +1081,9 @@ class Admitter(doing.Doer):
 
 
 class SeekerDoer(doing.Doer):
+    """ Indexes saved credentials from the cues of the Regery, draining up to BatchSize cues per write transaction """
+
+    BatchSize = 100
 
     def __init__(self, seeker, cues):
         self.seeker = seeker
@@ -603,45 +1092,169 @@ class SeekerDoer(doing.Doer):
         super(SeekerDoer, self).__init__()
 
     def recur(self, tyme=None):
-        if self.cues:
+        saved = []
+        others = []
+        while self.cues and len(saved) + len(others) < self.BatchSize:
             cue = self.cues.popleft()
             if cue["kin"] == "saved":
-                creder = cue["creder"]
-                try:
-                    self.seeker.index(said=creder.said)
-                except Exception:
-                    self.cues.append(cue)
-                    return False
+                saved.append(cue)
             else:
-                self.cues.append(cue)
-                return False
+                others.append(cue)
+
+        if saved:
+            failed = self.seeker.indexAll([cue["creder"].said for cue in saved])
+            self.cues.extend(cue for cue in saved if cue["creder"].said in failed)
+
+        self.cues.extend(others)
+        return False
 
 
 class ExchangeCueDoer(doing.Doer):
+    """ Indexes saved exn messages, wakes messages waiting on them and forwards queries from the Exchanger cues """
+
+    BatchSize = 100
 
-    def __init__(self, seeker, cues, queries):
+    def __init__(self, seeker, cues, queries, waiter):
         self.seeker = seeker
         self.cues = cues
         self.queries = queries
+        self.waiter = waiter
 
         super(ExchangeCueDoer, self).__init__()
 
     def recur(self, tyme=None):
-        if self.cues:
+        saved = []
+        others = []
+        while self.cues and len(saved) + len(others) < self.BatchSize:
             cue = self.cues.popleft()
             if cue["kin"] == "saved":
-                said = cue["said"]
-                try:
-                    self.seeker.index(said=said)
-                except Exception:
-                    self.cues.append(cue)
-                    return False
+                saved.append(cue)
             elif cue["kin"] == "query":
                 self.queries.append(cue['q'])
-                return False
             else:
-                self.cues.append(cue)
-                return False
+                others.append(cue)
+
+        if saved:
+            for cue in saved:
+                self.waiter.complete(said=cue["said"])
+            failed = self.seeker.indexAll([cue["said"] for cue in saved])
+            self.cues.extend(cue for cue in saved if cue["said"] in failed)
+
+        self.cues.extend(others)
+        return False
+
+
+class ExchangeWaiter(doing.Doer):
+    """ Holds queued messages whose exn is not yet complete until the Exchanger saves it
+
+    A waiting message is returned to the deck it was taken from once the saved cue of its exn SAID is seen and is
+    dropped when still waiting after timeout seconds, so abandoned multisig exchanges are not retried forever.
+
+    """
+
+    Timeout = 3600
+
+    def __init__(self, timeout=None, tock=1.0):
+        """ Create waiting set of messages for incomplete exchanges
+
+        Parameters:
+            timeout (float): seconds a message waits for its exn to complete before it is dropped
+            tock (float): seconds between sweeps of expired messages
+
+        """
+        self.timeout = timeout if timeout is not None else self.Timeout
+        self.waiting = dict()  # exn SAID -> list of (deck, msg, expiry)
+        super(ExchangeWaiter, self).__init__(tock=tock)
+
+    def wait(self, said, deck, msg):
+        """ Hold msg until the exn with said is complete, then append it back to deck """
+        expiry = helping.nowUTC() + datetime.timedelta(seconds=self.timeout)
+        self.waiting.setdefault(said, []).append((deck, msg, expiry))
+
+    def complete(self, said):
+        """ Return all messages waiting on the exn with said to their decks """
+        for deck, msg, _ in self.waiting.pop(said, []):
+            deck.append(msg)
+
+    def expire(self):
+        """ Drop messages waiting past their expiry
+
+        Returns:
+            int: number of messages dropped
+
+        """
+        now = helping.nowUTC()
+        count = 0
+        for said in list(self.waiting):
+            entries = [entry for entry in self.waiting[said] if entry[2] > now]
+            count += len(self.waiting[said]) - len(entries)
+            if entries:
+                self.waiting[said] = entries
+            else:
+                del self.waiting[said]
+                logger.info(f"dropped messages waiting on incomplete exchange said={said}")
+
+        return count
+
+    def recur(self, tyme=None):
+        """ Drop expired messages every tock """
+        self.expire()
+        return False
+
+
+class Reindexer(doing.Doer):
+    """ Runs started reindex jobs of the seekers in the background
+
+    Rate limited to one batch of BatchSize messages per seeker every tock seconds so a reindex of a large table
+    does not starve the rest of the Agent.  Reindex progress is persisted so a reindex resumes after a restart.
+
+    """
+
+    BatchSize = 100
+
+    def __init__(self, seekers, tock=0.25):
+        self.seekers = seekers
+
+        super(Reindexer, self).__init__(tock=tock)
+
+    def recur(self, tyme=None):
+        for seeker in self.seekers:
+            basing.reindex(seeker, size=self.BatchSize)
+
+        return False
+
+
+class OperationCollector(doing.Doer):
+    """ Garbage collects completed long running operations past their retention in incremental sweeps
+
+    Each pass removes at most BatchSize completed operations, oldest completion first, that are older than ttl or
+    in excess of maxOps.  Pending operations are never removed.
+
+    """
+
+    BatchSize = 100
+
+    def __init__(self, monitor, ttl=None, maxOps=None, tock=1.0):
+        """ Create operation garbage collector
+
+        Parameters:
+            monitor (Monitor): long running operation monitor
+            ttl (float): seconds completed operations are retained, None means no time limit
+            maxOps (int): maximum number of operations retained, None means no limit
+            tock (float): seconds between sweeps
+
+        """
+        self.monitor = monitor
+        self.ttl = ttl
+        self.maxOps = maxOps
+        super(OperationCollector, self).__init__(tock=tock)
+
+    def recur(self, tyme=None):
+        """ Remove one batch of completed operations past their retention """
+        if self.ttl is not None or self.maxOps is not None:
+            self.monitor.sweep(ttl=self.ttl, maxOps=self.maxOps, limit=self.BatchSize)
+
+        return False
 
 
 class Initer(doing.Doer):
@@ -686,12 +1299,27 @@ class GroupRequester(doing.Doer):
 
 
 class Querier(doing.DoDoer):
+    """ Runs key state, sequence number and anchor queries from the queries deck
+
+    Queries already satisfied by the local KEL are skipped and a query for a prefix that is covered by one still in
+    flight is coalesced into that one, so repeated query cues for the same issuer start at most one doer.  Key state
+    queries answered within the last KsnTTL seconds are not repeated while the key state notice they stored is of
+    the latest event in the local KEL, otherwise they are queued again once the KsnTTL expires.  Doers still in
+    flight after Timeout seconds are abandoned so a later query for the same prefix can try again.
+
+    """
+
+    KsnTTL = 30.0
+    Timeout = 120.0
 
     def __init__(self, hby, agentHab, queries, kvy):
         self.hby = hby
         self.agentHab = agentHab
         self.queries = queries
         self.kvy = kvy
+        self.inflight = dict()  # (pre, kind) -> (doer, started)
+        self.answered = dict()  # pre -> tyme of last successful key state query
+        self.deferred = dict()  # pre -> key state query msg to queue again once the KsnTTL of pre expires
 
         super(Querier, self).__init__(always=True)
 
@@ -702,24 +1330,97 @@ class Querier(doing.DoDoer):
             if "pre" not in msg:
                 return False
 
-            pre = msg["pre"]
+            self.query(tyme, msg)
 
-            if "sn" in msg:
-                sn = int(msg['sn'], 16)
-                seqNoDo = querying.SeqNoQuerier(hby=self.hby, hab=self.agentHab, pre=pre, sn=sn)
-                self.extend([seqNoDo])
-            elif "anchor" in msg:
-                anchor = msg['anchor']
-                anchorDo = querying.AnchorQuerier(hby=self.hby, hab=self.agentHab, pre=pre, anchor=anchor)
-                self.extend([anchorDo])
-            else:
-                qryDo = querying.QueryDoer(hby=self.hby, hab=self.agentHab, pre=pre, kvy=self.kvy)
-                self.extend([qryDo])
+        done = super(Querier, self).recur(tyme, deeds)
+        self.collect(tyme)
+        return done
+
+    def query(self, tyme, msg):
+        """ Start a doer for query msg unless it is satisfied locally or covered by a query in flight """
+        pre = msg["pre"]
+        kever = self.hby.kevers[pre] if pre in self.hby.kevers else None
 
-        return super(Querier, self).recur(tyme, deeds)
+        if "sn" in msg:
+            sn = int(msg['sn'], 16)
+            if kever is not None and kever.sn >= sn:
+                return
+
+            key = (pre, "sn")
+            if key in self.inflight and self.inflight[key][0].sn >= sn:
+                return
+
+            doer = querying.SeqNoQuerier(hby=self.hby, hab=self.agentHab, pre=pre, sn=sn)
+        elif "anchor" in msg:
+            anchor = msg['anchor']
+            if kever is not None and self.hby.db.findAnchoringSealEvent(pre, seal=anchor):
+                return
+
+            key = (pre, "anchor", json.dumps(anchor, sort_keys=True))
+            if key in self.inflight:
+                return
+
+            doer = querying.AnchorQuerier(hby=self.hby, hab=self.agentHab, pre=pre, anchor=anchor)
+        else:
+            if pre in self.answered and tyme - self.answered[pre] < self.KsnTTL:
+                if not self.current(pre, kever):
+                    self.deferred[pre] = msg
+                return
+
+            key = (pre, "ksn")
+            if key in self.inflight:
+                return
+
+            doer = querying.QueryDoer(hby=self.hby, hab=self.agentHab, pre=pre, kvy=self.kvy)
+
+        if key in self.inflight:  # superseded by a query for a later sequence number
+            self.remove([self.inflight[key][0]])
+
+        self.inflight[key] = (doer, tyme)
+        self.extend([doer])
+
+    def collect(self, tyme):
+        """ Remove finished and abandoned doers from the queries in flight """
+        for key, (doer, started) in list(self.inflight.items()):
+            if doer.done:
+                if key[1] == "ksn":
+                    self.answered[key[0]] = tyme
+                self.remove([doer])
+                del self.inflight[key]
+            elif tyme - started >= self.Timeout:
+                self.remove([doer])
+                del self.inflight[key]
+
+        for pre in [pre for pre, answered in self.answered.items() if tyme - answered >= self.KsnTTL]:
+            del self.answered[pre]
+            if pre in self.deferred:
+                self.queries.append(self.deferred.pop(pre))
+
+    def current(self, pre, kever):
+        """ Returns True if the latest key state notice stored for pre is of the latest event in the local KEL """
+        if kever is None:
+            return False
+
+        for (_, saider) in self.hby.db.knas.getItemIter(keys=(pre,)):
+            ksn = self.hby.db.ksns.get(keys=(saider.qb64,))
+            return ksn is not None and ksn.d == kever.serder.said
+
+        return False
 
 
 class Escrower(doing.Doer):
+    """ Recurring process of escrows for all components in an Agent
+
+    Rather than running every escrow processor on every pass, each processor is scheduled with an EscrowSchedule
+    that only runs it when one of the databases it escrows into has been written to since its last run.  Processors
+    that make no progress are backed off exponentially up to .MaxBackoff so time based escrow timeouts are still
+    honored.
+
+    """
+
+    MinBackoff = 0.25
+    MaxBackoff = 5.0
+
     def __init__(self, kvy, rgy, rvy, tvy, exc, vry, registrar, credentialer):
         """ Recuring process or escrows for all components in an Agent
 
@@ -742,23 +1443,84 @@ class Escrower(doing.Doer):
         self.registrar = registrar
         self.credentialer = credentialer
 
+        dbs = (kvy.db, rgy.reger)
+        processors = [self.kvy.processEscrows, self.rgy.processEscrows, self.rvy.processEscrowReply]
+        if self.tvy is not None:
+            processors.append(self.tvy.processEscrows)
+        processors.extend([self.exc.processEscrow, self.vry.processEscrows, self.registrar.processEscrows,
+                           self.credentialer.processEscrows])
+
+        self.schedules = [EscrowSchedule(process=process, dbs=dbs, minBackoff=self.MinBackoff,
+                                         maxBackoff=self.MaxBackoff) for process in processors]
+
         super(Escrower, self).__init__()
 
     def recur(self, tyme):
-        """ Process all escrows once per loop. """
-        self.kvy.processEscrows()
-        self.rgy.processEscrows()
-        self.rvy.processEscrowReply()
-        if self.tvy is not None:
-            self.tvy.processEscrows()
-        self.exc.processEscrow()
-        self.vry.processEscrows()
-        self.registrar.processEscrows()
-        self.credentialer.processEscrows()
+        """ Process all escrows with pending changes once per loop. """
+        for schedule in self.schedules:
+            schedule.run(tyme)
 
         return False
 
 
+class EscrowSchedule:
+    """ Dirty tracking and backoff for a single escrow processor
+
+    LMDB increments the last transaction ID of an environment on every committed write, so comparing the last
+    transaction IDs of the escrow databases against those seen after the previous run tells whether any escrow could
+    have changed.  Unchanged databases are not processed again until the backoff period elapses.
+
+    """
+
+    def __init__(self, process, dbs, minBackoff, maxBackoff):
+        """ Create escrow schedule
+
+        Parameters:
+            process (Callable): escrow processing function to schedule
+            dbs (Iterable): LMDBer databases the escrows of process are stored in
+            minBackoff (float): seconds to wait before reprocessing unchanged escrows that made progress
+            maxBackoff (float): maximum seconds to wait before reprocessing unchanged escrows
+
+        """
+        self.process = process
+        self.dbs = dbs
+        self.minBackoff = minBackoff
+        self.maxBackoff = maxBackoff
+
+        self.backoff = minBackoff
+        self.retyme = None
+        self.stamp = None
+
+    def txnids(self):
+        """ Returns tuple of last committed transaction ID of each database """
+        return tuple(db.env.info()["last_txnid"] if db.env is not None else None for db in self.dbs)
+
+    def run(self, tyme):
+        """ Run escrow processor if its databases changed or its backoff period has elapsed
+
+        Parameters:
+            tyme (float): current tyme of the scheduler
+
+        Returns:
+            bool: True means the escrow processor was run
+
+        """
+        stamp = self.txnids()
+        if stamp == self.stamp and self.retyme is not None and tyme < self.retyme:
+            return False
+
+        self.process()
+
+        self.stamp = self.txnids()
+        if self.stamp != stamp:  # processing escrows wrote to the database so we made progress
+            self.backoff = self.minBackoff
+        elif self.retyme is not None:
+            self.backoff = min(self.backoff * 2, self.maxBackoff)
+
+        self.retyme = tyme + self.backoff
+        return True
+
+
 def loadEnds(app):
     opColEnd = longrunning.OperationCollectionEnd()
     app.add_route("/operations", opColEnd)
@@ -779,6 +1541,9 @@ def loadEnds(app):
     queryEnd = QueryCollectionEnd()
     app.add_route("/queries", queryEnd)
 
+    reindexEnd = ReindexCollectionEnd()
+    app.add_route("/reindexes", reindexEnd)
+
 
 class BootEnd:
     """ Resource class for creating datastore in cloud ahab """
@@ -883,9 +1648,47 @@ class HealthEnd:
 
 
 class KeyStateCollectionEnd:
+    """ REST API for the key states of identifiers
 
-    @staticmethod
-    def on_get(req, rep):
+    Serialized key states are cached per Agent and identifier prefix along with the SAID of the latest event they
+    were built from, so they are only rebuilt after a new event is accepted into the KEL.  Key states include the
+    first seen ordinal and date time of the database of each Agent so they are never shared between Agents.
+
+    Attributes:
+        .cache (OrderedDict): least recently used (said, state) of key states keyed by (controller AID, prefix)
+
+    """
+
+    MaxEntries = 4096
+    MaxPrefixes = 1000
+
+    def __init__(self):
+        """ Create key state collection endpoint """
+        self.cache = OrderedDict()
+
+    def state(self, agent, kever):
+        """ Returns bytes of JSON serialized current key state of kever as known to agent
+
+        Parameters:
+            agent (Agent): Agent whose Kevers kever is from
+            kever (Kever): key state of identifier
+
+        """
+        key = (agent.caid, kever.prefixer.qb64)
+        said = kever.serder.said
+        if (entry := self.cache.get(key)) is not None and entry[0] == said:
+            self.cache.move_to_end(key)
+            return entry[1]
+
+        state = json.dumps(asdict(kever.state())).encode("utf-8")
+        self.cache[key] = (said, state)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.MaxEntries:
+            self.cache.popitem(last=False)
+
+        return state
+
+    def on_get(self, req, rep):
         """
 
         Parameters:
@@ -925,12 +1728,85 @@ class KeyStateCollectionEnd:
             if pre not in agent.hby.kevers:
                 continue
 
-            kever = agent.hby.kevers[pre]
-            states.append(asdict(kever.state()))
+            states.append(self.state(agent, agent.hby.kevers[pre]))
 
         rep.status = falcon.HTTP_200
         rep.content_type = "application/json"
-        rep.data = json.dumps(states).encode("utf-8")
+        rep.data = b"[" + b",".join(states) + b"]"
+
+    def on_post(self, req, rep):
+        """ Batch key state refresh
+
+        Parameters:
+            req (Request): falcon.Request HTTP request
+            rep (Response): falcon.Response HTTP response
+
+        ---
+        summary:  Display the key states of identifiers that changed since they were last known
+        description:  For each identifier with its last known sequence number and SAID of its latest event, return
+                      the current key state only if the identifier is in Kevers and its latest event differs
+        tags:
+           - Key Event Log
+        requestBody:
+            required: true
+            content:
+              application/json:
+                schema:
+                  type: object
+                  properties:
+                    states:
+                      type: array
+                      description: last known states of identifiers
+                      items:
+                        type: object
+                        properties:
+                          i:
+                            type: string
+                            description: qb64 identifier prefix
+                          s:
+                            type: string
+                            description: optional last known hex sequence number
+                          d:
+                            type: string
+                            description: optional last known SAID of the latest event
+        responses:
+           200:
+              description: Key states of identifiers that changed
+           400:
+              description: Invalid request body
+
+
+        """
+        agent = req.context.agent
+        body = req.get_media()
+        known = body.get("states") if isinstance(body, dict) else None
+        if not isinstance(known, list):
+            raise falcon.HTTPBadRequest(description="required field 'states' missing from request")
+
+        if len(known) > self.MaxPrefixes:
+            raise falcon.HTTPBadRequest(description=f"at most {self.MaxPrefixes} states allowed per request")
+
+        states = []
+        for item in known:
+            if not isinstance(item, dict) or not isinstance(item.get("i"), str):
+                raise falcon.HTTPBadRequest(description="each state requires an identifier prefix 'i'")
+
+            if (kever := agent.hby.kevers.get(item["i"])) is None:
+                continue
+
+            if "d" in item:
+                changed = item["d"] != kever.serder.said
+            elif "s" in item:
+                changed = item["s"] != f"{kever.sn:x}"
+            else:
+                changed = True
+
+            if changed:
+                states.append(self.state(agent, kever))
+
+        rep.status = falcon.HTTP_200
+        rep.content_type = "application/json"
+        rep.data = b"[" + b",".join(states) + b"]"
 
 
 class KeyEventCollectionEnd:
@@ -945,22 +1821,35 @@ class KeyEventCollectionEnd:
 
         ---
         summary:  Display key event log (KEL) for given identifier prefix
-        description:  If provided qb64 identifier prefix is in Kevers, return the current state of the
-                      identifier along with the KEL and all associated signatures and receipts
+        description:  If provided qb64 identifier prefix is in Kevers, stream the KEL of the identifier in first
+                      seen order, either as a JSON array of events or, when application/json+cesr is accepted, as
+                      CESR messages with all associated signatures and receipts
         tags:
            - Key Event Log
         parameters:
-          - in: path
-            name: prefix
+          - in: query
+            name: pre
             schema:
               type: string
             required: true
             description: qb64 identifier prefix of KEL to load
+          - in: query
+            name: fromSn
+            schema:
+              type: integer
+            required: false
+            description: only return events with a sequence number of at least fromSn
+          - in: query
+            name: limit
+            schema:
+              type: integer
+            required: false
+            description: maximum number of events to return
         responses:
            200:
-              description: Key event log and key state of identifier
-           404:
-              description: Identifier not found in Key event database
+              description: Key event log of identifier
+           400:
+              description: Missing or invalid parameter
 
 
         """
@@ -969,19 +1858,81 @@ class KeyEventCollectionEnd:
             raise falcon.HTTPBadRequest(description="required parameter 'pre' missing")
 
         pre = req.params.get("pre")
-        preb = pre.encode("utf-8")
-        events = []
-        for fn, dig in agent.hby.db.getFelItemPreIter(preb, fn=0):
-            dgkey = dbing.dgKey(preb, dig)  # get message
-            if not (raw := agent.hby.db.getEvt(key=dgkey)):
-                raise falcon.HTTPInternalServerError(f"Missing event for dig={dig}.")
-
-            serder = serdering.SerderKERI(raw=bytes(raw))
-            events.append(serder.ked)
+        fromSn = req.get_param_as_int("fromSn", min_value=0, default=0)
+        limit = req.get_param_as_int("limit", min_value=0)
+        cesr = req.get_header("accept") == "application/json+cesr"
 
         rep.status = falcon.HTTP_200
-        rep.content_type = "application/json"
-        rep.data = json.dumps(events).encode("utf-8")
+        rep.content_type = "application/json+cesr" if cesr else "application/json"
+        rep.stream = httping.LeasedBody(KeyEventIterable(db=agent.hby.db, pre=pre, fromSn=fromSn, limit=limit,
+                                                         cesr=cesr), leases=agent.bodies)
+
+
+class KeyEventIterable:
+    """ Iterable streaming a KEL in first seen order
+
+    Events are read in batches of .BatchSize, each batch in its own read transaction, so neither the whole KEL is
+    held in memory nor a transaction is kept open while the response is written.
+
+    """
+
+    BatchSize = 100
+
+    def __init__(self, db, pre, fromSn=0, limit=None, cesr=False):
+        """ Create KEL stream
+
+        Parameters:
+            db (Baser): database of KELs
+            pre (str): qb64 identifier prefix of KEL to stream
+            fromSn (int): only stream events with a sequence number of at least fromSn
+            limit (int): maximum number of events to stream, None means all
+            cesr (bool): True means stream CESR messages with attachments, False means a JSON array of events
+
+        """
+        self.db = db
+        self.pre = pre
+        self.fromSn = fromSn
+        self.limit = limit
+        self.cesr = cesr
+
+    def __iter__(self):
+        preb = self.pre.encode("utf-8")
+        # An event with sequence number sn can not be first seen before all events of lower sequence numbers
+        fn = self.fromSn
+        count = 0
+
+        if not self.cesr:
+            yield b"["
+
+        while self.limit is None or count < self.limit:
+            items = self.db.getFelItemPreIter(preb, fn=fn)
+            batch = [(on, bytes(dig)) for on, dig in itertools.islice(items, self.BatchSize)]
+            items.close()
+            if not batch:
+                break
+
+            for fn, dig in batch:
+                if self.limit is not None and count >= self.limit:
+                    break
+
+                if not (raw := self.db.getEvt(key=dbing.dgKey(preb, dig))):
+                    logger.error(f"Missing event for dig={dig.decode('utf-8')}.")
+                    continue
+
+                serder = serdering.SerderKERI(raw=bytes(raw))
+                if serder.sn < self.fromSn:  # superseded by recovery
+                    continue
+
+                if self.cesr:
+                    yield bytes(self.db.cloneEvtMsg(pre=preb, fn=fn, dig=dig))
+                else:
+                    yield (b"," if count else b"") + json.dumps(serder.ked).encode("utf-8")
+                count += 1
+
+            fn += 1
+
+        if not self.cesr:
+            yield b"]"
 
 
 class OOBICollectionEnd:
@@ -1199,3 +2150,48 @@ class QueryCollectionEnd:
         rep.status = falcon.HTTP_202
         rep.content_type = "application/json"
         rep.data = op.to_json().encode("utf-8")
+
+
+class ReindexCollectionEnd:
+
+    @staticmethod
+    def on_post(req, rep):
+        """ Start a background reindex of all credentials or exchange messages
+
+        Parameters:
+            req (Request): falcon.Request HTTP request
+            rep (Response): falcon.Response HTTP response
+
+        ---
+        summary:  Rebuild the credential or exchange message query indexes in the background
+        description:  Reindexes every saved credential or exn message, tracked as a long running operation
+        tags:
+          - Reindex
+        parameters:
+          - in: body
+            name: index
+            schema:
+              type: string
+            required: true
+            description: index to rebuild, [credentials|exchanges]
+        responses:
+           202:
+              description: Long running reindex operation
+           400:
+              description: Invalid index name
+
+        """
+        agent = req.context.agent
+        body = req.get_media()
+        index = httping.getRequiredParam(body, "index")
+
+        if index not in agent.monitor.seekers:
+            raise falcon.HTTPBadRequest(description=f"invalid index {index}, must be one of "
+                                                    f"{list(agent.monitor.seekers)}")
+
+        basing.startReindex(agent.monitor.seekers[index])
+        op = agent.monitor.submit(index, longrunning.OpTypes.reindex, metadata=dict(index=index))
+
+        rep.status = falcon.HTTP_202
+        rep.content_type = "application/json"
+        rep.data = op.to_json().encode("utf-8")
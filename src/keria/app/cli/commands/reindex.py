@@ -0,0 +1,79 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.cli.keria.commands module
+
+Offline index rebuild command line interface
+"""
+import argparse
+
+from keri import help
+from keri.vdr import viring
+from keri.db import basing as keribasing
+
+from keria.db import basing
+
+logger = help.ogler.getLogger()
+
+d = "Rebuilds the credential and exchange message query indexes of agents from their saved messages.\n"
+d += "Must not be run while KERIA is running against the same databases.\n"
+d += "\tExample:\nkeria reindex --base keria\n"
+parser = argparse.ArgumentParser(description=d)
+parser.set_defaults(handler=lambda args: rebuild(args))
+parser.add_argument('--base', '-b', help='additional optional prefix to file location of KERI keystore',
+                    required=False, default="")
+parser.add_argument('--caid', '-c', help='qb64 controller AID of the only agent to rebuild, default is all agents',
+                    required=False, default=None)
+parser.add_argument('--index', '-i', help='index to rebuild, default is both',
+                    required=False, default=None, choices=["credentials", "exchanges"])
+
+
+def rebuild(args):
+    adb = basing.AgencyBaser(name="TheAgency", base=args.base, reopen=True)
+    try:
+        if args.caid is not None:
+            caids = [args.caid] if adb.agnt.get(keys=(args.caid,)) is not None else []
+        else:
+            caids = [caid for (caid,), _ in adb.agnt.getItemIter()]
+    finally:
+        adb.close()
+
+    if not caids:
+        print("No agents found to reindex")
+
+    for caid in caids:
+        rebuildAgent(caid=caid, base=args.base, index=args.index)
+
+    return []
+
+
+def rebuildAgent(caid, base="", index=None):
+    """ Bulk rebuild the indexes of the agent of controller caid
+
+    Parameters:
+        caid (str): qb64 controller AID of the agent
+        base (str): optional prefix to file location of KERI databases
+        index (str): credentials or exchanges to rebuild only one of the indexes, default is both
+
+    """
+    db = keribasing.Baser(name=caid, base=base, reopen=True)
+    try:
+        if index in (None, "credentials"):
+            reger = viring.Reger(name=f"agent-{caid}", base=base, reopen=True)
+            seeker = basing.Seeker(name=caid, db=db, reger=reger, reopen=True)
+            try:
+                count = basing.rebuild(seeker)
+                print(f"Agent {caid}: reindexed {count} credentials")
+            finally:
+                seeker.close()
+                reger.close()
+
+        if index in (None, "exchanges"):
+            seeker = basing.ExnSeeker(name=caid, db=db, reopen=True)
+            try:
+                count = basing.rebuild(seeker)
+                print(f"Agent {caid}: reindexed {count} exchange messages")
+            finally:
+                seeker.close()
+    finally:
+        db.close()
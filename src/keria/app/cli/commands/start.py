@@ -12,7 +12,7 @@ from keri import __version__
 from keri import help
 from keri.app import directing
 
-from keria.app import agenting
+from keria.app import agenting, sharding
 
 d = "Runs KERI Signify Agent\n"
 d += "\tExample:\nkli ahab\n"
@@ -60,6 +60,30 @@ parser.add_argument("--certpath", action="store", required=False, default=None,
                     help="TLS server signed certificate (public key) file")
 parser.add_argument("--cafilepath", action="store", required=False, default=None,
                     help="TLS server CA certificate chain")
+parser.add_argument("--max-agents", dest="maxAgents", action="store", required=False, default=None, type=int,
+                    help="Maximum number of agents kept loaded in memory, least recently used agents are unloaded "
+                         "when exceeded. Default is no limit.")
+parser.add_argument("--idle-timeout", dest="idleTimeout", action="store", required=False, default=None, type=float,
+                    help="Seconds an agent can go unused before it is unloaded from memory. Default is never.")
+parser.add_argument("--op-ttl", dest="opTTL", action="store", required=False, default=None, type=float,
+                    help="Seconds completed long running operations are retained before they are removed. Default is "
+                         "until deleted by the client.")
+parser.add_argument("--max-ops", dest="maxOps", action="store", required=False, default=None, type=int,
+                    help="Maximum number of long running operations retained per agent, oldest completed operations "
+                         "are removed when exceeded. Default is no limit.")
+parser.add_argument("--asgi", dest="asgi", action="store_true", required=False, default=False,
+                    help="Serve the HTTP APIs with uvicorn (ASGI) instead of the built in HTTP server, requires "
+                         "uvicorn to be installed. Request handlers still run on the thread of the Agency.")
+parser.add_argument("--asgi-limit", dest="asgiLimit", action="store", required=False, default=None, type=int,
+                    help="Maximum number of concurrent connections per API when serving with --asgi, excess requests "
+                         "are answered with 503. Default is no limit.")
+parser.add_argument("--workers", dest="workers", action="store", required=False, default=1, type=int,
+                    help="Number of agency worker processes the agents are sharded over behind a routing front end "
+                         "listening on the admin, http and boot ports. Default is 1, a single process without "
+                         "front end.")
+parser.add_argument("--shard-port", dest="shardPort", action="store", required=False, default=5900, type=int,
+                    help="First of the internal ports the workers listen on, three consecutive ports per worker. "
+                         "Default is 5900.")
 
 
 def launch(args):
@@ -71,6 +95,29 @@ def launch(args):
     logger.info("******* Starting Agent for %s listening: admin/%s, http/%s "
                 ".******", args.name, args.admin, args.http)
 
+    if args.workers > 1:
+        supervisor = sharding.Supervisor(name=args.name,
+                                         base=args.base,
+                                         bran=args.bran,
+                                         workers=args.workers,
+                                         admin=int(args.admin),
+                                         http=int(args.http),
+                                         boot=int(args.boot),
+                                         shardPort=args.shardPort,
+                                         keypath=args.keypath,
+                                         certpath=args.certpath,
+                                         cafilepath=args.cafilepath,
+                                         configFile=args.configFile,
+                                         configDir=args.configDir,
+                                         maxAgents=args.maxAgents,
+                                         idleTimeout=args.idleTimeout,
+                                         opTTL=args.opTTL,
+                                         maxOps=args.maxOps,
+                                         asgi=args.asgi,
+                                         asgiLimit=args.asgiLimit)
+        supervisor.run()
+        return
+
     runAgent(name=args.name,
              base=args.base,
              bran=args.bran,
@@ -81,14 +128,21 @@ def launch(args):
              configDir=args.configDir,
              keypath=args.keypath,
              certpath=args.certpath,
-             cafilepath=args.cafilepath)
+             cafilepath=args.cafilepath,
+             maxAgents=args.maxAgents,
+             idleTimeout=args.idleTimeout,
+             opTTL=args.opTTL,
+             maxOps=args.maxOps,
+             asgi=args.asgi,
+             asgiLimit=args.asgiLimit)
 
     logger.info("******* Ended Agent for %s listening: admin/%s, http/%s"
                 ".******", args.name, args.admin, args.http)
 
 
 def runAgent(name="ahab", base="", bran="", admin=3901, http=3902, boot=3903, configFile=None,
-             configDir=None, keypath=None, certpath=None, cafilepath=None, expire=0.0):
+             configDir=None, keypath=None, certpath=None, cafilepath=None, maxAgents=None, idleTimeout=None, opTTL=None,
+             maxOps=None, asgi=False, asgiLimit=None, expire=0.0):
     """
     Setup and run a KERIA Agency
     """
@@ -102,6 +156,12 @@ def runAgent(name="ahab", base="", bran="", admin=3901, http=3902, boot=3903, co
                                 configDir=configDir,
                                 keypath=keypath,
                                 certpath=certpath,
-                                cafilepath=cafilepath))
+                                cafilepath=cafilepath,
+                                maxAgents=maxAgents,
+                                idleTimeout=idleTimeout,
+                                opTTL=opTTL,
+                                maxOps=maxOps,
+                                asgi=asgi,
+                                asgiLimit=asgiLimit))
 
     directing.runController(doers=doers, expire=expire)
@@ -6,6 +6,7 @@ keria.app.credentialing module
 services and endpoint for ACDC credential managements
 """
 import json
+from collections import OrderedDict
 from dataclasses import asdict
 
 import falcon
@@ -339,9 +340,34 @@ class CredentialQueryCollectionEnd:
                 type: string
              description:  schema to filter by if provided
              required: false
+        requestBody:
+            required: false
+            content:
+              application/json:
+                schema:
+                  type: object
+                  properties:
+                    filter:
+                      type: object
+                      description: query filter of field paths to values or operators
+                    sort:
+                      type: array
+                      description: field paths to sort by
+                    skip:
+                      type: integer
+                      description: number of matching credentials to skip
+                    limit:
+                      type: integer
+                      description: maximum number of credentials to return
+                    after:
+                      type: string
+                      description: Continuation-Token of the previous page to resume after
+                    count:
+                      type: boolean
+                      description: only return the number of matching credentials
         responses:
            200:
-              description: Credential list.
+              description: Credential list, or {"count":n} when count is requested.  Content-Range carries the total, or * when it is not cheaply known.
               content:
                   application/json:
                     schema:
@@ -373,19 +399,44 @@ class CredentialQueryCollectionEnd:
                 limit = body["limit"]
             else:
                 limit = 25
+
+            if "after" in body:
+                after = body["after"]
+            else:
+                after = None
+
+            count = body.get("count", False) is True
         except falcon.HTTPError:
             filtr = {}
             sort = {}
             skip = 0
             limit = 25
+            after = None
+            count = False
 
-        cur = agent.seeker.find(filtr=filtr, sort=sort, skip=skip, limit=limit)
-        saids = [coring.Saider(qb64=said) for said in cur]
+        try:
+            cur = agent.seeker.find(filtr=filtr, sort=sort, skip=skip, limit=limit, after=after)
+            if count:
+                total = cur.count()
+                rep.set_header("Accept-Ranges", "credentials")
+                rep.set_header("Content-Range", f"credentials */{total}")
+                rep.status = falcon.HTTP_200
+                rep.content_type = "application/json"
+                rep.data = json.dumps(dict(count=total)).encode("utf-8")
+                return
+
+            saids = [coring.Saider(qb64=said) for said in cur]
+            total = cur.indexCount()
+        except ValueError as e:
+            raise falcon.HTTPBadRequest(description=e.args[0])
+
+        if cur.token is not None:
+            rep.set_header("Continuation-Token", cur.token)
         creds = agent.rgy.reger.cloneCreds(saids=saids, db=agent.hby.db)
 
         end = skip + (len(creds) - 1) if len(creds) > 0 else 0
         rep.set_header("Accept-Ranges", "credentials")
-        rep.set_header("Content-Range", f"credentials {skip}-{end}/{limit}")
+        rep.set_header("Content-Range", f"credentials {skip}-{end}/{total if total is not None else '*'}")
 
         rep.status = falcon.HTTP_200
         rep.content_type = "application/json"
@@ -508,13 +559,23 @@ class CredentialCollectionEnd:
 
 
 class CredentialResourceEnd:
-    def __init__(self):
-        """
+    """ REST API for exporting credentials
 
-        """
+    CESR exports are streamed and cached per credential SAID along with the last transaction ids of the KEL and TEL
+    databases they were built from, so they are only rebuilt after any of the logs may have advanced.
 
-    @staticmethod
-    def on_get(req, rep, said):
+    Attributes:
+        .cache (OrderedDict): least recently used (stamp, data) of CESR exports keyed by (agent, said)
+
+    """
+
+    MaxEntries = 256
+
+    def __init__(self):
+        """ Create credential export endpoint """
+        self.cache = OrderedDict()
+
+    def on_get(self, req, rep, said):
         """ Credentials GET endpoint
 
         Parameters:
@@ -553,21 +614,64 @@ class CredentialResourceEnd:
         agent = req.context.agent
         accept = req.get_header("accept")
         if accept == "application/json+cesr":
-            rep.content_type = "application/json+cesr"
-            data = CredentialResourceEnd.outputCred(agent.hby, agent.rgy, said)
-        else:
-            rep.content_type = "application/json"
-            creds = agent.rgy.reger.cloneCreds([coring.Saider(qb64=said)], db=agent.hby.db)
-            if not creds:
+            if agent.rgy.reger.creds.get(keys=(said,)) is None:
                 raise falcon.HTTPNotFound(description=f"credential for said {said} not found.")
 
-            data = json.dumps(creds[0]).encode("utf-8")
+            rep.status = falcon.HTTP_200
+            rep.content_type = "application/json+cesr"
+            key = (agent.hby.name, said)
+            stamp = (agent.hby.db.env.info()["last_txnid"], agent.rgy.reger.env.info()["last_txnid"])
+            if (entry := self.cache.get(key)) is not None and entry[0] == stamp:
+                self.cache.move_to_end(key)
+                rep.data = entry[1]
+            else:
+                rep.stream = httping.LeasedBody(self.stream(key, stamp, agent.hby, agent.rgy, said),
+                                                leases=agent.bodies)
+            return
+
+        rep.content_type = "application/json"
+        creds = agent.rgy.reger.cloneCreds([coring.Saider(qb64=said)], db=agent.hby.db)
+        if not creds:
+            raise falcon.HTTPNotFound(description=f"credential for said {said} not found.")
 
         rep.status = falcon.HTTP_200
-        rep.data = bytes(data)
+        rep.data = json.dumps(creds[0]).encode("utf-8")
+
+    def stream(self, key, stamp, hby, rgy, said):
+        """ Generator streaming the CESR export of credential said, caching it once streamed completely """
+        chunks = []
+        for chunk in CredentialResourceEnd.streamCred(hby, rgy, said):
+            chunks.append(chunk)
+            yield chunk
+
+        self.cache[key] = (stamp, b"".join(chunks))
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.MaxEntries:
+            self.cache.popitem(last=False)
 
     @staticmethod
     def outputCred(hby, rgy, said):
+        """ Returns bytearray of the CESR export of credential said """
+        return bytearray(b"".join(CredentialResourceEnd.streamCred(hby, rgy, said)))
+
+    @staticmethod
+    def streamCred(hby, rgy, said, emitted=None):
+        """ Generator of the CESR messages of credential said, its chained credentials and their KELs and TELs
+
+        Each credential, KEL and TEL is emitted once, before the credentials chained to it.
+
+        Parameters:
+            hby (Habery): database access for KELs
+            rgy (Regery): database access for credentials and TELs
+            said (str): qb64 SAID of credential to export
+            emitted (set): (kind, prefix) of credentials, KELs and TELs already emitted
+
+        """
+        emitted = emitted if emitted is not None else set()
+        if ("acdc", said) in emitted:
+            return
+        emitted.add(("acdc", said))
+
         out = bytearray()
         creder, prefixer, seqner, saider = rgy.reger.cloneCred(said=said)
         chains = creder.edge or dict()
@@ -582,39 +686,24 @@ class CredentialResourceEnd:
             saids.append(source['n'])
 
         for said in saids:
-            out.extend(CredentialResourceEnd.outputCred(hby, rgy, said))
-
-        issr = creder.issuer
-        for msg in hby.db.clonePreIter(pre=issr):
-            serder = serdering.SerderKERI(raw=msg)
-            atc = msg[serder.size:]
-            out.extend(serder.raw)
-            out.extend(atc)
+            yield from CredentialResourceEnd.streamCred(hby, rgy, said, emitted)
 
+        logs = [("kel", creder.issuer, hby.db)]
         if "i" in creder.attrib:
-            subj = creder.attrib["i"]
-            for msg in hby.db.clonePreIter(pre=subj):
-                serder = serdering.SerderKERI(raw=msg)
-                atc = msg[serder.size:]
-                out.extend(serder.raw)
-                out.extend(atc)
-
+            logs.append(("kel", creder.attrib["i"], hby.db))
         if creder.regi is not None:
-            for msg in rgy.reger.clonePreIter(pre=creder.regi):
-                serder = serdering.SerderKERI(raw=msg)
-                atc = msg[serder.size:]
-                out.extend(serder.raw)
-                out.extend(atc)
+            logs.append(("tel", creder.regi, rgy.reger))
+            logs.append(("tel", creder.said, rgy.reger))
 
-            for msg in rgy.reger.clonePreIter(pre=creder.said):
-                serder = serdering.SerderKERI(raw=msg)
-                atc = msg[serder.size:]
-                out.extend(serder.raw)
-                out.extend(atc)
+        for kind, pre, db in logs:
+            if (kind, pre) in emitted:
+                continue
+            emitted.add((kind, pre))
 
-        out.extend(signing.serialize(creder, prefixer, seqner, saider))
+            for msg in db.clonePreIter(pre=pre):
+                yield bytes(msg)
 
-        return out
+        yield bytes(signing.serialize(creder, prefixer, seqner, saider))
 
 
 class CredentialResourceDeleteEnd:
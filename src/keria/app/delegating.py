@@ -4,6 +4,8 @@ from keri.app import forwarding, agenting, habbing
 from keri.core import coring, serdering
 from keri.db import dbing
 
+from . import forwarding as keriaforwarding
+
 
 class Sealer(doing.DoDoer):
     """
@@ -14,7 +16,7 @@ class Sealer(doing.DoDoer):
 
     """
 
-    def __init__(self, hby, proxy=None, **kwa):
+    def __init__(self, hby, proxy=None, pool=None, **kwa):
         """
         For the current event, gather the current set of witnesses, send the event,
         gather all receipts and send them to all other witnesses
@@ -24,10 +26,14 @@ class Sealer(doing.DoDoer):
             msg (bytes): is the message to send to all witnesses.
                  Defaults to sending the latest KEL event if msg is None
             scheme (str): Scheme to favor if available
+            pool (ClientPool): optional pool of keep-alive connections to deliver messages over
 
         """
         self.hby = hby
-        self.postman = forwarding.Poster(hby=hby)
+        if pool is not None:
+            self.postman = keriaforwarding.Poster(hby=hby, pool=pool)
+        else:
+            self.postman = forwarding.Poster(hby=hby)
         self.witq = agenting.WitnessInquisitor(hby=hby)
         self.witDoer = agenting.Receiptor(hby=self.hby)
         self.proxy = proxy
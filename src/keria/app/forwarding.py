@@ -0,0 +1,455 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.forwarding module
+
+Outbound delivery of KERI messages over pooled keep-alive HTTP connections shared by all Agents of the Agency
+"""
+import random
+from collections import deque
+from urllib.parse import urlparse
+
+from hio.base import doing
+from hio.core import http
+from hio.help import decking, Hict
+from keri import kering
+from keri.app import agenting, forwarding, httping
+from keri.app.forwarding import introduce
+from keri.help import ogler
+from keri.peer import exchanging
+from ordered_set import OrderedSet as oset
+
+logger = ogler.getLogger()
+
+
+class Delivery:
+    """ Outbound HTTP request queued on a ClientPool and its response once done
+
+    Attributes:
+        method (str): HTTP method
+        path (str): request path including any query
+        headers (Hict): request headers
+        body (bytes): request body
+        timeout (float): seconds from being queued to wait for a response, None means the timeout of the ClientPool
+        queued (float): tyme the request was queued on the ClientPool
+        rep (namedtuple): response when delivered
+        error (str): reason of failure when not delivered
+        done (bool): True once delivered or failed
+        attempts (int): number of times the request was sent
+
+    """
+
+    def __init__(self, method, path, headers, body, timeout=None):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.timeout = timeout
+        self.queued = None
+        self.rep = None
+        self.error = None
+        self.done = False
+        self.attempts = 0
+
+    def complete(self, rep=None, error=None):
+        """ Mark delivered with response rep or failed with error """
+        self.rep = rep
+        self.error = error
+        self.done = True
+
+
+class Connection:
+    """ Keep-alive HTTP connection of a ClientPool sending one Delivery at a time """
+
+    Idempotent = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+
+    def __init__(self, scheme, hostname, port, tymth=None):
+        self.client = http.clienting.Client(scheme=scheme, hostname=hostname, port=port)
+        if tymth is not None:
+            self.client.wind(tymth)
+        self.client.reopen()
+
+        self.delivery = None
+        self.used = None
+        self.broken = False
+        self.written = False
+
+    def start(self, delivery):
+        """ Send delivery, reconnecting first when the server closed the connection since the last response """
+        if self.client.connector.cutoff:
+            self.client.reopen()
+            self.used = None
+
+        delivery.attempts += 1
+        self.delivery = delivery
+        self.written = False
+        self.client.request(method=delivery.method, path=delivery.path, headers=delivery.headers,
+                            body=delivery.body)
+
+    def unwritten(self):
+        """ Returns True while no byte of the request of the current delivery was written to the socket """
+        if self.client.requests:  # request not built yet
+            return True
+
+        return len(self.client.connector.txbs) >= len(self.client.requester.msg)
+
+    def service(self, tyme, timeout):
+        """ Service the connection, returns Delivery to send again when a reused connection was found closed """
+        try:
+            self.client.service()
+        except Exception as ex:
+            return self.fail(f"error servicing connection: {ex}")
+
+        if self.delivery is None:
+            return None
+
+        self.written = self.written or not self.unwritten()
+
+        timeout = self.delivery.timeout if self.delivery.timeout is not None else timeout
+        if self.client.responses:
+            rep = self.client.respond()
+            self.delivery.complete(rep=rep._replace(body=bytearray(rep.body)))  # body buffer is reused by client
+            self.delivery = None
+            self.used = tyme
+        elif self.client.connector.cutoff:
+            return self.fail("connection closed before response")
+        elif tyme - self.delivery.queued > timeout:
+            return self.fail(f"no response after {timeout} seconds")
+
+        return None
+
+    def fail(self, error):
+        """ Close the connection after it failed, returns the current delivery when it is safe to send it again
+
+        A delivery is sent again once when a kept alive connection went stale and either no byte of the request was
+        written yet or its method is idempotent, so a request the server may have processed is never repeated.
+
+        """
+        delivery = self.delivery
+        written = self.written or (delivery is not None and not self.unwritten())
+        self.delivery = None
+        self.broken = True
+        self.close()
+        if delivery is None:
+            return None
+
+        if self.used is not None and delivery.attempts < 2 and (not written or delivery.method in self.Idempotent):
+            return delivery
+
+        delivery.complete(error=error)
+        return None
+
+    def close(self):
+        self.client.close()
+
+
+class ClientPool(doing.Doer):
+    """ Agency wide pool of keep-alive HTTP connections keyed by endpoint
+
+    Requests to the same scheme, host and port are queued and sent over at most .maxPerHost connections that are
+    kept open between requests and closed after .idleTimeout seconds without use.  Endpoints with no queued requests
+    and no open connections are forgotten.  The timeout of each request runs from when it is queued, so requests
+    still waiting for a connection when it expires fail without being sent.
+
+    """
+
+    MaxPerHost = 4
+    Timeout = 30.0
+    IdleTimeout = 60.0
+
+    def __init__(self, maxPerHost=None, timeout=None, idleTimeout=None, **kwa):
+        """ Create client pool
+
+        Parameters:
+            maxPerHost (int): maximum number of concurrent connections to one endpoint
+            timeout (float): seconds from being queued to wait for a response before failing a request
+            idleTimeout (float): seconds an unused connection is kept open
+
+        """
+        self.maxPerHost = maxPerHost if maxPerHost is not None else self.MaxPerHost
+        self.timeout = timeout if timeout is not None else self.Timeout
+        self.idleTimeout = idleTimeout if idleTimeout is not None else self.IdleTimeout
+        self.queues = dict()
+        self.connections = dict()
+        super(ClientPool, self).__init__(**kwa)
+
+    def request(self, url, method="PUT", path=None, headers=None, body=b'', timeout=None):
+        """ Queue request to endpoint url, returns Delivery
+
+        Parameters:
+            url (str): URL of the endpoint
+            method (str): HTTP method
+            path (str): request path, defaults to the path of url
+            headers (dict): request headers
+            body (bytes): request body
+            timeout (float): seconds from now to wait for the response, defaults to .timeout
+
+        """
+        up = urlparse(url)
+        if up.scheme != kering.Schemes.http and up.scheme != kering.Schemes.https:
+            raise ValueError(f"invalid scheme {up.scheme} for ClientPool")
+
+        if path is None:
+            path = up.path or "/"
+            if up.query:
+                path = f"{path}?{up.query}"
+
+        delivery = Delivery(method=method, path=path, headers=headers if headers is not None else Hict(),
+                            body=bytes(body), timeout=timeout)
+        delivery.queued = self.tyme if self.tymth is not None else None
+        self.queues.setdefault((up.scheme, up.hostname, up.port), deque()).append(delivery)
+        return delivery
+
+    def recur(self, tyme):
+        for key, queue in list(self.queues.items()):
+            self.expire(queue, tyme)
+            conns = self.connections.setdefault(key, [])
+            for conn in conns:
+                if queue and conn.delivery is None and not conn.broken:
+                    conn.start(queue.popleft())
+
+            while queue and len(conns) < self.maxPerHost:
+                conn = Connection(*key, tymth=self.tymth)
+                conn.start(queue.popleft())
+                conns.append(conn)
+
+            for conn in conns:
+                if (retry := conn.service(tyme, self.timeout)) is not None:
+                    queue.appendleft(retry)
+
+            for conn in list(conns):
+                idle = conn.delivery is None and conn.used is not None
+                if conn.broken or (idle and (conn.client.connector.cutoff or tyme - conn.used > self.idleTimeout)):
+                    conn.close()
+                    conns.remove(conn)
+
+            if not queue and not conns:  # forget endpoints no longer in use
+                del self.queues[key]
+                del self.connections[key]
+
+        return False
+
+    def expire(self, queue, tyme):
+        """ Fail the deliveries of queue that waited for a connection for longer than their timeout """
+        for _ in range(len(queue)):
+            delivery = queue.popleft()
+            if delivery.queued is None:  # queued before the pool was wound to a tymist
+                delivery.queued = tyme
+
+            timeout = delivery.timeout if delivery.timeout is not None else self.timeout
+            if tyme - delivery.queued > timeout:
+                delivery.complete(error=f"not sent within {timeout} seconds")
+            else:
+                queue.append(delivery)
+
+    def exit(self):
+        for conns in self.connections.values():
+            for conn in conns:
+                if conn.delivery is not None:
+                    conn.delivery.complete(error="client pool closed")
+                conn.close()
+        self.connections = dict()
+
+        for queue in self.queues.values():
+            for delivery in queue:
+                delivery.complete(error="client pool closed")
+            queue.clear()
+
+
+class StreamMessenger(doing.Doer):
+    """ Sends one stream of CESR messages to a recipient in a single request over the ClientPool
+
+    Drop in replacement of keri.app.agenting.HTTPStreamMessenger.
+
+    """
+
+    def __init__(self, pool, wit, url, msg=b'', headers=None, **kwa):
+        self.wit = wit
+        self.rep = None
+        headers = headers if headers is not None else {}
+        headers = Hict([
+            ("Content-Type", "application/cesr"),
+            ("Content-Length", len(msg)),
+            (httping.CESR_DESTINATION_HEADER, self.wit),
+        ] + list(headers.items()))
+
+        self.delivery = pool.request(url, method="PUT", path="/", headers=headers, body=bytes(msg))
+        super(StreamMessenger, self).__init__(**kwa)
+
+    def recur(self, tyme):
+        if self.delivery.done:
+            self.rep = self.delivery.rep
+            if self.delivery.error is not None:
+                logger.info(f"unable to deliver to {self.wit}: {self.delivery.error}")
+            return True
+
+        return False
+
+
+class Messenger(doing.Doer):
+    """ Sends each queued CESR message to a recipient as a separate request over the ClientPool
+
+    Drop in replacement of keri.app.agenting.HTTPMessenger.
+
+    """
+
+    def __init__(self, pool, hab, wit, url, msgs=None, sent=None, **kwa):
+        self.pool = pool
+        self.hab = hab
+        self.wit = wit
+        self.url = url
+        self.posted = 0
+        self.msgs = msgs if msgs is not None else decking.Deck()
+        self.sent = sent if sent is not None else decking.Deck()
+        self.deliveries = deque()
+        super(Messenger, self).__init__(**kwa)
+
+    def request(self, method, path, headers, body):
+        """ Queue request on the pool, called back for each message by httping.streamCESRRequests """
+        headers = Hict([(name, value) for name, value in headers.items() if name.lower() != "connection"])
+        self.deliveries.append(self.pool.request(self.url, method=method, path=path, headers=headers, body=body))
+
+    def recur(self, tyme):
+        while self.msgs:
+            self.posted += httping.streamCESRRequests(client=self, dest=self.wit, ims=self.msgs.popleft())
+
+        while self.deliveries and self.deliveries[0].done:
+            delivery = self.deliveries.popleft()
+            if delivery.error is not None:
+                logger.info(f"unable to deliver to {self.wit}: {delivery.error}")
+            self.sent.append(delivery.rep)
+
+        return False
+
+    @property
+    def idle(self):
+        return len(self.msgs) == 0 and self.posted == len(self.sent)
+
+
+def cesrRequests(ims, dest, path=None):
+    """ Returns list of (method, path, headers, body) of the CESR HTTP requests for each message in stream ims
+
+    Parameters:
+        ims (bytearray): stream of KERI messages with attachments, consumed
+        dest (str): qb64 identifier prefix of destination controller
+        path (str): path to post to
+
+    """
+    requests = []
+
+    class Collector:
+        @staticmethod
+        def request(method, path, headers, body):
+            headers = Hict([(name, value) for name, value in headers.items() if name.lower() != "connection"])
+            requests.append((method, path, headers, body))
+
+    httping.streamCESRRequests(client=Collector, dest=dest, ims=ims, path=path)
+    return requests
+
+
+def streamMessengerFrom(pool, hab, pre, urls, msg, headers=None):
+    """ Returns pooled StreamMessenger for HTTP endpoints, keri.app.agenting stream messenger otherwise """
+    if kering.Schemes.http in urls or kering.Schemes.https in urls:
+        url = urls[kering.Schemes.http] if kering.Schemes.http in urls else urls[kering.Schemes.https]
+        return StreamMessenger(pool=pool, wit=pre, url=url, msg=msg, headers=headers)
+
+    return agenting.streamMessengerFrom(hab=hab, pre=pre, urls=urls, msg=msg, headers=headers)
+
+
+def messengerFrom(pool, hab, pre, urls):
+    """ Returns pooled Messenger for HTTP endpoints, keri.app.agenting messenger otherwise """
+    if kering.Schemes.http in urls or kering.Schemes.https in urls:
+        url = urls[kering.Schemes.http] if kering.Schemes.http in urls else urls[kering.Schemes.https]
+        return Messenger(pool=pool, hab=hab, wit=pre, url=url)
+
+    return agenting.messengerFrom(hab=hab, pre=pre, urls=urls)
+
+
+class StreamPoster(forwarding.StreamPoster):
+    """ StreamPoster delivering over the keep-alive connections of the Agency ClientPool """
+
+    def __init__(self, pool, **kwa):
+        self.pool = pool
+        super(StreamPoster, self).__init__(**kwa)
+
+    def sendDirect(self, hab, ends, msg):
+        for ctrl, locs in ends.items():
+            self.messagers.append(streamMessengerFrom(pool=self.pool, hab=hab, pre=ctrl, urls=locs, msg=msg,
+                                                      headers=self.headers))
+
+        return self.messagers
+
+    def forward(self, hab, ends, msg, topic):
+        # If we are one of the mailboxes, just store locally in mailbox
+        owits = oset(ends.keys())
+        if self.mbx and owits.intersection(hab.prefixes):
+            self.mbx.storeMsg(topic=f"{self.recp}/{topic}".encode("utf-8"), msg=msg)
+            return []
+
+        # Its not us, randomly select a mailbox and forward it on
+        mbx, mailbox = random.choice(list(ends.items()))
+        ims = bytearray()
+        ims.extend(introduce(hab, mbx))
+        ims.extend(msg)
+
+        self.messagers.append(streamMessengerFrom(pool=self.pool, hab=hab, pre=mbx, urls=mailbox, msg=bytes(ims)))
+        return self.messagers
+
+
+class Poster(forwarding.Poster):
+    """ Poster delivering over the keep-alive connections of the Agency ClientPool """
+
+    def __init__(self, pool, **kwa):
+        self.pool = pool
+        super(Poster, self).__init__(**kwa)
+
+    def sendDirect(self, hab, ends, serder, atc):
+        for ctrl, locs in ends.items():
+            witer = messengerFrom(pool=self.pool, hab=hab, pre=ctrl, urls=locs)
+
+            msg = bytearray(serder.raw)
+            if atc is not None:
+                msg.extend(atc)
+
+            witer.msgs.append(bytearray(msg))  # make a copy
+            self.extend([witer])
+
+            while not witer.idle:
+                _ = (yield self.tock)
+
+            self.remove([witer])
+
+    def forward(self, hab, ends, recp, serder, atc, topic):
+        # If we are one of the mailboxes, just store locally in mailbox
+        owits = oset(ends.keys())
+        if self.mbx and owits.intersection(hab.prefixes):
+            msg = bytearray(serder.raw)
+            if atc is not None:
+                msg.extend(atc)
+            self.mbx.storeMsg(topic=f"{recp}/{topic}".encode("utf-8"), msg=msg)
+            return
+
+        # Its not us, randomly select a mailbox and forward it on
+        mbx, mailbox = random.choice(list(ends.items()))
+        msg = bytearray()
+        msg.extend(introduce(hab, mbx))
+
+        evt = bytearray(serder.raw)
+        evt.extend(atc)
+        fwd, atc = exchanging.exchange(route='/fwd', modifiers=dict(pre=recp, topic=topic),
+                                       payload={}, embeds=dict(evt=evt), sender=hab.pre)
+        ims = hab.endorse(serder=fwd, last=False, pipelined=False)
+
+        witer = messengerFrom(pool=self.pool, hab=hab, pre=mbx, urls=mailbox)
+        msg.extend(ims)
+        msg.extend(atc)
+
+        witer.msgs.append(bytearray(msg))  # make a copy
+        self.extend([witer])
+
+        while not witer.idle:
+            _ = (yield self.tock)
+
+        self.remove([witer])
+
+    forwardToWitness = forward
@@ -0,0 +1,258 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.serving module
+
+ASGI serving of the falcon apps of the Agency inside the hio scheduler
+"""
+import asyncio
+import collections
+import contextlib
+import io
+import sys
+
+from hio.base import doing
+from keri import kering
+
+
+class WsgiBridge:
+    """ ASGI application running a falcon WSGI app
+
+    Requests are parsed on the event loop and queued as pending, the WSGI app is only called from process, which
+    the hio doer serving the bridge calls between steps of the event loop.  Handlers therefore still run
+    synchronously on the thread running the hio doers, exactly as they do under the hio HTTP server: while a handler
+    runs neither the event loop nor any hio doer, including those of every Agent, makes progress.  Only empty chunks
+    of streamed response bodies yield to the event loop until its next step, so long polls and event streams do not
+    hold up other requests between their chunks.
+
+    """
+
+    def __init__(self, app):
+        """ Create ASGI bridge
+
+        Parameters:
+            app (falcon.App): WSGI application to serve
+
+        """
+        self.app = app
+        self.pending = collections.deque()  # (future, environ, start_response) of requests waiting for the app
+
+    def process(self):
+        """ Call the WSGI app for the oldest pending request
+
+        Returns:
+            bool: True if a request was processed, False if there was nothing pending
+
+        """
+        while self.pending:
+            future, env, start_response = self.pending.popleft()
+            if future.done():  # client went away before its turn
+                continue
+
+            try:
+                future.set_result(self.app(env, start_response))
+            except Exception as ex:
+                future.set_exception(ex)
+            return True
+
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while (message := await receive())["type"] != "lifespan.shutdown":
+                if message["type"] == "lifespan.startup":
+                    await send(dict(type="lifespan.startup.complete"))
+            await send(dict(type="lifespan.shutdown.complete"))
+            return
+
+        if scope["type"] != "http":
+            return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.extend(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+
+        disconnected = asyncio.Event()
+
+        async def watch():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        watcher = asyncio.ensure_future(watch())
+
+        response = dict()
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and response.get("sent"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                                   for name, value in headers]
+            return lambda data: None
+
+        async def start():
+            if not response.get("sent"):
+                response["sent"] = True
+                await send(dict(type="http.response.start", status=response["status"], headers=response["headers"]))
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((future, environ(scope, body), start_response))
+        try:
+            result = await future
+        except BaseException:
+            watcher.cancel()
+            raise
+
+        try:
+            for chunk in result:
+                if disconnected.is_set():
+                    break
+
+                if not chunk:  # nothing available yet, wait for the next step of the event loop
+                    await asyncio.sleep(0)
+                    continue
+
+                await start()
+                await send(dict(type="http.response.body", body=bytes(chunk), more_body=True))
+
+            if not disconnected.is_set():
+                await start()
+                await send(dict(type="http.response.body", body=b"", more_body=False))
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+            watcher.cancel()
+
+
+def environ(scope, body):
+    """ Returns WSGI environ dict for the HTTP request of ASGI scope with the complete request body
+
+    Parameters:
+        scope (dict): ASGI HTTP connection scope
+        body (bytes): request body
+
+    """
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+
+    env = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(bytes(body)),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name == "CONTENT_TYPE" or name == "CONTENT_LENGTH":
+            key = name
+        else:
+            key = f"HTTP_{name}"
+
+        env[key] = f"{env[key]},{value}" if key in env else value
+
+    if body and "CONTENT_LENGTH" not in env:  # chunked request bodies are complete by now
+        env["CONTENT_LENGTH"] = str(len(body))
+
+    return env
+
+
+class AsgiServerDoer(doing.Doer):
+    """ Serves a falcon app with uvicorn from within the hio scheduler
+
+    Every recur steps the asyncio event loop shared by all AsgiServerDoers, so uvicorn accepts connections,
+    parses requests and writes responses in between the other hio doers on the same thread.  Each step is followed
+    by at most one pending request run through the falcon app, for up to Steps steps, then the recur yields back to
+    the other hio doers.  uvicorn provides HTTP/1.1 keep-alive and bounds the number of concurrent connections and
+    tasks with limit.
+
+    Handlers are not moved off the hio thread: Agent state is shared with the doers of the Agent without any locking,
+    so a slow handler still delays the event loop and all hio doers until it returns, as under the hio HTTP server.
+
+    """
+
+    Loop = None
+    Steps = 8  # maximum number of event loop steps and requests processed per recur
+
+    def __init__(self, app, port, host="0.0.0.0", keypath=None, certpath=None, cafilepath=None, limit=None,
+                 keepAlive=5, **kwa):
+        """ Create ASGI server doer
+
+        Parameters:
+            app (falcon.App): WSGI application to serve
+            port (int): port to listen on
+            host (str): interface to listen on
+            keypath (str): optional file path to the TLS private key
+            certpath (str): optional file path to the TLS signed certificate (public key)
+            cafilepath (str): optional file path to the TLS CA certificate chain file
+            limit (int): maximum number of concurrent connections and tasks, None means no limit
+            keepAlive (int): seconds idle keep-alive connections are kept open
+
+        """
+        try:
+            import uvicorn
+        except ImportError:
+            raise kering.ConfigurationError("ASGI serving requires uvicorn, install it with 'pip install uvicorn'")
+
+        tls = keypath is not None and certpath is not None and cafilepath is not None
+        self.bridge = WsgiBridge(app)
+        config = uvicorn.Config(self.bridge, host=host, port=port, lifespan="off", log_level="warning",
+                                limit_concurrency=limit, timeout_keep_alive=keepAlive,
+                                ssl_keyfile=keypath if tls else None,
+                                ssl_certfile=certpath if tls else None,
+                                ssl_ca_certs=cafilepath if tls else None)
+        self.server = uvicorn.Server(config)
+        # Signals are handled by the hio scheduler, not by each server
+        self.server.install_signal_handlers = lambda: None
+        self.server.capture_signals = contextlib.nullcontext
+        self.task = None
+
+        super(AsgiServerDoer, self).__init__(**kwa)
+
+    @classmethod
+    def loop(cls):
+        """ Returns the asyncio event loop shared by all ASGI servers """
+        if cls.Loop is None or cls.Loop.is_closed():
+            cls.Loop = asyncio.new_event_loop()
+        return cls.Loop
+
+    def enter(self):
+        self.task = self.loop().create_task(self.server.serve())
+
+    def recur(self, tyme):
+        loop = self.loop()
+        for _ in range(self.Steps):
+            loop.run_until_complete(asyncio.sleep(0))
+            if not self.bridge.process():
+                break
+
+        if self.task.done():
+            if self.task.exception() is not None:
+                raise self.task.exception()
+            return True
+
+        return False
+
+    def exit(self):
+        if self.task is not None and not self.task.done():
+            self.server.should_exit = True
+            self.loop().run_until_complete(self.task)
@@ -0,0 +1,389 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.sharding module
+
+Multi-process Agency with the Agents of all controllers sharded over worker processes by consistent hashing
+"""
+import bisect
+import hashlib
+import http.client
+import json
+import multiprocessing
+import signal
+import socketserver
+import ssl
+import threading
+import time
+from wsgiref import simple_server
+
+import falcon
+from keri import help, kering
+from keri.app import directing
+
+from . import agenting
+from .indirecting import CESR_DESTINATION_HEADER
+from ..db import basing
+
+logger = help.ogler.getLogger()
+
+Kinds = ("admin", "http", "boot")
+
+
+class ShardError(kering.KeriError):
+    """ Raised when the Agent of a controller is not served by this shard
+
+    Usage:
+        raise ShardError("error message")
+
+    """
+
+
+def onShardError(req, rep, ex, params):
+    """ Falcon error handler answering requests for Agents served by another shard with 503 Service Unavailable
+
+    The Agent is either served by another shard, whose router will route the retried request there, or is being
+    handed off to another shard until the routes are switched over.
+
+    """
+    raise falcon.HTTPServiceUnavailable(description=str(ex), retry_after=1)
+
+
+class HashRing:
+    """ Consistent hash ring assigning controller AIDs to shards
+
+    Each shard is placed on the ring at .Replicas points so adding a shard only moves about 1/n of the controllers,
+    all of them to the new shard.
+
+    """
+
+    Replicas = 100
+
+    def __init__(self, shards, replicas=None):
+        """ Create hash ring
+
+        Parameters:
+            shards (int): number of shards
+            replicas (int): number of points of each shard on the ring
+
+        """
+        self.shards = shards
+        replicas = replicas if replicas is not None else self.Replicas
+
+        points = sorted((self.hash(f"shard-{shard}-{replica}"), shard)
+                        for shard in range(shards) for replica in range(replicas))
+        self.keys = [key for key, _ in points]
+        self.owners = [shard for _, shard in points]
+
+    @staticmethod
+    def hash(key):
+        """ Returns int position of key str on the ring """
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def shard(self, caid):
+        """ Returns int index of the shard owning the Agent of controller caid """
+        return self.owners[bisect.bisect(self.keys, self.hash(caid)) % len(self.keys)]
+
+
+def shardCount(adb):
+    """ Returns the number of shards recorded in the Agency database, None when not sharded """
+    count = adb.shrd.get(keys=("count",))
+    return int(count) if count is not None else None
+
+
+def nextShardCount(adb):
+    """ Returns the number of shards a handoff in progress moves to, None when no handoff is in progress """
+    count = adb.shrd.get(keys=("next",))
+    return int(count) if count is not None else None
+
+
+def acknowledge(adb, shard, count):
+    """ Record that shard has hibernated every Agent it no longer owns with count shards """
+    adb.shrd.pin(keys=("ack", str(shard)), val=str(count))
+
+
+def handedOff(adb, shards, count):
+    """ Returns True when the first shards shards all acknowledged the handoff to count shards """
+    return all(adb.shrd.get(keys=("ack", str(shard))) == str(count) for shard in range(shards))
+
+
+def ports(shardPort, shard):
+    """ Returns dict of the admin, http and boot ports a worker of shard listens on """
+    return {kind: shardPort + 3 * shard + offset for offset, kind in enumerate(Kinds)}
+
+
+class Router:
+    """ Reverse proxy front end forwarding each request to the worker owning its controller AID
+
+    Admin requests are routed by their Signify-Resource header, boot requests by the controller AID of the inception
+    event in their body and HTTP requests by their CESR-DESTINATION header or the AID of OOBI paths, mapped to its
+    controller through the Agency database.  Requests without a controller go to the first shard.
+
+    """
+
+    Hops = ("connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailers",
+            "transfer-encoding", "upgrade", "host")
+
+    def __init__(self, adb, shards, shardPort, host="127.0.0.1", timeout=60.0):
+        """ Create routing front end
+
+        Parameters:
+            adb (AgencyBaser): Agency database shared with the workers
+            shards (int): number of shards
+            shardPort (int): first port of the worker ports
+            host (str): host the workers listen on
+            timeout (float): seconds to wait for a worker to respond
+
+        """
+        self.adb = adb
+        self.ring = HashRing(shards)
+        self.shardPort = shardPort
+        self.host = host
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def resize(self, shards):
+        """ Route to shards workers from now on """
+        self.ring = HashRing(shards)
+
+    def app(self, kind):
+        """ Returns falcon.App forwarding all requests for the kind (admin, http or boot) of API """
+        app = falcon.App()
+
+        def sink(req, rep):
+            self.forward(kind, req, rep)
+
+        app.add_sink(sink, prefix="/")
+        return app
+
+    def caid(self, kind, req, body):
+        """ Returns qb64 controller AID the request is for, None if the request is not for a single controller """
+        if kind == "admin":
+            if (caid := req.get_header("SIGNIFY-RESOURCE")) is not None:
+                return caid
+            parts = req.path.strip("/").split("/")
+            return parts[1] if len(parts) > 1 and parts[0] == "agent" else None
+
+        if kind == "boot":
+            try:
+                return json.loads(body)["icp"]["i"]
+            except (ValueError, KeyError, TypeError):
+                return None
+
+        parts = req.path.strip("/").split("/")
+        aid = req.get_header(CESR_DESTINATION_HEADER)
+        if aid is None and len(parts) > 1 and parts[0] == "oobi":
+            aid = parts[1]
+        if aid is None:
+            return None
+
+        if (prefixer := self.adb.aids.get(keys=(aid,))) is not None:
+            return prefixer.qb64
+        if (prefixer := self.adb.ctrl.get(keys=(aid,))) is not None:
+            return prefixer.qb64
+        return aid
+
+    def shard(self, kind, req, body):
+        """ Returns int index of the shard to forward the request to """
+        caid = self.caid(kind, req, body)
+        return self.ring.shard(caid) if caid is not None else 0
+
+    def connection(self, port):
+        """ Returns kept alive HTTP connection of the current thread to the worker port """
+        if not hasattr(self.local, "connections"):
+            self.local.connections = dict()
+        if port not in self.local.connections:
+            self.local.connections[port] = http.client.HTTPConnection(self.host, port, timeout=self.timeout)
+        return self.local.connections[port]
+
+    def forward(self, kind, req, rep):
+        """ Forward the request to the worker owning it and stream back the response """
+        body = req.bounded_stream.read()
+        port = ports(self.shardPort, self.shard(kind, req, body))[kind]
+        headers = {name: value for name, value in req.headers.items() if name.lower() not in self.Hops}
+
+        for attempt in range(2):  # a kept alive connection may have been closed by the worker meanwhile
+            conn = self.connection(port)
+            try:
+                conn.request(req.method, req.relative_uri, body=body or None, headers=headers)
+                res = conn.getresponse()
+                break
+            except (http.client.HTTPException, OSError) as ex:
+                conn.close()
+                if attempt:
+                    raise falcon.HTTPBadGateway(description=f"shard on port {port} unavailable: {ex}")
+
+        rep.status = res.status
+        for name, value in res.getheaders():
+            if name.lower() not in self.Hops:
+                rep.append_header(name, value)
+
+        def stream():
+            try:
+                while chunk := res.read1(65536):
+                    yield chunk
+            finally:
+                res.close()
+                if res.will_close:
+                    conn.close()
+
+        rep.stream = stream()
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, simple_server.WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(simple_server.WSGIRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+class Supervisor:
+    """ Runs a routing front end and one Agency worker process per shard
+
+    Workers are started with the spawn method so they never share an LMDB environment opened by the supervisor.  The
+    number of shards is recorded in the Agency database, from which workers pick up changes to hibernate Agents they
+    no longer own.  SIGUSR1 adds a worker, rebalancing about 1/n of the controllers onto it with a handoff: the next
+    number of shards is recorded first, every existing worker hibernates the Agents moving away and acknowledges,
+    and only then are the number of shards and the routes switched over.
+
+    """
+
+    def __init__(self, name, base, bran, workers, admin, http, boot, shardPort, keypath=None, certpath=None,
+                 cafilepath=None, **kwa):
+        """ Create supervisor
+
+        Parameters:
+            name (str): name of the Agency
+            base (str): optional prefix to file location of KERI databases
+            bran (str): passcode of the Agency
+            workers (int): number of worker processes
+            admin (int): public admin API port
+            http (int): public HTTP API port
+            boot (int): public boot API port
+            shardPort (int): first port of the internal ports the workers listen on, three per worker
+            keypath (str): optional file path to the TLS private key of the public ports
+            certpath (str): optional file path to the TLS signed certificate of the public ports
+            cafilepath (str): optional file path to the TLS CA certificate chain of the public ports
+            kwa (dict): further keyword arguments of agenting.setup for the workers
+
+        """
+        self.name = name
+        self.base = base
+        self.bran = bran
+        self.workers = workers
+        self.public = dict(admin=admin, http=http, boot=boot)
+        self.shardPort = shardPort
+        self.keypath = keypath
+        self.certpath = certpath
+        self.cafilepath = cafilepath
+        self.kwa = kwa
+
+        self.context = multiprocessing.get_context("spawn")
+        self.procs = []
+        self.servers = []
+        self.grow = False
+        self.handoff = None  # number of shards a handoff in progress moves to
+        self.adb = None
+        self.router = None
+
+    def spawn(self, shard):
+        """ Start the worker process of shard """
+        proc = self.context.Process(target=runWorker, name=f"{self.name}-shard-{shard}",
+                                    kwargs=dict(name=self.name, base=self.base, bran=self.bran, shard=shard,
+                                                ports=ports(self.shardPort, shard), kwa=self.kwa))
+        proc.start()
+        return proc
+
+    def add(self):
+        """ Add a worker and start handing its share of the controllers off to it """
+        shard = len(self.procs)
+        self.procs.append(self.spawn(shard))
+        self.adb.shrd.trim(keys=("ack", ""))
+        self.adb.shrd.pin(keys=("next",), val=str(len(self.procs)))
+        self.handoff = len(self.procs)
+        logger.info("Added shard %s, handing off to %s shards", shard, len(self.procs))
+
+    def complete(self):
+        """ Switch the number of shards and the routes over once all previous shards acknowledged the handoff
+
+        Returns:
+            bool: True means the handoff in progress completed
+
+        """
+        if self.handoff is None or not handedOff(self.adb, self.handoff - 1, self.handoff):
+            return False
+
+        self.adb.shrd.pin(keys=("count",), val=str(self.handoff))
+        self.adb.shrd.rem(keys=("next",))
+        self.router.resize(self.handoff)
+        logger.info("Handoff complete, %s shards", self.handoff)
+        self.handoff = None
+        return True
+
+    def serve(self, kind, app):
+        """ Start a threaded front end server for kind of API on its public port """
+        server = simple_server.make_server("", self.public[kind], app, server_class=ThreadingWSGIServer,
+                                           handler_class=QuietHandler)
+        if self.keypath is not None and self.certpath is not None and self.cafilepath is not None:
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH, cafile=self.cafilepath)
+            context.load_cert_chain(certfile=self.certpath, keyfile=self.keypath)
+            server.socket = context.wrap_socket(server.socket, server_side=True)
+
+        thread = threading.Thread(target=server.serve_forever, name=f"{self.name}-{kind}", daemon=True)
+        thread.start()
+        self.servers.append(server)
+
+    def run(self):
+        """ Run workers and front end until interrupted, restarting workers that exit """
+        self.adb = basing.AgencyBaser(name="TheAgency", base=self.base, reopen=True)
+        self.adb.shrd.pin(keys=("count",), val=str(self.workers))
+        self.adb.shrd.rem(keys=("next",))
+        self.adb.shrd.trim(keys=("ack", ""))
+        self.procs = [self.spawn(shard) for shard in range(self.workers)]
+
+        self.router = Router(adb=self.adb, shards=self.workers, shardPort=self.shardPort)
+        for kind in Kinds:
+            self.serve(kind, self.router.app(kind))
+
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: setattr(self, "grow", True))
+
+        print(f"The Agency is sharded over {self.workers} workers and waiting for requests...")
+        try:
+            while True:
+                self.complete()
+                if self.grow and self.handoff is None:
+                    self.grow = False
+                    self.add()
+
+                for shard, proc in enumerate(self.procs):
+                    if not proc.is_alive():
+                        logger.error("Shard %s exited with %s, restarting", shard, proc.exitcode)
+                        self.procs[shard] = self.spawn(shard)
+
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        """ Stop front end servers and workers """
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        for proc in self.procs:
+            proc.terminate()
+        for proc in self.procs:
+            proc.join()
+        if self.adb is not None:
+            self.adb.close()
+
+
+def runWorker(name, base, bran, shard, ports, kwa):
+    """ Run the Agency of shard, listening on the internal ports of the worker """
+    doers = agenting.setup(name=name, base=base, bran=bran, adminPort=ports["admin"], httpPort=ports["http"],
+                           bootPort=ports["boot"], shard=shard, **kwa)
+    directing.runController(doers=doers, expire=0.0)
@@ -0,0 +1,327 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.streaming module
+
+Server-Sent Events stream of agent events to the controller of the agent
+"""
+import json
+import time
+
+import falcon
+from hio.base import doing
+from keri.db import dbing, subing
+from keri.help import helping
+
+from ..db import basing
+
+
+def loadEnds(app):
+    streamEnd = StreamEnd()
+    app.add_route("/stream", streamEnd)
+
+
+class EventLog(dbing.LMDBer):
+    """ Persisted event log of an Agent and the positions in the databases of the Agent it was last updated from
+
+    Events are keyed by their zero padded hexadecimal ordinal event ID so IDs keep increasing across reloads of the
+    Agent and streams can resume with the Last-Event-ID header of an event logged before the Agent was reloaded.
+
+    """
+    TailDirPath = "keri/evts"
+    AltTailDirPath = ".keri/evts"
+    TempPrefix = "keri_evts_"
+
+    def __init__(self, name="evts", headDirPath=None, reopen=True, **kwa):
+        self.evts = None
+        self.curs = None
+        self.stts = None
+
+        super(EventLog, self).__init__(name=name, headDirPath=headDirPath, reopen=reopen, **kwa)
+
+    def reopen(self, **kwa):
+        """  Reopen database and initialize sub-dbs
+        """
+        super(EventLog, self).reopen(**kwa)
+
+        # JSON data of events keyed by (event ID, event type)
+        self.evts = subing.Suber(db=self, subkey='evts.')
+
+        # Positions in the operation and notification databases events were last logged up to, keyed by source
+        self.curs = subing.Suber(db=self, subkey='curs.')
+
+        # SAID of the latest event of each identifier in the key state the last state events were logged for
+        self.stts = subing.Suber(db=self, subkey='stts.')
+
+        return self.env
+
+    def last(self):
+        """ Returns ID of the last event in the log, 0 when the log is empty """
+        with self.env.begin(db=self.evts.sdb, write=False) as txn:
+            cursor = txn.cursor()
+            if not cursor.last():
+                return 0
+
+            return int(bytes(cursor.key()).split(b".")[0], 16)
+
+
+class Streamer(doing.Doer):
+    """ Collects the events of an Agent into a bounded persisted log that any number of event streams read from
+
+    All change detection is done once per Agent no matter how many streams are connected, and only while at least one
+    stream is open: the databases of the Agent are only examined when the LMDB last transaction ID of one of them
+    changed since the previous pass.  Operations and notifications are read from the position in their database the
+    previous pass stopped at and key states are compared to the key state the last state events were logged for, so
+    changes made while no stream is open, even before the Agent was reloaded, become events when the next stream
+    opens.  The log holds the last MaxEvents events so reconnecting streams can resume with the Last-Event-ID header.
+
+    Events:
+        operation: a long running operation completed, data is the final status of the operation
+        notification: a notification was added, data is the notification
+        state: the key state of an identifier changed, either by accepting a new event or by an event leaving escrow
+
+    """
+
+    MaxEvents = 1000
+    Lease = 5.0
+
+    def __init__(self, hby, monitor, notifier, log=None, tock=0.25):
+        """ Create event collector for an Agent
+
+        Parameters:
+            hby (Habery): identifier database environment
+            monitor (Monitor): long running operation monitor
+            notifier (Notifier): notifications to the controller of the agent
+            log (EventLog): persisted event log
+            tock (float): seconds between checks for changes
+
+        """
+        self.hby = hby
+        self.monitor = monitor
+        self.notifier = notifier
+        self.log = log if log is not None else EventLog(name=hby.name, temp=hby.temp)
+
+        self.eid = self.log.last()
+        self.stamp = None
+        self.subscribers = dict()  # StreamIterable -> perf_counter of its last read
+
+        super(Streamer, self).__init__(tock=tock)
+
+    @property
+    def active(self):
+        """ True when at least one stream read from the log within the last Lease seconds """
+        now = time.perf_counter()
+        for stream in [stream for stream, read in self.subscribers.items() if now - read > self.Lease]:
+            del self.subscribers[stream]  # the server dropped the stream without closing it
+
+        return len(self.subscribers) > 0
+
+    def subscribe(self, stream):
+        """ Keep the Streamer active for stream, catching up on changes made while no stream was open """
+        if not self.active:
+            self.update()
+
+        self.subscribers[stream] = time.perf_counter()
+
+    def unsubscribe(self, stream):
+        self.subscribers.pop(stream, None)
+
+    def recur(self, tyme=None):
+        """ Append the events of all changes since the last pass to the log while streams are open """
+        if self.active:
+            self.update()
+
+        return False
+
+    def update(self):
+        """ Append the events of all changes since the last pass to the log
+
+        The first pass ever of an Agent only records the positions of the existing operations, notifications and key
+        states without logging events for them.
+
+        """
+        stamp = (self.monitor.stamp(), self.notifier.noter.env.info()["last_txnid"])
+        if stamp == self.stamp:
+            return False
+
+        seeding = self.log.curs.get(keys=("seeded",)) is None
+        self.stamp = stamp
+
+        self.operations(seeding)
+        self.notifications(seeding)
+        self.keyStates(seeding)
+
+        if seeding:
+            self.log.curs.pin(keys=("seeded",), val=helping.nowIso8601())
+
+    def push(self, event, data):
+        """ Append event to the log, dropping the oldest event once the log holds more than MaxEvents events
+
+        Parameters:
+            event (str): type of the event
+            data (dict): JSON serializable payload of the event
+
+        """
+        self.eid += 1
+        self.log.evts.pin(keys=(f"{self.eid:032x}", event), val=json.dumps(data))
+        if self.eid <= self.MaxEvents:
+            return
+
+        keep = f"{self.eid - self.MaxEvents + 1:032x}".encode("utf-8")
+        for key, _ in list(basing.seekItemIter(self.log.evts, vals=False, stop=lambda key: key >= keep)):
+            self.log.evts.rem(keys=tuple(key.split(".", 1)))
+
+    def since(self, eid):
+        """ Returns list of (eid, event, data) tuples of the events in the log after event eid """
+        if eid >= self.eid:
+            return []
+
+        events = []
+        for key, val in basing.seekItemIter(self.log.evts, start=f"{max(eid, 0) + 1:032x}"):
+            ordinal, event = key.split(".", 1)
+            events.append((int(ordinal, 16), event, val.encode("utf-8")))
+
+        return events
+
+    def operations(self, seeding=False):
+        """ Push an operation event for each operation that completed since the last pass """
+        for name in list(self.monitor.names(done=False)):
+            try:
+                self.monitor.get(name)  # stores the terminal status of operations that completed
+            except Exception:
+                continue
+
+        opds = self.monitor.opr.opds
+        after = self.log.curs.get(keys=("operation",))
+        for key, name in basing.seekItemIter(opds, after=(after, "") if after is not None else None):
+            self.log.curs.pin(keys=("operation",), val=key)
+            if not seeding and (operation := self.monitor.get(name)) is not None:
+                self.push("operation", operation.to_dict())
+
+    def notifications(self, seeding=False):
+        """ Push a notification event for each notification added since the last pass """
+        notes = self.notifier.noter.notes
+        after = self.log.curs.get(keys=("notification",))
+        for key, val in basing.seekItemIter(notes, after=(after, "") if after is not None else None):
+            self.log.curs.pin(keys=("notification",), val=key)
+            if not seeding:
+                self.push("notification", notes.klas(raw=val.encode("utf-8")).pad)
+
+    def keyStates(self, seeding=False):
+        """ Push a state event for each identifier whose key state changed since the last pass """
+        for (pre,), ksr in self.hby.db.states.getItemIter():
+            if self.log.stts.get(keys=(pre,)) == ksr.d:
+                continue
+
+            self.log.stts.pin(keys=(pre,), val=ksr.d)
+            if not seeding:
+                self.push("state", dict(i=pre, s=ksr.s, d=ksr.d))
+
+
+class StreamIterable:
+    """ Server-Sent Events response body reading from the event log of a Streamer
+
+    Yields empty chunks, which the HTTP server skips without blocking, while there are no new events.  The stream ends
+    after Timeout seconds so the client reconnects with the Last-Event-ID header and authenticates again.
+
+    """
+
+    Timeout = 600
+    KeepAlive = 30
+
+    def __init__(self, streamer, eid=None, retry=5000):
+        """ Create event stream
+
+        Parameters:
+            streamer (Streamer): event log of the agent
+            eid (int): ID of the last event already received, None means only stream new events
+            retry (int): milliseconds clients should wait before reconnecting
+
+        """
+        self.streamer = streamer
+        self.streamer.subscribe(self)  # catch up first so only later changes are new to this stream
+        self.eid = min(eid, streamer.eid) if eid is not None else streamer.eid
+        self.retry = retry
+        self.start = self.beat = None
+
+    def __iter__(self):
+        self.start = self.beat = time.perf_counter()
+        self.streamer.subscribe(self)
+        return self
+
+    def __next__(self):
+        now = time.perf_counter()
+        if now - self.start >= self.Timeout:
+            self.close()
+            raise StopIteration
+
+        self.streamer.subscribers[self] = now
+
+        if self.beat == self.start:
+            self.beat = now
+            return f"retry: {self.retry}\n\n".encode("utf-8")
+
+        data = bytearray()
+        for eid, event, payload in self.streamer.since(self.eid):
+            data.extend(f"id: {eid}\nevent: {event}\ndata: ".encode("utf-8"))
+            data.extend(payload)
+            data.extend(b"\n\n")
+            self.eid = eid
+
+        if not data and now - self.beat >= self.KeepAlive:
+            data.extend(b": keep-alive\n\n")
+
+        if data:
+            self.beat = now
+
+        return bytes(data)
+
+    def close(self):
+        self.streamer.unsubscribe(self)
+
+
+class StreamEnd:
+    """ Server-Sent Events endpoint for the controller of an agent """
+
+    @staticmethod
+    def on_get(req, rep):
+        """ Event stream GET endpoint
+
+        Parameters:
+            req: falcon.Request HTTP request
+            rep: falcon.Response HTTP response
+
+        ---
+        summary: Stream agent events as Server-Sent Events
+        description: Stream completions of long running operations (operation), new notifications (notification)
+                     and key state changes (state) as they happen.  Reconnecting clients resume with the id of the
+                     last event received in the Last-Event-ID header.
+        tags:
+           - Events
+        parameters:
+          - in: header
+            name: Last-Event-ID
+            schema:
+              type: integer
+            required: false
+            description: id of the last event received on a previous connection
+        responses:
+           200:
+              description: text/event-stream of agent events
+           400:
+              description: invalid Last-Event-ID header
+
+        """
+        agent = req.context.agent
+
+        eid = req.get_header("Last-Event-ID")
+        if eid is not None:
+            try:
+                eid = int(eid)
+            except ValueError:
+                raise falcon.HTTPBadRequest(description=f"invalid Last-Event-ID {eid}")
+
+        rep.status = falcon.HTTP_200
+        rep.content_type = "text/event-stream"
+        rep.set_header("Cache-Control", "no-cache")
+        rep.stream = StreamIterable(streamer=agent.streamer, eid=eid)
@@ -4,6 +4,8 @@ KERIA
 keria.core.authing module
 
 """
+import datetime
+from collections import OrderedDict
 from urllib.parse import quote, unquote
 import falcon
 from hio.help import Hict
@@ -19,17 +21,29 @@ class Authenticater:
                      "@path",
                      "Signify-Timestamp"]
 
-    def __init__(self, agency):
+    DefaultSkew = 300.0
+    DefaultWindow = 5.0
+    DefaultSize = 1024
+
+    def __init__(self, agency, skew=None, window=DefaultWindow, size=DefaultSize):
         """ Create Agent Authenticator for verifying requests and signing responses
 
         Parameters:
             agency(Agency): habitat of Agent for signing responses
+            skew (float): maximum seconds the Signify-Timestamp of a request may differ from now, None means
+                          timestamps are not checked
+            window (float): seconds a verified request is remembered so identical retries skip verification
+            size (int): maximum number of verified requests remembered
 
         Returns:
               Authenicator:  the configured habery
 
         """
         self.agency = agency
+        self.skew = skew
+        self.window = window
+        self.size = size
+        self.verified = OrderedDict()
 
     @staticmethod
     def resource(request):
@@ -39,6 +53,28 @@ class Authenticater:
 
         return headers["SIGNIFY-RESOURCE"]
 
+    def fresh(self, request):
+        """ Ensure the Signify-Timestamp of the request is within .skew seconds of now
+
+        Parameters:
+            request (Request): falcon HTTP request to check
+
+        Raises:
+            AuthNError: if the timestamp is missing, invalid or stale
+
+        """
+        headers = request.headers
+        if "SIGNIFY-TIMESTAMP" not in headers:
+            raise kering.AuthNError("missing signify timestamp")
+
+        try:
+            dt = helping.fromIso8601(headers["SIGNIFY-TIMESTAMP"])
+        except ValueError:
+            raise kering.AuthNError("invalid signify timestamp")
+
+        if abs(helping.nowUTC() - dt) > datetime.timedelta(seconds=self.skew):
+            raise kering.AuthNError(f"stale signify timestamp {headers['SIGNIFY-TIMESTAMP']}")
+
     def verify(self, request):
         headers = request.headers
         if "SIGNATURE-INPUT" not in headers or "SIGNATURE" not in headers:
@@ -57,6 +93,28 @@ class Authenticater:
         if not inputs:
             return False
 
+        if self.skew is not None:
+            self.fresh(request)
+
+        resource = self.resource(request)
+        agent = self.agency.get(resource)
+
+        if agent is None:
+            raise kering.AuthNError("unknown or invalid controller")
+
+        if resource not in agent.agentHab.kevers:
+            raise kering.AuthNError("unknown or invalid controller")
+
+        ckever = agent.agentHab.kevers[resource]
+
+        # Identical requests against the same key state were already verified
+        vkey = (resource, ckever.serder.said, request.method, request.path, tuple(sorted(headers.items())))
+        dtnow = helping.nowUTC()
+        if (expires := self.verified.get(vkey)) is not None:
+            if dtnow <= expires:
+                return True
+            del self.verified[vkey]
+
         for inputage in inputs:
             items = []
             for field in inputage.fields:
@@ -92,21 +150,15 @@ class Authenticater:
             items.append(f'"@signature-params: {params}"')
             ser = "\n".join(items).encode("utf-8")
 
-            resource = self.resource(request)
-            agent = self.agency.get(resource)
-
-            if agent is None:
-                raise kering.AuthNError("unknown or invalid controller")
-
-            if resource not in agent.agentHab.kevers:
-                raise kering.AuthNError("unknown or invalid controller")
-
-            ckever = agent.agentHab.kevers[resource]
             signages = ending.designature(signature)
             cig = signages[0].markers[inputage.name]
             if not ckever.verfers[0].verify(sig=cig.raw, ser=ser):
                 raise kering.AuthNError(f"Signature for {inputage} invalid")
 
+        self.verified[vkey] = dtnow + datetime.timedelta(seconds=self.window)
+        while len(self.verified) > self.size:
+            self.verified.popitem(last=False)
+
         return True
 
     def sign(self, agent, headers, method, path, fields=None):
@@ -5,6 +5,8 @@ keria.core.httping module
 
 """
 
+import time
+
 import falcon
 from falcon.http_status import HTTPStatus
 
@@ -18,6 +20,36 @@ class HandleCORS(object):
             raise HTTPStatus(falcon.HTTP_200, body='\n')
 
 
+class LeasedBody:
+    """ Response body holding a lease in leases while the HTTP server is still reading from it
+
+    The HTTP server does not close response bodies it stops reading from, so instead of releasing the lease when the
+    client goes away the lease records the perf_counter of the last read and owners of leases treat leases not renewed
+    within their lease time as released.
+
+    """
+
+    def __init__(self, body, leases):
+        """ Create leased response body
+
+        Parameters:
+            body (Iterable): response body to stream
+            leases (dict): LeasedBody -> perf_counter of its last read, of the owner of the resources body reads
+
+        """
+        self.body = body
+        self.leases = leases
+        self.leases[self] = time.perf_counter()
+
+    def __iter__(self):
+        try:
+            for chunk in self.body:
+                self.leases[self] = time.perf_counter()
+                yield chunk
+        finally:
+            self.leases.pop(self, None)
+
+
 def getRequiredParam(body, name):
     param = body.get(name)
     if param is None:
@@ -5,6 +5,8 @@ keria.core.longrunning module
 
 """
 import datetime
+import itertools
+import time
 from collections import namedtuple
 from dataclasses import dataclass, asdict
 
@@ -14,16 +16,19 @@ from dataclasses_json import dataclass_json
 from keri import kering
 from keri.app.oobiing import Result
 from keri.core import eventing, coring, serdering
-from keri.db import dbing, koming
+from keri.db import dbing, koming, subing
 from keri.help import helping
 
+from . import httping
+from ..db import basing
+
 # long running operationt types
 Typeage = namedtuple("Tierage", 'oobi witness delegation group query registry credential endrole challenge exchange '
-                                'done')
+                                'reindex done')
 
 OpTypes = Typeage(oobi="oobi", witness='witness', delegation='delegation', group='group', query='query',
                   registry='registry', credential='credential', endrole='endrole', challenge='challenge',
-                  exchange='exchange', done='done')
+                  exchange='exchange', reindex='reindex', done='done')
 
 
 @dataclass_json
@@ -67,6 +72,9 @@ class Operator(dbing.LMDBer):
             kwa:
         """
         self.ops = None
+        self.rets = None
+        self.opis = None
+        self.opds = None
         self.msgs = None
 
         super(Operator, self).__init__(name=name, headDirPath=headDirPath, reopen=reopen, **kwa)
@@ -79,6 +87,21 @@ class Operator(dbing.LMDBer):
         # Long running operations, keyed by "name" which is f"{type}.{oid}"
         self.ops = koming.Komer(db=self, subkey='opr.', schema=Op, )
 
+        # Terminal status of completed long running operations, keyed by "name"
+        self.rets = koming.Komer(db=self, subkey='rets.', schema=Operation, )
+
+        # Index of long running operation names by state and type, keyed by (state, type, name) where state is
+        # "pending" or "done".  Values are the name of pending and the completion datetime of done operations
+        self.opis = subing.Suber(db=self, subkey='opis.')
+
+        # Names of completed long running operations in order of completion, keyed by (completion datetime, name)
+        self.opds = subing.Suber(db=self, subkey='opds.')
+
+        # Operations stored before the index existed are all pending until their status is calculated again
+        if next(self.opis.getItemIter(), None) is None:
+            for _, op in self.ops.getItemIter():
+                self.opis.pin(keys=("pending", op.type, f"{op.type}.{op.oid}"), val=f"{op.type}.{op.oid}")
+
         return self.env
 
 
@@ -93,16 +116,18 @@ class Monitor:
     """
 
     def __init__(self, hby, swain, counselor=None, registrar=None, exchanger=None, credentialer=None, opr=None,
-                 temp=False):
+                 seekers=None, temp=False):
         """ Create long running operation monitor
 
         Parameters:
             hby (Habery): identifier database environment
             swain(Sealer): Delegation processes tracker
             opr (Operator): long running operations database
+            seekers (dict): Seeker or ExnSeeker by name of the index they maintain, for reindex operations
 
         """
         self.hby = hby
+        self.seekers = seekers if seekers is not None else dict()
         self.swain = swain
         self.counselor = counselor
         self.registrar = registrar
@@ -110,6 +135,21 @@ class Monitor:
         self.credentialer = credentialer
         self.opr = opr if opr is not None else Operator(name=hby.name, temp=temp)
 
+    def stamp(self):
+        """ Returns tuple of the last committed transaction IDs of the databases operations complete in
+
+        Every component that completes an operation (Kevery, Counselor, Sealer, Registrar, Credentialer, Exchanger
+        and the Seekers) records its progress with a committed write to one of these databases, so an unchanged stamp
+        means no operation status can have changed other than by timing out.
+
+        """
+        dbs = [self.hby.db, self.opr]
+        if self.registrar is not None:
+            dbs.append(self.registrar.rgy.reger)
+        dbs.extend(self.seekers.values())
+
+        return tuple(db.env.info()["last_txnid"] if db.env is not None else None for db in dbs)
+
     def submit(self, oid, typ, metadata=None):
         """  Submit a new long running operation to track
 
@@ -130,43 +170,138 @@ class Monitor:
 
         # Overwrite any existing long running operation of this type for this resource.
         # resets the clock basically
+        self.unindex(name, typ)
         self.opr.ops.pin(keys=(name,), val=op)
+        self.opr.opis.pin(keys=("pending", typ, name), val=name)
 
         # Return Operation with full status check in case its already finished.
         return self.get(name)
 
     def get(self, name):
+        """ Returns status of the long running operation represented by name, None if not found
+
+        The status of completed operations is loaded as stored when they completed, only pending operations are
+        calculated again.
+
+        """
+        if (operation := self.opr.rets.get(keys=(name,))) is not None:
+            return operation
+
         if (op := self.opr.ops.get(keys=(name,))) is None:
             return None
 
         operation = self.status(op)
+        if operation.done:
+            self.complete(op, operation)
 
         return operation
 
+    def complete(self, op, operation):
+        """ Store the terminal status of a completed operation and move it to the done index
+
+        Parameters:
+            op (Op): database storage for long running operation
+            operation (Operation): terminal status of the operation
+
+        """
+        name = f"{op.type}.{op.oid}"
+        dt = helping.nowIso8601()
+        self.opr.rets.pin(keys=(name,), val=operation)
+        self.opr.opis.rem(keys=("pending", op.type, name))
+        self.opr.opis.pin(keys=("done", op.type, name), val=dt)
+        self.opr.opds.pin(keys=(dt, name), val=name)
+
+    def unindex(self, name, typ):
+        """ Remove terminal status and index entries of the long running operation represented by name
+
+        Parameters:
+            name (str): long running operation resource name
+            typ (str): long running operation type
+
+        """
+        if (dt := self.opr.opis.get(keys=("done", typ, name))) is not None:
+            self.opr.opds.rem(keys=(dt, name))
+        self.opr.rets.rem(keys=(name,))
+        self.opr.opis.rem(keys=("pending", typ, name))
+        self.opr.opis.rem(keys=("done", typ, name))
+
+    def names(self, done, type=None):
+        """ Returns generator of names of long running operations in the done or pending state
+
+        Parameters:
+            done (bool): True means names of completed operations, False names of pending operations
+            type (str): optional long running operation type to filter by
+
+        """
+        prefix = "done." if done else "pending."
+        if type is not None:
+            prefix += f"{type}."
+
+        for keys, _ in self.opr.opis.getItemIter(keys=prefix):
+            yield ".".join(keys[2:])
+
     def getOperations(self, type=None):
-        """ Return list of long running opterations, optionally filtered by type """
-        ops = self.opr.ops.getItemIter()
-        if type != None:
-            ops = filter(lambda i: i[1].type == type, ops)
+        """ Return list of long running opterations, optionally filtered by type
+
+        Only pending operations have their status calculated, completed ones are loaded as stored.
 
-        def get_status(op):
+        """
+        def get_status(name):
             try:
-                return self.status(op)
+                return self.get(name)
             except Exception as err:
                 # self.status may throw an exception.
                 # Handling error by returning an operation with error status
+                op = self.opr.ops.get(keys=(name,))
                 return Operation(
-                    name=f"{op.type}.{op.oid}",
-                    metadata=op.metadata,
+                    name=name,
+                    metadata=op.metadata if op is not None else None,
                     done=True,
                     error=Status(code=500, message=f"{err}"))
 
-        return [get_status(op) for (_, op) in ops]
+        operations = [self.opr.rets.get(keys=(name,)) for name in self.names(done=True, type=type)]
+        operations.extend(get_status(name) for name in list(self.names(done=False, type=type)))
+
+        return sorted((operation for operation in operations if operation is not None), key=lambda o: o.name)
 
     def rem(self, name):
         """ Remove tracking of the long running operation represented by name """
+        if (op := self.opr.ops.get(keys=(name,))) is not None:
+            self.unindex(name, op.type)
+
         return self.opr.ops.rem(keys=(name,))
 
+    def sweep(self, ttl=None, maxOps=None, limit=100):
+        """ Remove completed long running operations past their retention, oldest completion first
+
+        Pending operations are never removed.  At most limit operations are removed per call so large backlogs are
+        collected incrementally.
+
+        Parameters:
+            ttl (float): seconds completed operations are retained, None means no time limit
+            maxOps (int): maximum number of operations retained, None means no limit
+            limit (int): maximum number of operations to remove
+
+        Returns:
+            int: number of operations removed
+
+        """
+        count = 0
+        if ttl is not None:
+            cutoff = helping.toIso8601(helping.nowUTC() - datetime.timedelta(seconds=ttl)).encode("utf-8")
+            expired = basing.seekItemIter(self.opr.opds, stop=lambda key: key >= cutoff)
+            for name in [name for _, name in itertools.islice(expired, limit)]:
+                count += 1 if self.rem(name) else 0
+
+        if maxOps is not None and count < limit:
+            excess = min(basing.tableCount(self.opr.ops) - maxOps, limit - count)
+            if excess > 0:
+                oldest = [name for _, name in itertools.islice(basing.seekItemIter(self.opr.opds), excess)]
+                for name in oldest:
+                    count += 1 if self.rem(name) else 0
+
+        return count
+
     def status(self, op):
         """  Calculate the status of an operation.
 
@@ -391,6 +526,18 @@ class Monitor:
             else:
                 operation.done = False
 
+        elif op.type in (OpTypes.reindex,):
+            if op.oid not in self.seekers:
+                raise kering.ValidationError(f"long running {op.type} operation index {op.oid} not found")
+
+            rec = self.seekers[op.oid].reidx.get(keys=("table",))
+            if rec is not None and rec.done:
+                operation.done = True
+                operation.response = dict(count=rec.count)
+            else:
+                operation.done = False
+                operation.metadata = dict(op.metadata or {}, count=rec.count if rec is not None else 0)
+
         elif op.type in (OpTypes.done, ):
             operation.done = True
             operation.response = op.metadata["response"]
@@ -437,15 +584,93 @@ class OperationCollectionEnd:
         rep.status = falcon.HTTP_200
 
 
+class OperationIterable:
+    """ Response body of a long polled operation
+
+    Yields empty chunks, which the HTTP server skips without blocking, until the operation is done or the wait
+    elapses and then yields the JSON of the operation.  The status of the operation is only recalculated when the
+    stamp of the Monitor changes, that is when a component commits progress to one of the databases operations
+    complete in, and once more when the wait elapses.  The stamp itself is checked at most every MinBackoff
+    seconds, backing off exponentially up to MaxBackoff seconds while it stays unchanged.
+
+    """
+
+    MinBackoff = 0.05
+    MaxBackoff = 1.0
+
+    def __init__(self, monitor, name, operation, wait):
+        """ Create long poll response body
+
+        Parameters:
+            monitor (Monitor): long running operation monitor
+            name (str): long running operation resource name
+            operation (Operation): current status of the operation
+            wait (float): maximum seconds to wait for the operation to complete
+
+        """
+        self.monitor = monitor
+        self.name = name
+        self.operation = operation
+        self.wait = wait
+        self.stamp = monitor.stamp()
+        self.end = None
+        self.backoff = self.MinBackoff
+        self.check = None
+
+    def __iter__(self):
+        now = time.perf_counter()
+        self.end = now + self.wait
+        self.check = now + self.backoff
+        return self
+
+    def __next__(self):
+        if self.operation is None:
+            raise StopIteration
+
+        now = time.perf_counter()
+        elapsed = now >= self.end
+        if elapsed:
+            self.refresh()
+        elif now >= self.check:
+            if (stamp := self.monitor.stamp()) != self.stamp:
+                self.stamp = stamp
+                self.backoff = self.MinBackoff
+                self.refresh()
+            else:
+                self.backoff = min(self.backoff * 2, self.MaxBackoff)
+            self.check = now + self.backoff
+
+        if not (elapsed or self.operation.done):
+            return b""
+
+        data = self.operation.to_json().encode("utf-8")
+        self.operation = None
+        return data
+
+    def refresh(self):
+        """ Recalculate status of the operation, keeping the last status if the operation was removed meanwhile """
+        try:
+            if (operation := self.monitor.get(self.name)) is not None:
+                self.operation = operation
+        except Exception as err:
+            self.operation = Operation(name=self.name, metadata=self.operation.metadata, done=True,
+                                       error=Status(code=500, message=f"{err}"))
+
+
 class OperationResourceEnd:
     """ Single Resource REST endpoint for long running operations
 
     """
 
-    @staticmethod
-    def on_get(req, rep, name):
+    MaxWait = 30.0
+
+    def on_get(self, req, rep, name):
         """  GET single resource REST endpoint
 
+        The optional wait query parameter long polls the operation: when the operation is not yet done the response is
+        held back until the operation completes or wait seconds (at most MaxWait) elapse, returning the status of the
+        operation at that time.
+
         Parameters:
             req (Request):  Falcon HTTP Request object
             rep (Response): Falcon HTTP Response object
@@ -453,12 +678,22 @@ class OperationResourceEnd:
 
         """
         agent = req.context.agent
+        try:
+            wait = min(float(req.params.get("wait", 0)), self.MaxWait)
+        except ValueError:
+            raise falcon.HTTPBadRequest(description=f"invalid wait {req.params.get('wait')}, must be a number of "
+                                                    f"seconds")
+
         if (operation := agent.monitor.get(name)) is None:
             raise falcon.HTTPNotFound(title=f"long running operation '{name}' not found")
 
         rep.content_type = "application/json"
-        rep.data = operation.to_json().encode("utf-8")
         rep.status = falcon.HTTP_200
+        if operation.done or not wait > 0:
+            rep.data = operation.to_json().encode("utf-8")
+        else:
+            rep.stream = httping.LeasedBody(OperationIterable(monitor=agent.monitor, name=name, operation=operation,
+                                                              wait=wait), leases=agent.bodies)
 
     @staticmethod
     def on_delete(req, rep, name):
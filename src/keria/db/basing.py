@@ -4,10 +4,15 @@ KERIA
 keria.db.basing module
 
 """
+import base64
+import hashlib
+import itertools
+import json
 from dataclasses import dataclass
-from ordered_set import OrderedSet as oset
 
-from keri.core import coring
+import lmdb
+
+from keri.core import coring, serdering
 from keri.db import dbing, subing, koming
 
 SCALAR_TYPES = ("string", "number")
@@ -26,6 +31,15 @@ class IndexRecord:
     paths: list
 
 
+@dataclass
+class ReindexRecord:
+    """ Progress of a background reindex of the table of a Seeker or ExnSeeker
+    """
+    last: str = None  # SAID of the last message of the table that was reindexed
+    count: int = 0  # number of messages reindexed so far
+    done: bool = False
+
+
 class AgencyBaser(dbing.LMDBer):
     """
     Agency database for tracking Agent tenants in this KERIA instance.
@@ -76,6 +90,7 @@ class AgencyBaser(dbing.LMDBer):
         self.agnt = None
         self.ctrl = None
         self.aids = None
+        self.shrd = None
 
         super(AgencyBaser, self).__init__(headDirPath=headDirPath, perm=perm,
                                           reopen=reopen, **kwa)
@@ -101,6 +116,9 @@ class AgencyBaser(dbing.LMDBer):
                                      subkey='aids.',
                                      klas=coring.Prefixer)
 
+        # Sharding configuration of a multi-process Agency, keyed by setting name, "count" is the number of shards
+        self.shrd = subing.Suber(db=self, subkey='shrd.')
+
 
 class Seeker(dbing.LMDBer):
     """
@@ -143,9 +161,12 @@ class Seeker(dbing.LMDBer):
         self.db = db
         self.reger = reger
         self.indexes = dict()
+        self.pathers = dict()  # index name to precompiled Pathers of the fields of the index
+        self.schemas = dict()  # schema SAID to names of the indexes for credentials of the schema
 
         self.schIdx = None
         self.dynIdx = None
+        self.reidx = None
 
         super(Seeker, self).__init__(headDirPath=headDirPath, perm=perm,
                                      reopen=reopen, **kwa)
@@ -159,10 +180,14 @@ class Seeker(dbing.LMDBer):
         self.dynIdx = koming.Komer(db=self,
                                    subkey='dynIdx.',
                                    schema=IndexRecord, )
+        # Progress of the background reindex of all saved credentials
+        self.reidx = koming.Komer(db=self, subkey='reidx.', schema=ReindexRecord, )
 
-        for name, idx in self.dynIdx.getItemIter():
+        # Read all the records before opening any index, opening a sub database while the read is open fails
+        for name, idx in list(self.dynIdx.getItemIter()):
             key = ".".join(name)
             self.indexes[key] = subing.CesrDupSuber(db=self, subkey=idx.subkey, klas=coring.Saider)
+            self.pathers[key] = [coring.Pather(qb64=path) for path in idx.paths]
 
         # Create persistent Indexes if they don't already exist
         self.createIndex(SCHEMA_FIELD.qb64)
@@ -172,7 +197,7 @@ class Seeker(dbing.LMDBer):
         for field in (ISSUER_FIELD, ISSUEE_FIELD):
             self.createIndex(field.qb64)
             subkey = f"{field.qb64}.{SCHEMA_FIELD.qb64}"
-            self.createIndex(subkey)
+            self.createIndex(subkey, paths=[field.qb64, SCHEMA_FIELD.qb64])
 
     @property
     def table(self):
@@ -184,35 +209,95 @@ class Seeker(dbing.LMDBer):
         return creder.sad
 
     def saidIter(self):
-        return self.reger.saved.getItemIter()
+        for (said,), _ in self.reger.saved.getItemIter():
+            yield said
 
-    def createIndex(self, key):
-        if self.dynIdx.get(keys=(key,)) is None:
+    def values(self, saids, pathers=None):
+        """ Load the credential payloads of many SAIDs in one read transaction
+
+        Reads the raw credential straight from the creds table without the lookup through saved or the SAID
+        verification performed by Serder so only SAIDs already known to be saved should be provided.
+
+        Parameters:
+            saids (list): qb64 SAIDs of saved credentials
+            pathers (list): optional Pathers of the only fields to return in each payload
+
+        Returns:
+            list: (said, sad) tuples in the order of saids, sad is None for any SAID not found
+
+        """
+        return loadValues(self.reger.creds, saids, klas=serdering.SerderACDC, pathers=pathers)
+
+    def createIndex(self, key, paths=None):
+        paths = paths if paths is not None else [key]
+        if key not in self.indexes:
             self.indexes[key] = subing.CesrDupSuber(db=self, subkey=key, klas=coring.Saider)
-            self.dynIdx.pin(keys=(key,), val=IndexRecord(subkey=key, paths=[key]))
+            self.pathers[key] = [coring.Pather(qb64=path) for path in paths]
+            if self.dynIdx.get(keys=(key,)) is None:
+                self.dynIdx.pin(keys=(key,), val=IndexRecord(subkey=key, paths=paths))
 
     def index(self, said):
-        if (saider := self.reger.saved.get(keys=(said,))) is None:
-            raise ValueError(f"{said} is not a verified credential")
+        """ Index the verified credential said in every index for its schema
 
-        creder = self.reger.creds.get(keys=(saider.qb64,))
-        saider = coring.Saider(qb64b=creder.saidb)
+        Raises:
+            ValueError: if said is not a verified credential
+
+        """
+        if failed := self.indexAll([said]):
+            raise failed[said]
 
-        # Load schema index and if not indexed in schIdx, index it.
-        schemaSaid = creder.schema
-        if not (indexes := self.schIdx.get(keys=(schemaSaid,))):
-            indexes = self.generateIndexes(schemaSaid)
+    def indexAll(self, saids):
+        """ Index many verified credentials writing all of their index entries in one write transaction
 
-        for index in indexes:
-            db = self.indexes[index]
-            idx = self.dynIdx.get(keys=(index,))
-            values = []
-            for path in idx.paths:
-                pather = coring.Pather(qb64=path)
-                values.append(pather.resolve(creder.sad))
+        Parameters:
+            saids (Iterable): qb64 SAIDs of verified credentials
 
-            value = "".join(values)
-            db.add(keys=(value,), val=saider)
+        Returns:
+            dict: SAID to exception for each credential that could not be indexed
+
+        """
+        entries, failed = self.entries(saids)
+        writeIndexes(self, entries)
+        return failed
+
+    def entries(self, saids):
+        """ Returns the (index, value, SAID) index entries of many verified credentials and the SAIDs that failed
+
+        Parameters:
+            saids (Iterable): qb64 SAIDs of verified credentials
+
+        Returns:
+            tuple: list of (index name, value, SAID) entries and dict of SAID to exception for failed credentials
+
+        """
+        failed = dict()
+        found = []
+        for said in saids:
+            if self.reger.saved.get(keys=(said,)) is None:
+                failed[said] = ValueError(f"{said} is not a verified credential")
+            else:
+                found.append(said)
+
+        entries = []
+        for said, sad in self.values(found):
+            try:
+                if sad is None:
+                    raise ValueError(f"{said} is not a verified credential")
+
+                # Load schema index and if not indexed in schIdx, index it.
+                if (indexes := self.schemas.get(sad["s"])) is None:
+                    if not (indexes := self.schIdx.get(keys=(sad["s"],))):
+                        indexes = self.generateIndexes(sad["s"])
+                    self.schemas[sad["s"]] = indexes
+
+                for index in indexes:
+                    value = "".join(pather.resolve(sad) for pather in self.pathers[index])
+                    if value:
+                        entries.append((index, value, sad["d"]))
+            except Exception as ex:
+                failed[said] = ex
+
+        return entries, failed
 
     def generateIndexes(self, said):
         """ Parse schema of said, create schIdx entry keyed to said of schema and the subkey indexes in
@@ -256,40 +341,26 @@ class Seeker(dbing.LMDBer):
                 continue
 
             pather = coring.Pather(path=['a', p])
-            if pather.qb64 not in self.indexes:
-                self.indexes[pather.qb64] = subing.CesrDupSuber(db=self, subkey=pather.qb64, klas=coring.Saider)
-                idx = IndexRecord(subkey=pather.qb64, paths=[pather.qb64])
-                self.dynIdx.pin(keys=(pather.qb64,), val=idx)
+            self.createIndex(pather.qb64)
             self.schIdx.add(keys=(said,), val=pather.qb64b)
 
             subkey = f"{SCHEMA_FIELD.qb64}.{pather.qb64}"
-            if subkey not in self.indexes:
-                self.indexes[subkey] = subing.CesrDupSuber(db=self, subkey=subkey, klas=coring.Saider)
-                idx = IndexRecord(subkey=subkey, paths=[SCHEMA_FIELD.qb64, pather.qb64])
-                self.dynIdx.pin(keys=(subkey,), val=idx)
+            self.createIndex(subkey, paths=[SCHEMA_FIELD.qb64, pather.qb64])
             self.schIdx.add(keys=(said,), val=subkey)
 
             for field in (ISSUER_FIELD, ISSUEE_FIELD):
                 subkey = f"{field.qb64}.{pather.qb64}"
-                if subkey not in self.indexes:
-                    self.indexes[subkey] = subing.CesrDupSuber(db=self, subkey=subkey, klas=coring.Saider)
-                    idx = IndexRecord(subkey=subkey, paths=[field.qb64, pather.qb64])
-                    self.dynIdx.pin(keys=(subkey,), val=idx)
-
+                self.createIndex(subkey, paths=[field.qb64, pather.qb64])
                 self.schIdx.add(keys=(said,), val=subkey)
 
                 subkey = f"{field.qb64}.{SCHEMA_FIELD.qb64}.{pather.qb64}"
-                if subkey not in self.indexes:
-                    self.indexes[subkey] = subing.CesrDupSuber(db=self, subkey=subkey, klas=coring.Saider)
-                    idx = IndexRecord(subkey=subkey, paths=[field.qb64, SCHEMA_FIELD.qb64, pather.qb64])
-                    self.dynIdx.pin(keys=(subkey,), val=idx)
-
+                self.createIndex(subkey, paths=[field.qb64, SCHEMA_FIELD.qb64, pather.qb64])
                 self.schIdx.add(keys=(said,), val=subkey)
 
         return [index for index in self.schIdx.get(keys=(said,))]
 
-    def find(self, filtr, sort=None, skip=None, limit=None):
-        return Cursor(seeker=self, filtr=filtr, sort=sort, skip=skip, limit=limit)
+    def find(self, filtr, sort=None, skip=None, limit=None, after=None):
+        return Cursor(seeker=self, filtr=filtr, sort=sort, skip=skip, limit=limit, after=after)
 
 
 class ExnSeeker(dbing.LMDBer):
@@ -340,6 +411,8 @@ class ExnSeeker(dbing.LMDBer):
         """
         self.db = db
         self.indexes = dict()
+        self.pathers = dict()  # index name to precompiled Pathers of the fields of the index
+        self.reidx = None
 
         super(ExnSeeker, self).__init__(headDirPath=headDirPath, perm=perm,
                                         reopen=reopen, **kwa)
@@ -347,6 +420,9 @@ class ExnSeeker(dbing.LMDBer):
     def reopen(self, **kwa):
         super(ExnSeeker, self).reopen(**kwa)
 
+        # Progress of the background reindex of all exn messages
+        self.reidx = koming.Komer(db=self, subkey='reidx.', schema=ReindexRecord, )
+
         # List of dynamically created indexes to be recreated at load
         # Create persistent Indexes if they don't already exist
         fields = (self.ROUTE_FIELD, self.SENDER_FIELD, self.RECIPIENT_FIELD, self.DATE_FIELD, self.SCHEMA)
@@ -371,50 +447,114 @@ class ExnSeeker(dbing.LMDBer):
         for (said,), _ in self.db.exns.getItemIter():
             yield said
 
+    def values(self, saids, pathers=None):
+        """ Load the exchange messages of many SAIDs in one read transaction
+
+        Parameters:
+            saids (list): qb64 SAIDs of exn messages
+            pathers (list): optional Pathers of the only fields to return in each message
+
+        Returns:
+            list: (said, ked) tuples in the order of saids, ked is None for any SAID not found
+
+        """
+        return loadValues(self.db.exns, saids, klas=serdering.SerderKERI, pathers=pathers)
+
     def createIndex(self, key):
         self.indexes[key] = subing.CesrDupSuber(db=self, subkey=key, klas=coring.Saider)
+        self.pathers[key] = [coring.Pather(qb64=path) for path in key.split(".")]
 
     def index(self, said):
-        if (serder := self.db.exns.get(keys=(said,))) is None:
-            raise ValueError(f"{said} is not a valid exn")
-
-        saider = coring.Saider(qb64b=serder.saidb)
-
-        # Load schema index and if not indexed in schIdx, index it.
-        for index, db in self.indexes.items():
-            pathers = [coring.Pather(qb64=path) for path in index.split(".")]
-            values = []
-            for pather in pathers:
-                try:
-                    values.append(pather.resolve(serder.ked))
-                except KeyError:
-                    pass
-
-            value = "".join(values)
-            if not value:
+        """ Index the exn message said in every index
+
+        Raises:
+            ValueError: if said is not a saved exn message
+
+        """
+        if failed := self.indexAll([said]):
+            raise failed[said]
+
+    def indexAll(self, saids):
+        """ Index many exn messages writing all of their index entries in one write transaction
+
+        Parameters:
+            saids (Iterable): qb64 SAIDs of exn messages
+
+        Returns:
+            dict: SAID to exception for each message that could not be indexed
+
+        """
+        entries, failed = self.entries(saids)
+        writeIndexes(self, entries)
+        return failed
+
+    def entries(self, saids):
+        """ Returns the (index, value, SAID) index entries of many exn messages and the SAIDs that failed
+
+        Parameters:
+            saids (Iterable): qb64 SAIDs of exn messages
+
+        Returns:
+            tuple: list of (index name, value, SAID) entries and dict of SAID to exception for failed messages
+
+        """
+        failed = dict()
+        entries = []
+        for said, ked in self.values(list(saids)):
+            if ked is None:
+                failed[said] = ValueError(f"{said} is not a valid exn")
                 continue
 
-            db.add(keys=(value,), val=saider)
+            for index, pathers in self.pathers.items():
+                values = []
+                for pather in pathers:
+                    try:
+                        values.append(pather.resolve(ked))
+                    except KeyError:
+                        pass
 
-    def find(self, filtr, sort=None, skip=None, limit=None):
-        return Cursor(seeker=self, filtr=filtr, sort=sort, skip=skip, limit=limit)
+                value = "".join(values)
+                if value:
+                    entries.append((index, value, ked["d"]))
+
+        return entries, failed
+
+    def find(self, filtr, sort=None, skip=None, limit=None, after=None):
+        return Cursor(seeker=self, filtr=filtr, sort=sort, skip=skip, limit=limit, after=after)
 
 
 class Cursor:
+    """ Lazy query cursor over the indexes of a Seeker or ExnSeeker
+
+    Matching SAIDs are produced by walking LMDB index iterators in order and checking each candidate against the
+    remaining filter operators.  Iteration stops as soon as skip + limit results have been produced so the cost of
+    a page is proportional to the page and not to the size of the table.
+
+    Every page records the (index key, SAID) position of its last result, available as the opaque continuation
+    `.token`.  Passing that token back as `after` resumes the walk with an LMDB seek to that position instead of
+    skipping over all previous results.  The token also records the index that drove the walk, None for a scan of
+    the table, and a digest of the filter and sort so a resumed walk always continues over the same keyspace even
+    when the plan for a fresh query would choose another index.
 
-    def __init__(self, seeker, filtr=None, sort=None, skip=None, limit=None):
-        self.filtr = filtr
+    """
+
+    BatchSize = 100  # maximum number of values loaded per read transaction when evaluating operators
+
+    def __init__(self, seeker, filtr=None, sort=None, skip=None, limit=None, after=None):
+        self.filtr = filtr if filtr is not None else dict()
         self.operators = operators(self.filtr)
         self.names = [op.name for op in self.operators]
-        self.indexable = next((False for op in self.operators if not isinstance(op, Eq)), True)
-        self.values = [op.value for op in self.operators]
+        self.indexable = all(isinstance(op, Eq) and op.indexable for op in self.operators)
 
         self.seeker = seeker
         self._sort = sort
         self._skip = skip if skip is not None else 0
         self._limit = limit if limit is not None else 25
+        self._index, self._after, self._digest = decodeToken(after) if after is not None else (None, None, None)
 
+        self.index = None
         self.cur = None
+        self.last = None
         self.saids = None
 
     def __iter__(self):
@@ -424,11 +564,9 @@ class Cursor:
         if self.saids is None:
             self._query()
 
-        if self.cur >= len(self.saids):
-            raise StopIteration
-
-        said = self.saids[self.cur]
+        key, said = next(self.saids)
         self.cur += 1
+        self.last = (key, said)
         return said
 
     def sort(self, sort):
@@ -443,137 +581,514 @@ class Cursor:
         self._limit = limit
         return self
 
+    def after(self, token):
+        self._index, self._after, self._digest = decodeToken(token) if token is not None else (None, None, None)
+        return self
+
+    @property
+    def token(self):
+        """ Returns opaque continuation token for the page following this one or None if this page was not full """
+        if self.last is None or self.cur < self._limit:
+            return None
+
+        return encodeToken(self.index, *self.last, digest=self.digest)
+
+    @property
+    def digest(self):
+        """ Returns digest of the filter and sort of this query, continuation tokens are only valid for the same """
+        raw = json.dumps([self.filtr, self._sort], sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+    def count(self):
+        """ Returns the total number of matches of the filter, ignoring skip, limit and after
+
+        Filters answered by a single index are counted from the LMDB duplicate count of each index key without
+        walking the entries or loading any values.  Otherwise the entries of the most selective index are walked
+        and only the remaining operators are evaluated.
+
+        """
+        if (total := self.indexCount()) is not None:
+            return total
+
+        if (op := self.plan()) is None:
+            items = ((key, key) for key, _ in seekItemIter(self.seeker.table, vals=False))
+            return sum(1 for _ in self.filter(items, self.operators))
+
+        idx = self.seeker.indexes[op.name]
+        return sum(1 for _ in self.filter(op.index(idx), [o for o in self.operators if o is not op]))
+
+    def indexCount(self):
+        """ Returns the total number of matches when answered from table statistics or index duplicate counts alone
+
+        Returns None when counting would have to walk index entries or the table, so callers that only want a
+        total when it is cheap can skip it.
+
+        """
+        if len(self.filtr) == 0:
+            return tableCount(self.seeker.table)
+
+        index = ".".join(self.names)
+        if len(self.operators) > 1 and self.indexable and index in self.seeker.indexes:
+            idx = self.seeker.indexes[index]
+            return countRange(idx, start=idx._tokey(("".join(op.value for op in self.operators),)), exact=True)
+
+        if len(self.operators) == 1 and (op := self.plan()) is not None:
+            return op.cost(self.seeker.indexes[op.name])
+
+        return None
+
     def _query(self):
+        if self._after is not None:
+            if self._skip:
+                raise ValueError("skip can not be combined with a continuation token")
+            if self._digest != self.digest:
+                raise ValueError("continuation token is for a different filter or sort")
+            if self._index is not None and self._index not in self.seeker.indexes:
+                raise ValueError(f"index {self._index} of continuation token no longer exists")
+            self.index = self._index
+        else:
+            self.index = self.route()
+
         self.cur = 0
-        if len(self.filtr) == 0:
-            self.saids = self.order([said for (said,), _ in self.seeker.table.getItemIter()])
-        elif (saids := self.indexSearch()) is not None:
-            self.saids = self.order(saids)
-        elif (saids := self.indexScan()) is not None:
-            self.saids = self.order(saids)
+        self.saids = itertools.islice(self.candidates(), self._skip, self._skip + self._limit)
+
+    def route(self):
+        """ Returns name of the index driving the walk of a fresh query, None for a scan of the table """
+        if self._sort and (index := self.sortIndex()) in self.seeker.indexes:
+            return index
+        elif len(self.filtr) == 0:
+            return None
+        elif (index := self.compositeIndex()) is not None:
+            return index
+        elif (op := self.plan()) is not None:
+            return op.name
         else:
-            saids = self.fullTableScan()
-            self.saids = self.order(saids)
+            return None
 
-    def indexSearch(self):
-        if len(self.operators) == 1 and self.operators[0].name in self.seeker.indexes:
-            op = self.operators[0]
-            idx = self.seeker.indexes[op.name]
-            return op.index(idx)
+    def candidates(self):
+        """ Returns iterator of all (key, SAID) matches of the filter walking the index .index
 
+        Sort indexes walk in sort order, composite indexes answer the entire filter and any other index is the one
+        of a single operator with the remaining operators checked per SAID.
+
+        Raises:
+            ValueError: if .index can not drive a walk for the filter and sort of this query
+
+        """
+        if self.index is None:
+            return self.fullTableScan()
+        elif self._sort and self.index == self.sortIndex():
+            return self.filter(seekItemIter(self.seeker.indexes[self.index], after=self._after), self.operators)
+        elif self.index == self.compositeIndex():
+            return self.indexSearch()
+
+        for op in self.operators:
+            if op.indexable and op.name == self.index:
+                return self.indexScan(op)
+
+        raise ValueError(f"index {self.index} of continuation token does not match the query")
+
+    def compositeIndex(self):
+        """ Returns name of the composite index that answers the entire filter or None if there is no such index """
         index = ".".join(self.names)
-        if not (self.indexable and index in self.seeker.indexes):
+        if not (len(self.operators) > 1 and self.indexable and index in self.seeker.indexes):
             return None
 
-        idx = self.seeker.indexes[index]
-        val = "".join(self.values)
-        return [val.qb64 for val in idx.getIter(keys=(val,))]
+        return index
+
+    def sortIndex(self):
+        """ Returns name of the index ordered by the sort fields """
+        return ".".join([coring.Pather(bext=s).qb64 for s in self._sort])
+
+    def indexSearch(self):
+        """ Returns iterator over the composite index that answers the entire filter """
+        idx = self.seeker.indexes[self.compositeIndex()]
+        val = "".join(op.value for op in self.operators)
+        return seekItemIter(idx, keys=(val,), exact=True, after=self._after)
+
+    def indexScan(self, op):
+        """ Returns iterator walking the index of op and checking the remaining operators per SAID """
+        idx = self.seeker.indexes[op.name]
+        return self.filter(op.index(idx, after=self._after), [o for o in self.operators if o is not op])
+
+    def plan(self):
+        """ Choose the indexed operator expected to produce the fewest candidates
 
-    def indexScan(self):
-        use = []
-        scan = []
+        The cost of each indexable operator is the number of index entries it would walk, answered from LMDB
+        duplicate counts per key without loading any values.  Counting of range and prefix operators is bounded by
+        the best cost found so far so a poor candidate is abandoned early.  Returns None when no index would walk
+        fewer entries than a scan of the table.
 
-        for idx, op in enumerate(self.operators):
-            if op.name in self.seeker.indexes:
-                use.append(op)
+        """
+        best, cost = None, tableCount(self.seeker.table)
+        for op in self.operators:
+            if not (op.indexable and op.name in self.seeker.indexes):
+                continue
+
+            if (c := op.cost(self.seeker.indexes[op.name], bound=cost)) < cost or best is None and c <= cost:
+                best, cost = op, c
+
+        return best
+
+    def fullTableScan(self):
+        return self.filter(self.tableIter(), ops=self.operators)
+
+    def tableIter(self):
+        """ Returns iterator of (SAID, SAID) over the seeker's table in SAID order """
+        return ((key, key) for key, _ in seekItemIter(self.seeker.table, after=self._after, vals=False))
+
+    def filter(self, items, ops):
+        """ Lazily filter (key, SAID) items to those satisfying all operators in ops
+
+        Equality and set operators with an index are checked with a LMDB lookup of the (value, SAID) duplicate in
+        the index.  All other operators are evaluated in a single pass over a projection of only the fields they
+        reference, loaded in batches with one read transaction per batch.
+
+        Parameters:
+            items (Iterable): (key, SAID) tuples to filter
+            ops (list): operators that must all be satisfied
+
+        """
+        probes = [op for op in ops if isinstance(op, (Eq, In)) and op.indexable and op.name in self.seeker.indexes]
+        scans = [op for op in ops if op not in probes]
+        pathers = [op.pather for op in scans]
+        size = max(1, min(self.BatchSize, self._skip + self._limit))
+
+        for batch in batched(items, size):
+            batch = [(key, said) for key, said in batch
+                     if all(op.contains(self.seeker.indexes[op.name], said) for op in probes)]
+            if not scans:
+                yield from batch
+                continue
+
+            vals = self.seeker.values([said for _, said in batch], pathers=pathers)
+            for (key, said), (_, val) in zip(batch, vals):
+                if val is not None and matches(val, scans):
+                    yield key, said
+
+
+
+def seekItemIter(suber, keys=b"", exact=False, after=None, vals=True, start=None, stop=None):
+    """ Iterate (key, val) str tuples of a sub database branch, optionally resuming after a previous position
+
+    Works for both dupsort==False and dupsort==True sub databases.  When after is provided the cursor is positioned
+    with a single seek to the first entry strictly greater than the (key, val) position in after.
+
+    Parameters:
+        suber (Suber): sub database to iterate
+        keys (tuple): key prefix of branch to iterate, empty iterates all items
+        exact (bool): True means only iterate the entries whose key equals keys, not all keys that start with it
+        after (tuple): optional (key, val) str position to resume after
+        vals (bool): False means yield None in place of each value, for tables whose values are not text
+        start (str): optional inclusive lower bound key to start the iteration at
+        stop (Callable): optional predicate of key bytes, iteration ends at the first key for which it is True
+
+    """
+    top = suber._tokey(keys) if keys else b""
+    low = max(top, start.encode("utf-8")) if start is not None else top
+    with suber.db.env.begin(db=suber.sdb, write=False, buffers=True) as txn:
+        cursor = txn.cursor()
+        dupsort = suber.sdb.flags(txn)["dupsort"]
+
+        if after is None or after[0].encode("utf-8") < low:
+            if not cursor.set_range(low):
+                return
+        else:
+            akey, aval = (a.encode("utf-8") for a in after)
+            if dupsort:
+                if cursor.set_range_dup(akey, aval):
+                    if bytes(cursor.value()) == aval and not cursor.next():
+                        return
+                elif not (cursor.set_range(akey) and (bytes(cursor.key()) != akey or cursor.next_nodup())):
+                    return
             else:
-                scan.append(op)
+                if not cursor.set_range(akey):
+                    return
+                if bytes(cursor.key()) == akey and not cursor.next():
+                    return
+
+        for ckey, cval in cursor.iternext():
+            ckey = bytes(ckey)
+            if (exact and ckey != top) or not ckey.startswith(top) or (stop is not None and stop(ckey)):
+                break
 
-        if len(use) == 0:
-            return self.fullTableScan()
+            yield ckey.decode("utf-8"), bytes(cval).decode("utf-8") if vals else None
+
+
+def countRange(suber, start=b"", stop=None, exact=False, bound=None):
+    """ Count the entries of a dupsort index whose keys fall in a range using per key duplicate counts
+
+    Only one cursor step and one duplicate count is needed per distinct key so the cost is proportional to the
+    cardinality of the index over the range and not to the number of entries.
+
+    Parameters:
+        suber (Suber): dupsort sub database to count
+        start (bytes): inclusive lower bound key
+        stop (Callable): optional predicate of key bytes, counting ends at the first key for which it is True
+        exact (bool): True means only count the entries at key start
+        bound (int): optional upper bound, counting stops once the count exceeds bound
+
+    Returns:
+        int: number of entries in the range, or a number greater than bound if bound was exceeded
+
+    """
+    count = 0
+    with suber.db.env.begin(db=suber.sdb, write=False, buffers=True) as txn:
+        cursor = txn.cursor()
+        if not cursor.set_range(start):
+            return count
+
+        while True:
+            key = bytes(cursor.key())
+            if (exact and key != start) or (stop is not None and stop(key)):
+                break
+
+            count += cursor.count()
+            if bound is not None and count > bound or not cursor.next_nodup():
+                break
+
+    return count
+
+
+def tableCount(suber):
+    """ Returns the total number of entries in a sub database """
+    with suber.db.env.begin(db=suber.sdb, write=False) as txn:
+        return txn.stat(suber.sdb)["entries"]
+
+
+def writeIndexes(seeker, entries):
+    """ Add (index, value, SAID) entries to the dupsort indexes of seeker in a single write transaction
+
+    Parameters:
+        seeker (Seeker|ExnSeeker): seeker whose .indexes are written
+        entries (list): (index name, str value, qb64 SAID) tuples
+
+    """
+    if not entries:
+        return
+
+    with seeker.env.begin(write=True, buffers=True) as txn:
+        for index, value, said in entries:
+            idx = seeker.indexes[index]
+            try:
+                txn.put(idx._tokey((value,)), said.encode("utf-8"), db=idx.sdb, dupdata=True)
+            except lmdb.BadValsizeError:  # value too big to be an LMDB key, leave it out of this index
+                continue
+
+
+def startReindex(seeker):
+    """ Reset the reindex progress of seeker so reindex starts over at the beginning of its table """
+    seeker.reidx.pin(keys=("table",), val=ReindexRecord())
+
+
+def reindex(seeker, size=100):
+    """ Index the next size messages of the table of seeker after the last one reindexed
+
+    Progress is saved after every batch so an interrupted reindex resumes where it left off.  Indexing is
+    idempotent so messages indexed again after a crash between a batch and its progress update are harmless.
+
+    Parameters:
+        seeker (Seeker|ExnSeeker): seeker to reindex
+        size (int): maximum number of messages to index
+
+    Returns:
+        ReindexRecord: progress of the reindex or None if no reindex was started
+
+    """
+    if (rec := seeker.reidx.get(keys=("table",))) is None or rec.done:
+        return rec
+
+    after = (rec.last, rec.last) if rec.last is not None else None
+    saids = [said for said, _ in itertools.islice(seekItemIter(seeker.table, after=after, vals=False), size)]
+    failed = seeker.indexAll(saids)
+
+    rec.count += len(saids) - len(failed)
+    rec.last = saids[-1] if saids else rec.last
+    rec.done = len(saids) < size
+    seeker.reidx.pin(keys=("table",), val=rec)
+
+    return rec
+
+
+def rebuild(seeker, size=1000):
+    """ Offline bulk rebuild of every index of seeker from its table
+
+    All index entries are cleared, then the entries of every batch of messages are generated, sorted and flushed
+    to each index in one write transaction per index, so memory is bounded by the batch size and not by the table.
+    Sorted runs that fall after the current end of an index are written with sorted appends (MDB_APPENDDUP), the
+    rest are inserted.  Must not be run while an Agent has the databases open.
+
+    Parameters:
+        seeker (Seeker|ExnSeeker): seeker to rebuild
+        size (int): number of messages to read per batch
+
+    Returns:
+        int: number of messages indexed
+
+    """
+    with seeker.env.begin(write=True) as txn:
+        for idx in seeker.indexes.values():
+            txn.drop(idx.sdb, delete=False)
+
+    count = 0
+    for batch in batched(seekItemIter(seeker.table, vals=False), size):
+        entries, failed = seeker.entries([said for said, _ in batch])
+        count += len(batch) - len(failed)
+
+        for index, group in itertools.groupby(sorted(entries), key=lambda entry: entry[0]):
+            flushIndex(seeker.indexes[index], group)
+
+    seeker.reidx.pin(keys=("table",), val=ReindexRecord(count=count, done=True))
+    return count
+
+
+def flushIndex(idx, entries):
+    """ Write a sorted run of (index, value, SAID) entries to the dupsort index idx in one write transaction
 
-        idx = self.seeker.indexes[use[0].name]
-        saids = oset(use[0].index(idx))
-        if len(saids) == 0:
-            return list()
+    Entries whose value or SAID is too big or too small to be an LMDB key are left out of the index like
+    writeIndexes does.
 
-        for i, op in enumerate(use[1:]):
-            idx = self.seeker.indexes[op.name]
-            nxt = oset(op.index(idx))
-            saids &= nxt
+    Parameters:
+        idx (DupSuber|CesrDupSuber): dupsort index to write
+        entries (Iterable): (index name, value, SAID) tuples sorted by value then SAID
 
-        if len(scan) == 0:
-            return list(saids)
+    """
+    maxsize = idx.db.env.max_key_size()
+    items = [(key, val) for key, val in ((idx._tokey((value,)), said.encode("utf-8")) for _, value, said in entries)
+             if 0 < len(key) <= maxsize and 0 < len(val) <= maxsize]
+    items.sort()
+    if not items:
+        return
+
+    # py-lmdb only appends duplicates (MDB_APPENDDUP) when the transaction is opened on the dupsort database
+    with idx.db.env.begin(db=idx.sdb, write=True, buffers=True) as txn:
+        cursor = txn.cursor()
+        if not cursor.last() or (bytes(cursor.key()), bytes(cursor.value())) < items[0]:
+            cursor.putmulti(items, dupdata=True, append=True)
         else:
-            return self.tableScan(list(saids), scan)
+            cursor.putmulti(items, dupdata=True)
 
-    def fullTableScan(self):
-        saids = [saider.qb64 for _, saider in self.seeker.saidIter()]
-        return self.tableScan(saids, ops=self.operators)
 
-    def tableScan(self, saids, ops):
-        res = []
+def loadValues(suber, saids, klas, pathers=None):
+    """ Load and decode the raw Serder values at many keys of a sub database in one read transaction
+
+    The SAID of each value is not verified, these values were verified when they were saved.
+
+    Parameters:
+        suber (SerderSuber): sub database of Serders keyed by SAID
+        saids (list): qb64 SAID keys to load
+        klas (Type[Serder]): Serder class of the values
+        pathers (list): optional Pathers of the only fields to return in each value
+
+    Returns:
+        list: (said, sad) tuples in the order of saids, sad is None for any SAID not found
+
+    """
+    values = []
+    with suber.db.env.begin(db=suber.sdb, write=False, buffers=True) as txn:
         for said in saids:
-            val = self.seeker.value(said)
-            for op in ops:
-                if op(val):
-                    res.append(said)
+            if (raw := txn.get(suber._tokey((said,)))) is None:
+                values.append((said, None))
+                continue
+
+            sad = klas(raw=bytes(raw), verify=False).sad
+            values.append((said, project(sad, pathers) if pathers is not None else sad))
 
-        return res
+    return values
 
-    def order(self, saids):
-        if not self._sort:
-            return self.slice(saids)
 
-        if (res := self.indexOrder(saids)) is not None:
-            return res
+def project(sad, pathers):
+    """ Returns a copy of sad with only the fields at the paths of pathers
+
+    Paths that use positional (digit) or empty components keep the whole top level field so they resolve the
+    same against the projection as against the original.
+
+    """
+    proj = dict()
+    for pather in pathers:
+        path = pather.path
+        if not path or path[0] not in sad:
+            continue
+
+        if any(p.isdigit() or p == "" for p in path):
+            proj[path[0]] = sad[path[0]]
+            continue
+
+        src, dst = sad, proj
+        for p in path[:-1]:
+            if not isinstance(src.get(p), dict):
+                break
+            src = src[p]
+            dst = dst.setdefault(p, dict())
         else:
-            return self.tableScanOrder(saids)
+            if path[-1] in src:
+                dst[path[-1]] = src[path[-1]]
 
-    def indexOrder(self, saids):
-        index = ".".join([coring.Pather(bext=s).qb64 for s in self._sort])
-        if index not in self.seeker.indexes:
-            return None
+    return proj
 
-        idx = self.seeker.indexes[index]
-        ctx = idx.getItemIter()
 
-        # Run off the values before start
-        cur = 0
-        while cur < self._skip:
-            _, saider = next(ctx)
-            if saider.qb64 in saids:
-                cur += 1
+def matches(val, ops):
+    """ Returns True if val satisfies every operator in ops, a field missing from val satisfies none of them """
+    try:
+        return all(op(val) for op in ops)
+    except KeyError:
+        return False
 
-        # Load values in order until we get enough (based on limit)
-        res = []
-        for _, saider in ctx:
-            if saider.qb64 in saids:
-                res.append(saider.qb64)
 
-            if len(res) == self._limit:
-                break
+def batched(iterable, n):
+    """ Yield successive lists of up to n items from iterable """
+    it = iter(iterable)
+    while batch := list(itertools.islice(it, n)):
+        yield batch
 
-        return res
 
-    def slice(self, saids):
-        if self._skip >= len(saids):
-            return []
+def encodeToken(index, key, said, digest):
+    """ Returns opaque URL safe continuation token for the (key, said) position of a query result
 
-        end = self._skip + self._limit
-        return saids[self._skip:end]
+    Parameters:
+        index (str): name of the index walked, None for a scan of the table
+        key (str): index key of the result
+        said (str): qb64 SAID of the result
+        digest (str): digest of the filter and sort of the query
 
-    def tableScanOrder(self, saids):
-        """ Should we bother implementing table scan sort order
+    """
+    raw = json.dumps([index, key, said, digest], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("utf-8").rstrip("=")
 
-        We have single field indexes for all fields in credentials so this situation will
-        only occur if multiple fields are selected for which we don't have a multi-column
-        index.  In that case, perhaps we raise an exception.
 
-        For now, we'll just slice the results to honor skip and limit.
+def decodeToken(token):
+    """ Returns (index, (key, said), digest) from a continuation token created by encodeToken
 
-        """
-        return self.slice(saids)
+    Raises:
+        ValueError: if the token is not a valid continuation token
+
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        index, key, said, digest = json.loads(raw)
+    except (TypeError, ValueError) as ex:
+        raise ValueError(f"invalid continuation token {token}") from ex
+
+    if not (isinstance(key, str) and isinstance(said, str) and isinstance(digest, str)
+            and (index is None or isinstance(index, str))):
+        raise ValueError(f"invalid continuation token {token}")
+
+    return index, (key, said), digest
+
+
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
 
 
 def operators(filtr):
     """ Executable operator factory method
 
      An factory for processing a filter dict and generating an array of
-     executable operators to apply to a given credential search
+     executable operators to apply to a given credential search.  All range
+     operators ($gt, $gte, $lt, $lte) for a field are combined into one Range
+     operator so a date window is served by a single ordered index scan.
 
     """
-    # filtr = {"-a-i": {"$begins": "984"}}
+    # filtr = {"-a-i": {"$begins": "984"}, "-a-dt": {"$gte": "2023-01-01", "$lt": "2024-01-01"}}
     ops = []
     for f, v in filtr.items():
         if isinstance(v, dict):
@@ -583,7 +1098,14 @@ def operators(filtr):
                         ops.append(Eq(field=f, value=val))
                     case "$begins":
                         ops.append(Begins(field=f, value=val))
-            pass
+                    case "$ne":
+                        ops.append(Ne(field=f, value=val))
+                    case "$in":
+                        ops.append(In(field=f, values=val))
+
+            bounds = {op: val for op, val in v.items() if op in RANGE_OPERATORS}
+            if bounds:
+                ops.append(Range(field=f, **{op[1:]: val for op, val in bounds.items()}))
         else:
             ops.append(Eq(field=f, value=v))
 
@@ -607,8 +1129,20 @@ class Eq:
     def name(self) -> str:
         return self.pather.qb64
 
-    def index(self, idx):
-        return [val.qb64 for val in idx.getIter(keys=(self.value,))]
+    @property
+    def indexable(self):
+        return isinstance(self.value, str)
+
+    def index(self, idx, after=None):
+        return seekItemIter(idx, keys=(self.value,), exact=True, after=after)
+
+    def cost(self, idx, bound=None):
+        return countRange(idx, start=idx._tokey((self.value,)), exact=True)
+
+    def contains(self, idx, said):
+        """ Returns True if the index idx has an entry for said at this operator's value """
+        with idx.db.env.begin(db=idx.sdb, write=False, buffers=True) as txn:
+            return txn.cursor().set_key_dup(idx._tokey((self.value,)), said.encode("utf-8"))
 
 
 class Begins:
@@ -630,9 +1164,168 @@ class Begins:
 
         return val.startswith(self.value)
 
-    def index(self, idx):
-        return [val.qb64 for _, val in idx.getItemIter(keys=(self.value,))]
+    @property
+    def indexable(self):
+        return True
+
+    def index(self, idx, after=None):
+        return seekItemIter(idx, keys=(self.value,), after=after)
+
+    def cost(self, idx, bound=None):
+        top = idx._tokey((self.value,))
+        return countRange(idx, start=top, stop=lambda key: not key.startswith(top), bound=bound)
+
+    @property
+    def name(self) -> str:
+        return self.pather.qb64
+
+
+class Ne:
+    def __init__(self, field, value):
+        self.field = field
+        self.pather = coring.Pather(bext=self.field)
+        self.value = value
+
+    def __call__(self, *args, **kwargs):
+        if len(args) != 1:
+            raise ValueError(f"invalid argument length={len(args)} for not equals operator, must be 2")
+
+        try:
+            val = self.pather.resolve(args[0])
+        except KeyError:
+            return True
+
+        return val != self.value
+
+    @property
+    def indexable(self):
+        return False
+
+    @property
+    def name(self) -> str:
+        return self.pather.qb64
+
+
+class In:
+    def __init__(self, field, values):
+        self.field = field
+        self.pather = coring.Pather(bext=self.field)
+
+        if not isinstance(values, list):
+            raise ValueError(f"invalid type={type(values)} for in, must be `list`")
+        self.values = values
+
+    def __call__(self, *args, **kwargs):
+        if len(args) != 1:
+            raise ValueError(f"invalid argument length={len(args)} for in operator, must be 2")
+
+        try:
+            val = self.pather.resolve(args[0])
+        except KeyError:
+            return False
+
+        return val in self.values
+
+    @property
+    def indexable(self):
+        return all(isinstance(value, str) for value in self.values)
+
+    def index(self, idx, after=None):
+        """ Returns iterator of (key, SAID) over the index entries of each value in key order """
+        return itertools.chain.from_iterable(seekItemIter(idx, keys=(value,), exact=True, after=after)
+                                             for value in sorted(set(self.values)))
+
+    def cost(self, idx, bound=None):
+        return sum(countRange(idx, start=idx._tokey((value,)), exact=True) for value in set(self.values))
+
+    def contains(self, idx, said):
+        """ Returns True if the index idx has an entry for said at any of this operator's values """
+        with idx.db.env.begin(db=idx.sdb, write=False, buffers=True) as txn:
+            cursor = txn.cursor()
+            return any(cursor.set_key_dup(idx._tokey((value,)), said.encode("utf-8")) for value in set(self.values))
 
     @property
     def name(self) -> str:
         return self.pather.qb64
+
+
+class Range:
+    """ Ordered comparison of a field against a lower and/or upper bound
+
+    String bounds are served from an index with a single ordered LMDB range scan, index keys sort the same way as
+    the strings do so ISO-8601 date time fields like `-dt` can be windowed this way.  Numeric bounds are evaluated
+    against each value.
+
+    """
+
+    def __init__(self, field, gt=None, gte=None, lt=None, lte=None):
+        self.field = field
+        self.pather = coring.Pather(bext=self.field)
+
+        bounds = [bound for bound in (gt, gte, lt, lte) if bound is not None]
+        for bound in bounds:
+            if not comparable(bound, bound):
+                raise ValueError(f"invalid type={type(bound)} for range, must be `str` or number")
+            if not comparable(bound, bounds[0]):
+                raise ValueError(f"invalid range bounds of mixed types={type(bounds[0])} and {type(bound)}")
+
+        self.lo, self.loinc = (gte, True) if gt is None or (gte is not None and gte > gt) else (gt, False)
+        self.hi, self.hiinc = (lte, True) if lt is None or (lte is not None and lte < lt) else (lt, False)
+
+    def __call__(self, *args, **kwargs):
+        if len(args) != 1:
+            raise ValueError(f"invalid argument length={len(args)} for range operator, must be 2")
+
+        try:
+            val = self.pather.resolve(args[0])
+        except KeyError:
+            return False
+
+        if self.lo is not None:
+            if not comparable(val, self.lo) or val < self.lo or (val == self.lo and not self.loinc):
+                return False
+
+        if self.hi is not None:
+            if not comparable(val, self.hi) or val > self.hi or (val == self.hi and not self.hiinc):
+                return False
+
+        return True
+
+    @property
+    def indexable(self):
+        return all(bound is None or isinstance(bound, str) for bound in (self.lo, self.hi))
+
+    @property
+    def start(self):
+        """ Inclusive lower bound key, the successor of an exclusive bound is the bound followed by a NUL """
+        if self.lo is None:
+            return None
+
+        return self.lo if self.loinc else f"{self.lo}\x00"
+
+    def stop(self, key):
+        """ Returns True if key bytes are past the upper bound of this range """
+        if self.hi is None:
+            return False
+
+        hi = self.hi.encode("utf-8")
+        return key > hi or (key == hi and not self.hiinc)
+
+    def index(self, idx, after=None):
+        return seekItemIter(idx, after=after, start=self.start, stop=self.stop)
+
+    def cost(self, idx, bound=None):
+        start = self.start.encode("utf-8") if self.start is not None else b""
+        return countRange(idx, start=start, stop=self.stop, bound=bound)
+
+    @property
+    def name(self) -> str:
+        return self.pather.qb64
+
+
+def comparable(a, b):
+    """ Returns True if a and b can be ordered against each other, both strings or both (non bool) numbers """
+    if isinstance(a, str) and isinstance(b, str):
+        return True
+
+    return all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (a, b))
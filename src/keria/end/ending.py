@@ -6,8 +6,12 @@ keria.end.ending module
 ReST API endpoints
 
 """
+import hashlib
+from collections import OrderedDict
+
 import falcon
 from keri import kering
+from keri.db import dbing
 from keri.end import ending
 
 
@@ -22,11 +26,20 @@ def loadEnds(app, agency, default=None):
 class OOBIEnd:
     """ REST API for OOBI endpoints
 
+    Signed OOBI responses are cached per (aid, role, eid) along with the version of the key state and end role
+    records they were built from, so they are only rebuilt after the KEL, its witness receipts, the end roles or
+    the locations of the endpoints change.  Responses carry an ETag and are not sent again to clients presenting it
+    in If-None-Match.
+
     Attributes:
-        .hby (Habery): database access
+        .agency (Agency): Agency for looking up the Agent of an AID
+        .default (str): qb64 AID of the 'self' of the node for blind OOBIs
+        .cache (OrderedDict): least recently used (version, etag, data) of responses keyed by (aid, role, eid)
 
     """
 
+    MaxEntries = 1024
+
     def __init__(self, agency, default=None):
         """  End point for responding to OOBIs
 
@@ -36,12 +49,38 @@ class OOBIEnd:
         """
         self.agency = agency
         self.default = default
+        self.cache = OrderedDict()
+
+    @staticmethod
+    def version(hby, aid, kever):
+        """ Returns tuple of the state the OOBI response for aid is built from
+
+        Parameters:
+            hby (Habery): database access of the Agent
+            aid (str): qb64 identifier prefix of OOBI
+            kever (Kever): key state of aid
 
-    def on_get(self, _, rep, aid=None, role=None, eid=None):
+        """
+        wigs = hby.db.cntWigs(dbing.dgKey(kever.prefixer.qb64b, kever.serder.saidb))
+        ends = []
+        eids = set(kever.wits)
+        for (_, erole, eid), end in hby.db.ends.getItemIter(keys=(aid,)):
+            saider = hby.db.eans.get(keys=(aid, erole, eid))
+            ends.append((erole, eid, end.allowed, end.enabled, saider.qb64 if saider is not None else None))
+            eids.add(eid)
+
+        locs = []
+        for eid in sorted(eids):
+            for (_, scheme), saider in hby.db.lans.getItemIter(keys=(eid,)):
+                locs.append((eid, scheme, saider.qb64))
+
+        return kever.sn, kever.serder.said, wigs, tuple(ends), tuple(locs)
+
+    def on_get(self, req, rep, aid=None, role=None, eid=None):
         """  GET endoint for OOBI resource
 
         Parameters:
-            _: Falcon request object
+            req: Falcon request object
             rep: Falcon response object
             aid: qb64 identifier prefix of OOBI
             role: requested role for OOBI rpy message
@@ -59,6 +98,13 @@ class OOBIEnd:
             raise falcon.HTTPNotFound(description="AID not found for this OOBI")
 
         kever = agent.hby.kevers[aid]
+        key = (aid, role, eid)
+        version = self.version(agent.hby, aid, kever)
+        if (entry := self.cache.get(key)) is not None and entry[0] == version:
+            self.cache.move_to_end(key)
+            self.respond(req, rep, aid, *entry[1:])
+            return
+
         if not agent.hby.db.fullyWitnessed(kever.serder):
             raise falcon.HTTPNotFound(description=f"{aid} not available")
 
@@ -77,10 +123,27 @@ class OOBIEnd:
             msgs.extend(hab.replay(aid))
 
         if msgs:
-            rep.status = falcon.HTTP_200  # This is the default status
-            rep.set_header(ending.OOBI_AID_HEADER, aid)
-            rep.content_type = "application/json+cesr"
-            rep.data = bytes(msgs)
+            data = bytes(msgs)
+            etag = hashlib.blake2b(data, digest_size=16).hexdigest()
+            self.cache[key] = (version, etag, data)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.MaxEntries:
+                self.cache.popitem(last=False)
+
+            self.respond(req, rep, aid, etag, data)
 
         else:
             rep.status = falcon.HTTP_NOT_FOUND
+
+    @staticmethod
+    def respond(req, rep, aid, etag, data):
+        """ Set OOBI response, 304 Not Modified when the client already has the response with etag """
+        rep.set_header(ending.OOBI_AID_HEADER, aid)
+        rep.etag = etag
+        if req.if_none_match is not None and any(tag == etag or tag == "*" for tag in req.if_none_match):
+            rep.status = falcon.HTTP_NOT_MODIFIED
+            return
+
+        rep.status = falcon.HTTP_200  # This is the default status
+        rep.content_type = "application/json+cesr"
+        rep.data = data
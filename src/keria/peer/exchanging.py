@@ -114,14 +114,26 @@ class ExchangeQueryCollectionEnd:
                 limit = body["limit"]
             else:
                 limit = 25
+
+            if "after" in body:
+                after = body["after"]
+            else:
+                after = None
         except falcon.HTTPError:
             filtr = {}
             sort = {}
             skip = 0
             limit = 25
+            after = None
+
+        try:
+            cur = agent.exnseeker.find(filtr=filtr, sort=sort, skip=skip, limit=limit, after=after)
+            saids = [coring.Saider(qb64=said) for said in cur]
+        except ValueError as e:
+            raise falcon.HTTPBadRequest(description=e.args[0])
 
-        cur = agent.exnseeker.find(filtr=filtr, sort=sort, skip=skip, limit=limit)
-        saids = [coring.Saider(qb64=said) for said in cur]
+        if cur.token is not None:
+            rep.set_header("Continuation-Token", cur.token)
 
         exns = []
         for said in saids:
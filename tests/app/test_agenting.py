@@ -5,27 +5,32 @@ keria.app.agenting module
 
 Testing the Mark II Agent
 """
+import datetime
 import json
 import os
 import shutil
+import socket
+import threading
+import time
+from http import server
 
 import falcon
 import hio
+import pytest
 from falcon import testing
 from hio.base import doing
 from hio.core import http, tcp
 from hio.help import decking
 from keri import kering
 from keri.app import habbing, configing, oobiing, querying
-from keri.app.agenting import Receiptor
 from keri.core import coring, serdering
 from keri.core.coring import MtrDex
-from keri.db import basing
+from keri.db import basing, dbing
 from keri.vc import proving
 from keri.vdr import credentialing
 
-from keria.app import agenting, aiding
-from keria.core import longrunning
+from keria.app import agenting, aiding, forwarding, sharding, streaming
+from keria.core import httping, longrunning
 
 
 def test_setup_no_http():
@@ -143,6 +148,150 @@ def test_agency():
             shutil.rmtree(f'/usr/local/var/keri/adb/{base}')
 
 
+def test_agency_hibernation():
+    base = "keria-hibernate"
+    kdir = "/usr/local/var/keri"
+
+    caid0 = "EM1U6zJ7TEI2oPU2rY44v4BnvRSCvqA6nFKg2hAc0XYg"
+    caid1 = "EAo9uERzWmPLTd7h0pG1KeLTIlUf2SgTTgwnk-MquV_v"
+
+    def clean():
+        # Agent databases are named by controller AID rather than base
+        for sub in os.listdir(kdir) if os.path.exists(kdir) else []:
+            for name in (base, caid0, caid1):
+                if os.path.isdir(f'{kdir}/{sub}/{name}'):
+                    shutil.rmtree(f'{kdir}/{sub}/{name}')
+
+    clean()
+
+    agency = agenting.Agency(name="agency", base=base, bran=None, maxAgents=1)
+    doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+    doist.enter(doers=[agency])
+
+    agent0 = agency.create(caid0)
+    pre0 = agent0.pre
+    assert list(agency.agents.keys()) == [caid0]
+
+    # Creating a second agent hibernates the least recently used one
+    agent1 = agency.create(caid1)
+    assert list(agency.agents.keys()) == [caid1]
+    assert agent0 not in agency.doers
+    assert agent1 in agency.doers
+    assert agent0.hby.db.env is None
+    assert agent0.seeker.env is None
+
+    # Hibernated agent is reloaded from disk on next access
+    agent = agency.get(caid0)
+    assert agent is not agent0
+    assert agent.pre == pre0
+    assert list(agency.agents.keys()) == [caid0]
+    assert agent in agency.doers
+
+    agent = agency.lookup(agent1.pre)
+    assert agent.caid == caid1
+    assert list(agency.agents.keys()) == [caid1]
+
+    # Idle agents are hibernated on the next run of the Agency
+    agency.maxAgents = None
+    agency.get(caid0)
+    assert list(agency.agents.keys()) == [caid1, caid0]
+    agency.idleTimeout = 30.0
+    agency.touched[caid1] -= datetime.timedelta(seconds=60)
+
+    # Agents with open event streams are in use
+    stream = streaming.StreamIterable(streamer=agency.agents[caid1].streamer)
+    agency.sweep()
+    assert list(agency.agents.keys()) == [caid0, caid1]
+    agency.maxAgents = 1
+    agency.evict()
+    assert list(agency.agents.keys()) == [caid1]
+    agency.maxAgents = None
+    agency.get(caid0)
+
+    stream.close()
+    agency.touched[caid1] -= datetime.timedelta(seconds=60)
+    agency.sweep()
+    assert list(agency.agents.keys()) == [caid0]
+
+    # So are Agents with queued work or response bodies still being read
+    agent = agency.get(caid0)
+    agent.queries.append(dict(pre=caid1))
+    agency.touched[caid0] -= datetime.timedelta(seconds=60)
+    agency.sweep()
+    assert list(agency.agents.keys()) == [caid0]
+
+    agent.queries.clear()
+    body = httping.LeasedBody([b"{}"], leases=agent.bodies)
+    assert agent.busy is True
+    agency.touched[caid0] -= datetime.timedelta(seconds=60)
+    agency.sweep()
+    assert list(agency.agents.keys()) == [caid0]
+
+    assert list(body) == [b"{}"]
+    assert agent.busy is False
+    agency.touched[caid0] -= datetime.timedelta(seconds=60)
+    agency.sweep()
+    assert len(agency.agents) == 0
+    agency.get(caid0)
+
+    # Sharded agencies hibernate agents owned by another shard once the number of shards changes
+    agency.shard = 0
+    agency.adb.shrd.pin(keys=("count",), val="1")
+    agency.rebalance()
+    assert agency.ring.shards == 1
+    assert list(agency.agents.keys()) == [caid0]
+
+    agency.shard = 1 - sharding.HashRing(2).shard(caid0)
+    agency.adb.shrd.pin(keys=("count",), val="2")
+    agency.rebalance()
+    assert agency.ring.shards == 2
+    assert len(agency.agents) == 0
+
+    # Adding a shard first hands the moving agents off, until the routes switch over neither shard serves them
+    agency.shard = 0
+    agency.adb.shrd.pin(keys=("count",), val="1")
+    agency.rebalance()
+    agency.get(caid0)
+    agent = agency.get(caid1)
+    assert not sharding.handedOff(agency.adb, 1, 2)
+
+    # Moving agents are no longer served but only hibernated and acknowledged once they are idle
+    agent.queries.append(dict(pre=caid0))
+    agency.adb.shrd.pin(keys=("next",), val="2")
+    agency.rebalance()
+    assert agency.next.shards == 2
+    assert list(agency.agents.keys()) == [caid0, caid1]
+    assert not sharding.handedOff(agency.adb, 1, 2)
+    with pytest.raises(sharding.ShardError):
+        agency.get(caid1)
+
+    agent.queries.clear()
+    agency.rebalance()
+    assert list(agency.agents.keys()) == [caid0]
+    assert sharding.handedOff(agency.adb, 1, 2)
+    with pytest.raises(sharding.ShardError):
+        agency.get(caid1)
+
+    agency.adb.shrd.pin(keys=("count",), val="2")
+    agency.adb.shrd.rem(keys=("next",))
+    agency.rebalance()
+    assert agency.next is None
+    assert agency.get(caid0).caid == caid0
+    with pytest.raises(sharding.ShardError):
+        agency.get(caid1)
+
+    agency.shard = None
+    agency.adb.shrd.rem(keys=("count",))
+    agency.adb.shrd.trim(keys=("ack", ""))
+    agency.get(caid0)
+
+    assert agency.hibernate(caid0) is True
+    assert agency.hibernate(caid0) is False
+    assert len(agency.agents) == 0
+
+    clean()
+
+
 def test_boot_ends(helpers):
     agency = agenting.Agency(name="agency", bran=None, temp=True)
     doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
@@ -177,22 +326,89 @@ def test_boot_ends(helpers):
     }
 
 
-def test_witnesser(helpers):
-    salt = b'0123456789abcdef'
-    salter = coring.Salter(raw=salt)
+class WitnessHandler(server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wits = dict()
+    requests = []
 
-    with habbing.openHby(name="keria", salt=salter.qb64, temp=True) as hby:
-        witners = decking.Deck()
-        receiptor = Receiptor(hby=hby)
-        wr = agenting.Witnesser(receiptor=receiptor, witners=witners)
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        dest = self.headers["CESR-DESTINATION"]
+        self.requests.append((dest, self.path, body))
 
-        tock = 0.03125
-        limit = 1.0
-        doist = doing.Doist(limit=limit, tock=tock, real=True)
+        rct = b''
+        if self.path == "/receipts":
+            rct = bytes(self.wits[dest].receipt(serdering.SerderKERI(raw=body)))
+
+        self.send_response(200 if rct else 204)
+        self.send_header("Content-Length", str(len(rct)))
+        self.end_headers()
+        self.wfile.write(rct)
+
+    def log_message(self, format, *args):
+        pass
 
-        # doist.do(doers=doers)
-        deeds = doist.enter(doers=[wr])
-        doist.recur(deeds)
+
+def test_witnesser(monkeypatch):
+    with habbing.openHby(name="keria", temp=True) as hby, habbing.openHby(name="wits", temp=True) as whby:
+        wits = [whby.makeHab(name=f"wit{i}", transferable=False) for i in range(3)]
+        hab = hby.makeHab(name="test", wits=[wits[0].pre, wits[1].pre], toad=1)
+        hab.interact()
+
+        WitnessHandler.wits = {wit.pre: wit for wit in wits}
+        WitnessHandler.requests = []
+        httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), WitnessHandler)
+        httpd.daemon_threads = True
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+        # Witness 1 never answers, its port is held without listening on it
+        silent = socket.socket()
+        silent.bind(("127.0.0.1", 0))
+        port, quiet = httpd.server_address[1], silent.getsockname()[1]
+        ports = {wits[0].pre: port, wits[1].pre: quiet, wits[2].pre: port}
+        monkeypatch.setattr(hab, "fetchUrls", lambda eid, scheme: {scheme: f"http://127.0.0.1:{ports[eid]}"})
+
+        try:
+            witners = decking.Deck()
+            pool = forwarding.ClientPool()
+            wr = agenting.Witnesser(hby=hby, pool=pool, witners=witners, timeout=0.25)
+
+            doist = doing.Doist(limit=5.0, tock=0.01, real=True)
+            deeds = doist.enter(doers=[pool, wr])
+
+            def run(until):
+                while not until() and doist.tyme < doist.limit:
+                    doist.recur(deeds=deeds)
+                    time.sleep(doist.tock)
+
+            # Events of one prefix are receipted in order
+            for sn in range(2):
+                witners.append(dict(serder=serdering.SerderKERI(raw=hab.makeOwnEvent(sn=sn))))
+            doist.recur(deeds=deeds)
+            assert list(wr.receipting) == [hab.pre]
+            assert len(witners) == 1
+
+            run(until=lambda: not witners and not wr.receipting)
+            assert [(dest, path) for dest, path, _ in WitnessHandler.requests] == [
+                (wits[0].pre, "/receipts"), (wits[0].pre, "/"),
+                (wits[0].pre, "/receipts"), (wits[0].pre, "/")]
+            assert len(hby.db.getWigs(dbing.dgKey(hab.pre, hab.kever.serder.said))) == 1
+
+            # Added witnesses are caught up before receipting a rotation while the others receipt in parallel
+            WitnessHandler.requests = []
+            hab.rotate(adds=[wits[2].pre], cuts=[wits[1].pre], toad=2)
+            witners.append(dict(serder=hab.kever.serder))
+            run(until=lambda: not witners and not wr.receipting)
+            paths = dict()
+            for dest, path, _ in WitnessHandler.requests:
+                paths.setdefault(dest, []).append(path)
+            assert paths == {wits[0].pre: ["/receipts", "/"], wits[2].pre: ["/", "/", "/", "/receipts", "/"]}
+            assert len(hby.db.getWigs(dbing.dgKey(hab.pre, hab.kever.serder.said))) == 2
+            doist.exit(deeds=deeds)
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            silent.close()
 
 
 def test_keystate_ends(helpers):
@@ -232,6 +448,36 @@ def test_keystate_ends(helpers):
                                'd': 'EIaGMMWJFPmtXznY1IIiKDIrg-vIyge6mBl2QV8dDjI3',
                                's': '0'}
 
+        # Batch refresh only returns the states that changed
+        icp = hab.kever.serder.said
+        res = client.simulate_post("/states", json=dict(states=[dict(i=hab.pre, s="0", d=icp),
+                                                                 dict(i=agentHab.pre, s="0"),
+                                                                 dict(i="EUnknown", s="0")]))
+        assert res.status_code == 200
+        assert res.json == []
+
+        hab.interact()
+        res = client.simulate_post("/states", json=dict(states=[dict(i=hab.pre, s="0", d=icp),
+                                                                 dict(i=agentHab.pre, s="0"),
+                                                                 dict(i=agentHab.pre)]))
+        assert res.status_code == 200
+        assert [(state["i"], state["s"]) for state in res.json] == [(hab.pre, "1"), (agentHab.pre, "0")]
+        assert end.cache[(caid, hab.pre)][0] == hab.kever.serder.said
+
+        # Key states are cached per agent since first seen data comes from the database of each agent
+        class Other:
+            caid = "EOtherController"
+        assert end.state(Other(), hab.kever) == end.cache[(caid, hab.pre)][1]
+        assert list(end.cache.keys())[-1] == ("EOtherController", hab.pre)
+
+        res = client.simulate_get(f"/states?pre={hab.pre}&pre={agentHab.pre}")
+        assert [(state["i"], state["s"]) for state in res.json] == [(hab.pre, "1"), (agentHab.pre, "0")]
+
+        res = client.simulate_post("/states", json=dict(pres=[hab.pre]))
+        assert res.status_code == 400
+        res = client.simulate_post("/states", json=dict(states=[hab.pre]))
+        assert res.status_code == 400
+
 
 def test_oobi_ends(seeder, helpers):
     with helpers.openKeria() as (agency, agent, app, client), \
@@ -397,6 +643,112 @@ def test_querier(helpers):
         assert qryDoer.pre == "EI7AkI40M11MS7lkTCb10JC9-nDt-tXwQh44OHAFlv_9"
 
 
+def test_querier_coalescing(helpers):
+    with helpers.openKeria() as (agency, agent, app, client):
+        qry = agenting.Querier(hby=agent.hby, agentHab=agent.agentHab, queries=decking.Deck(), kvy=agent.kvy)
+        doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+        deeds = doist.enter(doers=[qry])
+        pre = "EI7AkI40M11MS7lkTCb10JC9-nDt-tXwQh44OHAFlv_9"
+
+        def query(tyme, *msgs):
+            for msg in msgs:
+                qry.queries.append(msg)
+                qry.recur(tyme, deeds=deeds)
+
+        # Queries for a prefix covered by one in flight are coalesced
+        query(1.0, dict(pre=pre, sn="2"), dict(pre=pre, sn="1"), dict(pre=pre, sn="2"))
+        assert [(type(doer), doer.sn) for doer in qry.doers] == [(querying.SeqNoQuerier, 2)]
+
+        # Later sequence numbers supersede the query in flight
+        query(1.0, dict(pre=pre, sn="3"))
+        assert [(type(doer), doer.sn) for doer in qry.doers] == [(querying.SeqNoQuerier, 3)]
+
+        query(1.0, dict(pre=pre), dict(pre=pre), dict(pre=pre, anchor=dict(i=pre)), dict(pre=pre, anchor=dict(i=pre)))
+        assert [type(doer) for doer in qry.doers] == [querying.SeqNoQuerier, querying.QueryDoer,
+                                                      querying.AnchorQuerier]
+
+        # Queries satisfied by the local KEL are skipped
+        hab = agent.hby.makeHab(name="local")
+        query(1.0, dict(pre=hab.pre, sn="0"))
+        assert len(qry.doers) == 3
+
+        # Successful key state queries are not repeated within the TTL
+        ksnDoer = qry.doers[1]
+        ksnDoer.recur = lambda tyme, deeds=None: True
+        qry.recur(2.0, deeds=deeds)
+        assert ksnDoer not in qry.doers
+        assert qry.answered[pre] == 2.0
+        query(2.0 + qry.KsnTTL / 2, dict(pre=pre))
+        assert len(qry.doers) == 2
+        assert qry.deferred[pre] == dict(pre=pre)  # no key state notice of the latest event stored yet
+        query(2.0 + qry.KsnTTL, dict(pre=pre))
+        assert len(qry.doers) == 3
+        assert pre not in qry.answered
+        assert pre not in qry.deferred
+        assert list(qry.queries) == [dict(pre=pre)]
+        qry.queries.clear()
+
+        # Unanswered queries are abandoned after the timeout
+        qry.recur(1.0 + qry.Timeout, deeds=deeds)
+        assert [type(doer) for doer in qry.doers] == [querying.QueryDoer]
+        query(1.0 + qry.Timeout, dict(pre=pre, sn="3"))
+        assert len(qry.doers) == 2
+
+        # Within the TTL only queries whose stored key state notice is still current are dropped
+        state = hab.kever.state()
+        agent.hby.db.ksns.pin(keys=(state.d,), val=state)
+        agent.hby.db.knas.pin(keys=(hab.pre, hab.pre), val=coring.Saider(qb64=state.d))
+        tyme = 1.0 + qry.Timeout
+        qry.answered[hab.pre] = tyme
+        query(tyme + 1.0, dict(pre=hab.pre))
+        assert hab.pre not in qry.deferred
+        hab.interact()
+        query(tyme + 1.0, dict(pre=hab.pre))
+        assert qry.deferred[hab.pre] == dict(pre=hab.pre)
+        qry.recur(tyme + qry.KsnTTL, deeds=deeds)
+        assert hab.pre not in qry.deferred
+        assert list(qry.queries) == [dict(pre=hab.pre)]
+        qry.recur(tyme + qry.KsnTTL, deeds=deeds)
+        assert (hab.pre, "ksn") in qry.inflight
+
+
+def test_escrower(helpers):
+    with helpers.openKeria() as (agency, agent, app, client):
+        runs = []
+        agent.kvy.processEscrows = lambda: runs.append("kvy")
+        agent.exc.processEscrow = lambda: runs.append("exc")
+
+        escrower = agenting.Escrower(kvy=agent.kvy, rgy=agent.rgy, rvy=agent.rvy, tvy=agent.tvy, exc=agent.exc,
+                                     vry=agent.verifier, registrar=agent.registrar,
+                                     credentialer=agent.credentialer)
+        assert len(escrower.schedules) == 8
+
+        # First pass processes everything
+        escrower.recur(tyme=0.0)
+        assert runs == ["kvy", "exc"]
+
+        # Nothing written to the databases so nothing is processed
+        runs.clear()
+        escrower.recur(tyme=0.1)
+        assert runs == []
+
+        # After the backoff period the escrows are processed again and the backoff grows
+        escrower.recur(tyme=escrower.MinBackoff)
+        assert runs == ["kvy", "exc"]
+        assert escrower.schedules[0].backoff == escrower.MinBackoff * 2
+
+        # A write to the database marks the escrows dirty
+        runs.clear()
+        agent.hby.db.oobis.pin(keys=("http://127.0.0.1/oobi",), val=basing.OobiRecord(date="2023-01-01"))
+        escrower.recur(tyme=escrower.MinBackoff + 0.1)
+        assert runs == ["kvy", "exc"]
+
+        # Backoff never grows beyond the maximum
+        for i in range(10):
+            escrower.recur(tyme=100.0 * (i + 1))
+        assert escrower.schedules[0].backoff == escrower.MaxBackoff
+
+
 class MockServerTls:
     def __init__(self,  certify, keypath, certpath, cafilepath, port):
         pass
@@ -449,3 +801,91 @@ def test_seeker_doer(helpers):
         result = seeker.recur()
         assert result is False
         assert len(cues) == 1
+
+        # Cues are drained in batches, unindexable and unknown cues are put back
+        cues.append(dict(kin="unknown"))
+        cues.append(dict(kin="saved", creder=creder))
+        result = seeker.recur()
+        assert result is False
+        assert len(cues) == 3
+        assert [cue["kin"] for cue in cues] == ["saved", "saved", "unknown"]
+
+
+def test_reindex_ends(helpers):
+    with helpers.openKeria() as (agency, agent, app, client):
+        app.add_route("/reindexes", agenting.ReindexCollectionEnd())
+        app.add_route("/operations/{name}", longrunning.OperationResourceEnd())
+
+        res = client.simulate_post("/reindexes", body=json.dumps(dict(index="bad")).encode("utf-8"))
+        assert res.status_code == 400
+
+        res = client.simulate_post("/reindexes", body=json.dumps(dict(index="exchanges")).encode("utf-8"))
+        assert res.status_code == 202
+        assert res.json["name"] == "reindex.exchanges"
+        assert res.json["done"] is False
+
+        reindexer = agenting.Reindexer(seekers=[agent.seeker, agent.exnseeker])
+        reindexer.recur()
+
+        res = client.simulate_get("/operations/reindex.exchanges")
+        assert res.status_code == 200
+        assert res.json["done"] is True
+        assert res.json["response"] == dict(count=0)
+
+
+def test_operation_collector(helpers):
+    with helpers.openKeria() as (agency, agent, app, client):
+        for i in range(3):
+            agent.monitor.submit(f"aid{i}", longrunning.OpTypes.done, metadata=dict(response=dict(i=i)))
+
+        # Unconfigured collector keeps all operations
+        collector = agenting.OperationCollector(monitor=agent.monitor)
+        assert collector.recur() is False
+        assert len(agent.monitor.getOperations()) == 3
+
+        collector = agenting.OperationCollector(monitor=agent.monitor, maxOps=2)
+        collector.BatchSize = 1
+        assert collector.recur() is False
+        assert [op.name for op in agent.monitor.getOperations()] == ["done.aid1", "done.aid2"]
+
+        collector = agenting.OperationCollector(monitor=agent.monitor, ttl=0)
+        assert collector.recur() is False
+        assert agent.monitor.getOperations() == []
+
+
+def test_exchange_waiter(helpers):
+    with helpers.openKeria() as (agency, agent, app, client):
+        exchanges = decking.Deck()
+        admits = decking.Deck()
+        waiter = agenting.ExchangeWaiter()
+        sender = agenting.ExchangeSender(hby=agent.hby, agentHab=agent.agentHab, exc=agent.exc, exchanges=exchanges,
+                                         pool=agency.pool, waiter=waiter)
+        admitter = agenting.Admitter(hby=agent.hby, witq=agent.witq, psr=agent.parser, agentHab=agent.agentHab,
+                                     exc=agent.exc, admits=admits, waiter=waiter, queries=decking.Deck())
+
+        # Incomplete exchanges wait outside of the decks instead of being requeued every tick
+        said = "EHwjDEsub6XT19ISLft1m1xMNvVXnSfH0IsDGllox4Y8"
+        exchanges.append(dict(said=said, pre=agent.agentHab.pre, rec=[], topic="credential"))
+        admits.append(dict(said=said, pre=agent.agentHab.pre))
+        sender.recur(tyme=0.0)
+        assert admitter.recur(tyme=0.0) is False
+        assert len(exchanges) == 0 and len(admits) == 0
+        assert len(waiter.waiting[said]) == 2
+
+        # Saved cues of the Exchanger wake all messages waiting on the exn
+        cues = decking.Deck([dict(kin="saved", said=said)])
+        cuer = agenting.ExchangeCueDoer(seeker=agent.exnseeker, cues=cues, queries=decking.Deck(), waiter=waiter)
+        cuer.recur()
+        assert said not in waiter.waiting
+        assert [msg["said"] for msg in exchanges] == [said]
+        assert [msg["said"] for msg in admits] == [said]
+
+        # Abandoned exchanges are dropped after the timeout
+        waiter.wait(said=said, deck=exchanges, msg=exchanges.popleft())
+        assert waiter.expire() == 0
+        waiter.timeout = 0
+        waiter.wait(said="EAbandoned", deck=admits, msg=admits.popleft())
+        assert waiter.recur() is False
+        assert list(waiter.waiting) == [said]
+        waiter.complete(said="EAbandoned")
+        assert len(admits) == 0
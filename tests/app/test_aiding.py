@@ -240,7 +240,7 @@ def test_agent_resource(helpers, mockHelpingNowUTC):
                             'title': '400 Bad Request'}
 
 
-def test_identifier_collection_end(helpers):
+def test_identifier_collection_end(helpers, monkeypatch):
     with helpers.openKeria() as (agency, agent, app, client), \
             habbing.openHby(name="p1", temp=True) as p1hby, \
             habbing.openHby(name="p2", temp=True) as p2hby:
@@ -713,6 +713,28 @@ def test_identifier_collection_end(helpers):
         assert len(events) == 3
         assert events[2] == serder.ked
 
+        # Only newer events, a limited number of events, or the KEL as CESR
+        res = client.simulate_get(path=f"/events?pre={pre}&fromSn=1")
+        assert res.status_code == 200
+        assert [event["s"] for event in res.json] == ["1", "2"]
+
+        res = client.simulate_get(path=f"/events?pre={pre}&fromSn=1&limit=1")
+        assert res.status_code == 200
+        assert [event["s"] for event in res.json] == ["1"]
+
+        res = client.simulate_get(path=f"/events?pre={pre}&fromSn=3")
+        assert res.status_code == 200
+        assert res.json == []
+
+        res = client.simulate_get(path=f"/events?pre={pre}&limit=-1")
+        assert res.status_code == 400
+
+        monkeypatch.setattr(agenting.KeyEventIterable, "BatchSize", 2)
+        res = client.simulate_get(path=f"/events?pre={pre}", headers={"Accept": "application/json+cesr"})
+        assert res.status_code == 200
+        assert res.headers["Content-Type"] == "application/json+cesr"
+        assert res.content == b"".join(bytes(msg) for msg in agent.hby.db.clonePreIter(pre=pre))
+
         # Bad interactions
         res = client.simulate_put(path="/identifiers/badrandy?type=ixn", body=json.dumps(body))
         assert res.status_code == 404
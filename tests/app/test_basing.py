@@ -9,10 +9,12 @@ import random
 
 import pytest
 from keri.app import habbing, signing
-from keri.core import parsing
+from keri.core import coring, parsing
 from keri.peer import exchanging
 from keri.vc import protocoling
+from keri.vdr import viring
 
+from keria.app.cli.commands import reindex
 from keria.db import basing
 
 QVI_SAID = "EFgnk_c08WmZGgv9_mpldibRuqFMTQN-rAgtD-TCOwbs"
@@ -167,6 +169,163 @@ def test_seeker(helpers, seeder, mockHelpingNowUTC):
         saids = seeker.find({'-i': {'$eq': issuerHab.pre}, '-a-LEI': {'$eq': 'U6452GAE5C4TVRUY9EIX'}}).sort(['-a-LEI'])
         assert list(saids) == ['ELDA-hNidE8nsNOYAg993mOLiYAew_eIgicEiK_ilb9Y']
 
+        # Cursor is lazy, only loads as many values as are needed to fill the page
+        loads = []
+        values = seeker.values
+
+        def counting(saids, pathers=None):
+            loads.extend(saids)
+            return values(saids, pathers=pathers)
+
+        seeker.values = counting
+        cursor = seeker.find({'-a-LEI': {'$begins': 'Y'}}).sort(['-i']).limit(2)
+        assert len(loads) == 0
+        saids = list(cursor)
+        assert len(saids) == 2
+        assert len(loads) < 50
+        assert cursor.cur == 2
+
+        loads.clear()
+        saids = seeker.find({'-i': {'$eq': issuerHab.pre}, '-a-LEI': {'$begins': 'Q'}}).limit(1)
+        assert len(list(saids)) == 1
+        assert len(loads) < 50
+        seeker.values = values
+
+        # Continuation tokens resume each query where the previous page ended
+        for filtr, sort in (({}, None), ({}, ['-a-LEI']), ({'-a-LEI': {'$begins': 'Q'}}, None),
+                            ({'-i': issuerHab.pre, '-a-LEI': {'$begins': 'Y'}}, None)):
+            expected = list(seeker.find(filtr, sort=sort).limit(50))
+            saids = []
+            cursor = seeker.find(filtr, sort=sort).limit(3)
+            while True:
+                saids.extend(cursor)
+                if cursor.token is None:
+                    break
+                cursor = seeker.find(filtr, sort=sort, limit=3, after=cursor.token)
+
+            assert saids == expected
+
+        with pytest.raises(ValueError):
+            seeker.find({}, after="bogus")
+
+        # Tokens only resume the query they were created for, over the index that drove it
+        cursor = seeker.find({'-a-LEI': {'$begins': 'Q'}}).limit(1)
+        list(cursor)
+        assert cursor.index == coring.Pather(bext='-a-LEI').qb64
+        with pytest.raises(ValueError):
+            list(seeker.find({'-a-LEI': {'$begins': 'Y'}}, after=cursor.token))
+        with pytest.raises(ValueError):
+            list(seeker.find({'-a-LEI': {'$begins': 'Q'}}, skip=1, after=cursor.token))
+        idx = seeker.indexes.pop(cursor.index)
+        with pytest.raises(ValueError):
+            list(seeker.find({'-a-LEI': {'$begins': 'Q'}}, after=cursor.token))
+        seeker.indexes[cursor.index] = idx
+
+        # Range, set and not equal operators
+        every = list(seeker.find({}).limit(50))
+        leis = {said: seeker.value(said)['a']['LEI'] for said in every}
+
+        def expect(pred):
+            return sorted(said for said, lei in leis.items() if pred(lei))
+
+        saids = seeker.find({'-a-LEI': {'$gte': 'K1BC76MZ5JK5G3289MJH', '$lt': 'Q'}}).limit(50)
+        assert sorted(saids) == expect(lambda lei: 'K1BC76MZ5JK5G3289MJH' <= lei < 'Q')
+        assert len(expect(lambda lei: 'K1BC76MZ5JK5G3289MJH' <= lei < 'Q')) == 13
+
+        saids = seeker.find({'-a-LEI': {'$gt': 'K1BC76MZ5JK5G3289MJH', '$lte': 'QA3NXK31GVLM2I6Z93I0'}}).limit(50)
+        assert sorted(saids) == expect(lambda lei: 'K1BC76MZ5JK5G3289MJH' < lei <= 'QA3NXK31GVLM2I6Z93I0')
+
+        saids = seeker.find({'-a-LEI': {'$in': ['U6452GAE5C4TVRUY9EIX', 'Y0HFPYCR42XB09ODFV07', 'NOPE']}}).limit(50)
+        assert sorted(saids) == expect(lambda lei: lei in ('U6452GAE5C4TVRUY9EIX', 'Y0HFPYCR42XB09ODFV07'))
+
+        saids = seeker.find({'-a-LEI': {'$ne': 'U6452GAE5C4TVRUY9EIX'}}).limit(50)
+        assert sorted(saids) == expect(lambda lei: lei != 'U6452GAE5C4TVRUY9EIX')
+
+        # Every credential was issued at the same date time
+        dts = {seeker.value(said)['a']['dt'] for said in every}
+        assert len(dts) == 1
+        dt = dts.pop()
+        assert len(list(seeker.find({'-a-dt': {'$gte': dt}}).limit(50))) == 50
+        assert len(list(seeker.find({'-a-dt': {'$gt': dt}}).limit(50))) == 0
+        assert len(list(seeker.find({'-a-dt': {'$gt': '2000-01-01', '$lte': dt}}).limit(50))) == 50
+        assert len(list(seeker.find({'-a-dt': {'$lt': dt}}).limit(50))) == 0
+        for bounds in ({'$gte': 'K', '$gt': 1}, {'$lte': 'K', '$lt': 1}, {'$gt': 'K', '$lt': 1.5}, {'$gte': True}):
+            with pytest.raises(ValueError):
+                seeker.find({'-a-LEI': bounds})
+
+        # The planner drives the query from the most selective index
+        cursor = seeker.find({'-i': issuerHab.pre, '-a-LEI': {'$in': ['U6452GAE5C4TVRUY9EIX']}})
+        assert cursor.plan().name == '5AACAA-a-LEI'
+        assert list(cursor) == expect(lambda lei: lei == 'U6452GAE5C4TVRUY9EIX')
+        cursor = seeker.find({'-a-LEI': {'$ne': 'U6452GAE5C4TVRUY9EIX'}})
+        assert cursor.plan() is None
+
+        # Counts are answered from the indexes and agree with the results
+        assert seeker.find({}).count() == 50
+        assert seeker.find({'-i': issuerHab.pre}).count() == 50
+        assert seeker.find({'-a-LEI': {'$begins': 'Q'}}).count() == 3
+        assert seeker.find({'-a-LEI': {'$gte': 'K1BC76MZ5JK5G3289MJH', '$lt': 'Q'}}).count() == 13
+        assert seeker.find({'-a-LEI': {'$in': ['U6452GAE5C4TVRUY9EIX', 'U6452GAE5C4TVRUY9EIX']}}).count() == 1
+        assert seeker.find({'-a-LEI': {'$ne': 'U6452GAE5C4TVRUY9EIX'}}).count() == 49
+        assert seeker.find({'-i': {'$eq': issuerHab.pre}, '-a-LEI': {'$begins': 'Y'}}).skip(2).limit(1).count() == 4
+        assert seeker.find({'-s': QVI_SAID, '-a-LEI': 'U6452GAE5C4TVRUY9EIX'}).count() == 1
+
+        # Batch loads project only the requested fields
+        said = every[0]
+        assert seeker.values([said, "EZ-i0d8JZAoTNZH3ULaU6JR2nmwyvYAfSVPzhzS6b5CM"],
+                             pathers=[coring.Pather(bext='-a-LEI'), coring.Pather(bext='-s')]) == \
+            [(said, {'a': {'LEI': leis[said]}, 's': QVI_SAID}),
+             ("EZ-i0d8JZAoTNZH3ULaU6JR2nmwyvYAfSVPzhzS6b5CM", None)]
+        assert seeker.values([said]) == [(said, seeker.value(said))]
+
+        # Unindexed fields are evaluated with AND semantics and no duplicates
+        saids = seeker.find({'-a-u': {'$ne': 'x'}, '-a-LEI': {'$begins': 'Y'}, '-v': {'$begins': 'ACDC'}}).limit(50)
+        assert sorted(saids) == expect(lambda lei: lei.startswith('Y'))
+        saids = seeker.find({'-v': {'$begins': 'ACDC'}, '-a-missing': 'x'}).limit(50)
+        assert list(saids) == []
+
+        # Paging keeps walking the index of the first page even when a fresh plan would choose another one
+        filtr = {'-i': {'$eq': issuerHab.pre}, '-a-LEI': {'$begins': 'Q'}}
+        expected = expect(lambda lei: lei.startswith('Q'))
+        cursor = seeker.find(filtr).limit(2)
+        saids = list(cursor)
+        lei = coring.Pather(bext='-a-LEI').qb64
+        assert cursor.index == lei
+
+        fakes = [(lei, f"Q{i:04}", coring.Diger(ser=f"fake-{i}".encode("utf-8")).qb64) for i in range(100)]
+        basing.writeIndexes(seeker, fakes)
+        assert seeker.find(filtr).route() == coring.Pather(bext='-i').qb64
+        while cursor.token is not None:
+            cursor = seeker.find(filtr, limit=2, after=cursor.token)
+            saids.extend(cursor)
+            assert cursor.index == lei
+
+        assert len(expected) > 2
+        assert sorted(saids) == expected
+        assert len(set(saids)) == len(saids)
+        for _, value, _ in fakes:
+            seeker.indexes[lei].rem(keys=(value,))
+
+        # Background reindex walks the table in resumable batches and offline rebuild recreates every index
+        assert basing.reindex(seeker) is None
+        basing.startReindex(seeker)
+        rec = basing.reindex(seeker, size=20)
+        assert (rec.count, rec.done, rec.last) == (20, False, every[19])
+        while not (rec := basing.reindex(seeker, size=20)).done:
+            pass
+        assert rec.count == 50
+        assert sorted(seeker.find({'-a-LEI': {'$begins': 'Q'}})) == expect(lambda lei: lei.startswith('Q'))
+
+        assert basing.rebuild(seeker, size=7) == 50
+        assert seeker.reidx.get(keys=("table",)).done is True
+        assert seeker.find({'-i': issuerHab.pre}).count() == 50
+        assert sorted(seeker.find({'-a-LEI': {'$begins': 'Q'}})) == expect(lambda lei: lei.startswith('Q'))
+        assert list(seeker.find({}).sort(['-a-LEI']).limit(5)) == ['EAzc9zFLaK22zbrKDGIgKtrpDBNKWKvl8B0FKYAo19z_',
+                                                                  'EFW50stHOz-0_8Dh7EcYs0DsLZ06d4hwGKjRbOB8hgnR',
+                                                                  'EBiyZ2iyZodulzaUACzl_Cg6fRc1D0EPyNOooFemFK3e',
+                                                                  'EIn3igRf049kPQvpLjjLjU80QITreObH4BJguAxMPqis',
+                                                                  'ENnhxrOOeKIESS7_Yk7yVkJLm6blSOedACZvKFdMcxg5']
+
 
 def randomLEI():
     values = "0123456789ABCDEFGHIJKLNMOPQRTUVXZY"
@@ -318,4 +477,49 @@ def test_exnseeker(helpers, seeder, mockHelpingNowUTC):
         saids = seeker.find({'-a-i': {'$eq': issueeHab.pre}})
         assert list(saids) == [grant.said, apply.said]
 
+        assert basing.rebuild(seeker) == 2
+        assert list(seeker.find({'-a-i': {'$eq': issueeHab.pre}})) == [grant.said, apply.said]
+        assert list(seeker.find({'-e-acdc-s': {'$eq': QVI_SAID}})) == [grant.said]
+
+        # Runs that sort before the end of an index are inserted and values too big to be keys are left out
+        idx = seeker.indexes['5AABAA-i']
+        basing.flushIndex(idx, [('5AABAA-i', "A" * 1024, grant.said), ('5AABAA-i', "AAA", grant.said)])
+        assert list(seeker.find({'-i': {'$eq': "AAA"}})) == [grant.said]
+        assert seeker.find({'-i': {'$begins': "A"}}).count() == 1
+        assert list(seeker.find({'-i': {'$eq': issuerHab.pre}})) == [grant.said, apply.said]
+
+
+def test_rebuild_agent(capsys):
+    salt = b'0123456789abcdef'
+    base = "test-reindex"
+
+    with habbing.openHab(name="reindexer", base=base, salt=salt, temp=False) as (hby, hab):
+        exc = exchanging.Exchanger(hby=hby, handlers=[])
+        apply, atc = protocoling.ipexApplyExn(hab, hab.pre, "Please give me credential", QVI_SAID, dict())
+        msg = bytearray(apply.raw)
+        msg.extend(atc)
+        parsing.Parser().parseOne(ims=msg, exc=exc)
 
+        seeker = basing.ExnSeeker(name="reindexer", db=hby.db, reopen=True)
+        assert list(seeker.find({'-i': {'$eq': hab.pre}})) == []
+        seeker.close()
+        pre = hab.pre
+
+    try:
+        reindex.rebuildAgent(caid="reindexer", base=base)
+        out = capsys.readouterr().out
+        assert "Agent reindexer: reindexed 0 credentials" in out
+        assert "Agent reindexer: reindexed 1 exchange messages" in out
+
+        with habbing.openHby(name="reindexer", base=base, salt=coring.Salter(raw=salt).qb64, temp=False) as hby:
+            seeker = basing.ExnSeeker(name="reindexer", db=hby.db, reopen=True)
+            assert list(seeker.find({'-i': {'$eq': pre}})) == [apply.said]
+            assert seeker.reidx.get(keys=("table",)).count == 1
+            seeker.close()
+    finally:
+        with habbing.openHby(name="reindexer", base=base, salt=coring.Salter(raw=salt).qb64, temp=False) as hby:
+            reger = viring.Reger(name="agent-reindexer", base=base, reopen=True)
+            basing.Seeker(name="reindexer", db=hby.db, reger=reger, reopen=True).close(clear=True)
+            basing.ExnSeeker(name="reindexer", db=hby.db, reopen=True).close(clear=True)
+            reger.close(clear=True)
+            hby.close(clear=True)
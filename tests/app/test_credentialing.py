@@ -15,9 +15,9 @@ from keri.core import scheming, coring, parsing, serdering
 from keri.core.eventing import TraitCodex, SealEvent
 from keri.vc import proving
 from keri.vdr import eventing
-from keri.vdr.credentialing import Regery, Registrar
+from keri.vdr.credentialing import Regery, Registrar, sendArtifacts
 
-from keria.app import credentialing, aiding
+from keria.app import agenting, credentialing, aiding
 from keria.core import longrunning
 
 
@@ -259,7 +259,7 @@ def test_issue_credential(helpers, seeder):
         assert agent.credentialer.complete(creder.said) is True
 
 
-def test_credentialing_ends(helpers, seeder):
+def test_credentialing_ends(helpers, seeder, monkeypatch):
     salt = b'0123456789abcdef'
 
     with helpers.openKeria() as (agency, agent, app, client), \
@@ -318,6 +318,31 @@ def test_credentialing_ends(helpers, seeder):
 
         parsing.Parser(kvy=agent.kvy, rvy=agent.rvy, tvy=agent.tvy, vry=agent.verifier).parse(ims)
 
+        # Grant artifacts hold each KEL and TEL sent by keripy once, tagged with the issuee they are not sent to
+        class Collector:
+            def __init__(self):
+                self.sent = []
+
+            def send(self, serder, attachment=None):
+                self.sent.append((serder.said, bytes(attachment)))
+
+        for msg in agent.hby.db.clonePreIter(pre=issuee):
+            parsing.Parser(kvy=hby.kvy).parse(ims=bytearray(msg))
+        creder = issuer.rgy.reger.creds.get(keys=(saids[2],))
+        artifacts = agenting.grantArtifacts(hby, issuer.rgy.reger, creder)
+        postman = Collector()
+        sendArtifacts(hby, issuer.rgy.reger, postman, creder, "ERecipient")
+        for source, atc in issuer.rgy.reger.sources(hby.db, creder):
+            sendArtifacts(hby, issuer.rgy.reger, postman, source, "ERecipient")
+            postman.send(serder=source, attachment=atc)
+
+        bundle = [(serder.said, bytes(atc)) for serder, atc, _ in artifacts]
+        assert len(set(bundle)) == len(bundle)
+        assert list(dict.fromkeys(postman.sent)) == bundle
+        assert {isse for serder, _, isse in artifacts if serder.pre == issuee} == {issuee}
+        assert {isse for serder, _, isse in artifacts if serder.pre == hab.pre} == {None}
+        assert artifacts[-1][0].pre == saids[2]
+
         for said in saids:
             agent.seeker.index(said)
 
@@ -369,12 +394,71 @@ def test_credentialing_ends(helpers, seeder):
         res = client.simulate_post(f"/credentials/query", body=body)
         assert res.status_code == 200
         assert len(res.json) == 1
+        assert res.headers['Content-Range'] == "credentials 4-4/5"
+
+        body = json.dumps({'filter': {'-s': {'$eq': issuer.LE}}, 'count': True}).encode("utf-8")
+        res = client.simulate_post(f"/credentials/query", body=body)
+        assert res.status_code == 200
+        assert res.json == {'count': 3}
+        assert res.headers['Content-Range'] == "credentials */3"
+
+        body = json.dumps({'filter': {'-s': {'$eq': issuer.LE}}, 'limit': 2}).encode("utf-8")
+        res = client.simulate_post(f"/credentials/query", body=body)
+        assert res.status_code == 200
+        assert res.headers['Content-Range'] == "credentials 0-1/3"
+
+        # Totals that would need a walk of the matches are left unknown on ordinary pages
+        body = json.dumps({'filter': {'-s': {'$ne': issuer.LE}}, 'limit': 2}).encode("utf-8")
+        res = client.simulate_post(f"/credentials/query", body=body)
+        assert res.status_code == 200
+        assert len(res.json) == 2
+        assert res.headers['Content-Range'] == "credentials 0-1/*"
+
+        body = json.dumps({'filter': {'-s': {'$ne': issuer.LE}}, 'count': True}).encode("utf-8")
+        res = client.simulate_post(f"/credentials/query", body=body)
+        assert res.status_code == 200
+        assert res.json == {'count': 2}
 
         body = json.dumps({'limit': 4, 'skip':0, 'sort': ['-i']}).encode("utf-8")
         res = client.simulate_post(f"/credentials/query", body=body)
         assert res.status_code == 200
         assert len(res.json) == 4
 
+        # Page through with continuation tokens
+        pages = []
+        after = None
+        for _ in range(3):
+            query = {'limit': 2, 'sort': ['-i']}
+            if after is not None:
+                query['after'] = after
+            res = client.simulate_post(f"/credentials/query", body=json.dumps(query).encode("utf-8"))
+            assert res.status_code == 200
+            pages.append([cred['sad']['d'] for cred in res.json])
+            after = res.headers.get('Continuation-Token')
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert after is None
+        assert sorted(said for page in pages for said in page) == sorted(saids)
+
+        body = json.dumps({'filter': {'-s': {'$eq': issuer.LE}}, 'limit': 2}).encode("utf-8")
+        res = client.simulate_post(f"/credentials/query", body=body)
+        assert res.status_code == 200
+        assert len(res.json) == 2
+        body = json.dumps({'filter': {'-s': {'$eq': issuer.LE}}, 'limit': 2,
+                           'after': res.headers['Continuation-Token']}).encode("utf-8")
+        res = client.simulate_post(f"/credentials/query", body=body)
+        assert res.status_code == 200
+        assert len(res.json) == 1
+        assert 'Continuation-Token' not in res.headers
+
+        body = json.dumps({'after': "not a token"}).encode("utf-8")
+        res = client.simulate_post(f"/credentials/query", body=body)
+        assert res.status_code == 400
+
+        body = json.dumps({'filter': {'-a-LEI': {'$gte': 'A', '$gt': 1}}}).encode("utf-8")
+        res = client.simulate_post(f"/credentials/query", body=body)
+        assert res.status_code == 400
+
         res = client.simulate_get(f"/credentials/{saids[0]}")
         assert res.status_code == 200
         assert res.headers['content-type'] == "application/json"
@@ -384,6 +468,87 @@ def test_credentialing_ends(helpers, seeder):
         res = client.simulate_get(f"/credentials/{saids[0]}", headers=headers)
         assert res.status_code == 200
         assert res.headers['content-type'] == "application/json+cesr"
+        assert res.content == credentialing.CredentialResourceEnd.outputCred(agent.hby, agent.rgy, saids[0])
+
+        # Chained credentials share the KELs and TELs of their issuer, emitted once
+        res = client.simulate_get(f"/credentials/{saids[2]}", headers=headers)
+        assert res.status_code == 200
+        assert res.content.count(hab.kever.serder.raw) == 1
+        assert res.content.count(issuer.rgy.reger.tevers[registry.regk].serder.raw) == 1
+        exported = res.content
+
+        # Exports are cached until the logs advance
+        calls = []
+        streamCred = credentialing.CredentialResourceEnd.streamCred
+        monkeypatch.setattr(credentialing.CredentialResourceEnd, "streamCred",
+                            staticmethod(lambda *pa: calls.append(pa) or streamCred(*pa)))
+        res = client.simulate_get(f"/credentials/{saids[2]}", headers=headers)
+        assert res.content == exported
+        assert calls == []
+
+        agent.agentHab.interact()
+        res = client.simulate_get(f"/credentials/{saids[2]}", headers=headers)
+        assert res.content == exported
+        assert len(calls) == 1
+
+        res = client.simulate_get(f"/credentials/{saids[0][:-4]}AAAA", headers=headers)
+        assert res.status_code == 404
+
+
+def test_grant_artifacts_issuees():
+    """ KELs added for the issuees of several credentials in a chain are sent to every recipient """
+
+    class Kever:
+        def __init__(self, delegator=None):
+            self.delegated = delegator is not None
+            self.delegator = delegator
+
+    class Acdc:
+        def __init__(self, said, issuer, issuee):
+            self.said = said
+            self.issuer = issuer
+            self.attrib = dict(i=issuee)
+            self.regi = None
+
+    class Reger:
+        def __init__(self, sources):
+            self.chain = sources
+
+        @staticmethod
+        def clonePreIter(pre):
+            return iter([])
+
+        def sources(self, db, creder):
+            return self.chain
+
+    with habbing.openHby(name="issuer") as hby:
+        issuer = hby.makeHab(name="issuer")
+        delegator = hby.makeHab(name="delegator")
+        issueeA = hby.makeHab(name="issueeA")
+        issueeB = hby.makeHab(name="issueeB")
+
+        # Both issuees are delegated by the same delegator
+        kevers = {issuer.pre: Kever(), delegator.pre: Kever(),
+                  issueeA.pre: Kever(delegator=delegator.pre), issueeB.pre: Kever(delegator=delegator.pre)}
+
+        class Db:
+            def __init__(self):
+                self.kevers = kevers
+
+            @staticmethod
+            def clonePreIter(pre):
+                return hby.db.clonePreIter(pre=pre)
+
+        class Hby:
+            db = Db()
+
+        source = Acdc(said="ESource", issuer=issuer.pre, issuee=issueeA.pre)
+        creder = Acdc(said="ECreder", issuer=issuer.pre, issuee=issueeB.pre)
+        artifacts = agenting.grantArtifacts(Hby(), Reger([(source, b"")]), creder)
+
+        tags = {serder.pre: isse for serder, _, isse in artifacts if serder is not source}
+        assert tags == {issuer.pre: None, delegator.pre: None, issueeA.pre: issueeA.pre, issueeB.pre: issueeB.pre}
+        assert artifacts[-1] == (source, b"", None)
 
 
 def test_revoke_credential(helpers, seeder):
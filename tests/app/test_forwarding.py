@@ -0,0 +1,175 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.forwarding module
+
+Testing pooled delivery of outbound messages
+"""
+import threading
+import time
+from http import server
+
+from hio.base import doing
+from hio.help import Hict
+from keri.app import habbing
+
+from keria.app import forwarding
+
+
+class RecordingHandler(server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_PUT(self):
+        self.do_POST()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.requests.append(dict(method=self.command, path=self.path, peer=self.client_address, body=body,
+                                  headers=self.headers))
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        if self.path.startswith("/close"):
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port):
+    httpd = server.ThreadingHTTPServer(("127.0.0.1", port), RecordingHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def run(doers, until, limit=5.0):
+    doist = doing.Doist(limit=limit, tock=0.01, real=True)
+    deeds = doist.enter(doers=doers)
+    while not until() and doist.tyme < limit:
+        doist.recur(deeds=deeds)
+        time.sleep(doist.tock)
+    doist.exit(deeds=deeds)
+
+
+def test_client_pool():
+    RecordingHandler.requests = []
+    httpd = serve(5980)
+    try:
+        pool = forwarding.ClientPool(maxPerHost=2)
+
+        # Requests to one endpoint share at most maxPerHost kept alive connections
+        deliveries = [pool.request("http://127.0.0.1:5980", body=f"msg-{i}".encode("utf-8")) for i in range(6)]
+        run([pool], until=lambda: all(delivery.done for delivery in deliveries))
+        assert [delivery.rep.status for delivery in deliveries] == [204] * 6
+        assert sorted(request["body"] for request in RecordingHandler.requests) == \
+               [f"msg-{i}".encode("utf-8") for i in range(6)]
+        assert len({request["peer"] for request in RecordingHandler.requests}) == 2
+
+        # Connections closed by the server are reopened
+        RecordingHandler.requests = []
+        deliveries = [pool.request("http://127.0.0.1:5980/close?q=1", method="POST", body=b"one")]
+        deliveries.extend(pool.request("http://127.0.0.1:5980/", body=b"two") for _ in range(3))
+        run([pool], until=lambda: all(delivery.done for delivery in deliveries))
+        assert [delivery.rep.status for delivery in deliveries] == [204] * 4
+        assert [request["method"] for request in RecordingHandler.requests if request["path"] == "/close?q=1"] == \
+               ["POST"]
+
+        # Unreachable endpoints fail after the timeout
+        pool = forwarding.ClientPool(timeout=0.2)
+        delivery = pool.request("http://127.0.0.1:5981", body=b"lost")
+        run([pool], until=lambda: delivery.done)
+        assert delivery.done is True
+        assert delivery.rep is None
+        assert delivery.error == "no response after 0.2 seconds"
+        assert pool.queues == {}
+
+        # Endpoints are forgotten once their connections are closed for being idle
+        pool = forwarding.ClientPool(idleTimeout=0.0)
+        delivery = pool.request("http://127.0.0.1:5980", body=b"idle")
+        run([pool], until=lambda: delivery.done and not pool.queues)
+        assert delivery.rep.status == 204
+        assert pool.queues == {}
+
+        # Time spent waiting for a connection counts towards the timeout
+        pool = forwarding.ClientPool(maxPerHost=1, timeout=0.2)
+        deliveries = [pool.request("http://127.0.0.1:5981", body=b"lost"),
+                      pool.request("http://127.0.0.1:5981", body=b"late", timeout=0.1)]
+        run([pool], until=lambda: deliveries[1].done)
+        assert deliveries[1].error == "not sent within 0.1 seconds"
+        assert deliveries[1].attempts == 0
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_connection_retry():
+    # Requests are sent again after a kept alive connection went stale only when that can not repeat them
+    conn = forwarding.Connection("http", "127.0.0.1", 5981)
+    conn.used = 1.0
+    post = forwarding.Delivery(method="POST", path="/", headers=Hict(), body=b"post")
+    conn.start(post)
+    assert conn.unwritten() is True
+    assert conn.fail("connection closed before response") is post
+
+    conn = forwarding.Connection("http", "127.0.0.1", 5981)
+    conn.used = 1.0
+    conn.start(post)
+    conn.written = True
+    assert conn.fail("connection closed before response") is None
+    assert post.error == "connection closed before response"
+
+    conn = forwarding.Connection("http", "127.0.0.1", 5981)
+    conn.used = 1.0
+    put = forwarding.Delivery(method="PUT", path="/", headers=Hict(), body=b"put")
+    conn.start(put)
+    conn.written = True
+    assert conn.fail("connection closed before response") is put
+
+    # Requests on new connections are not sent again
+    conn = forwarding.Connection("http", "127.0.0.1", 5981)
+    delivery = forwarding.Delivery(method="PUT", path="/", headers=Hict(), body=b"new")
+    conn.start(delivery)
+    assert conn.fail("connection refused") is None
+    assert delivery.error == "connection refused"
+
+
+def test_messengers():
+    RecordingHandler.requests = []
+    httpd = serve(5982)
+    try:
+        with habbing.openHby(name="sender", temp=True) as hby:
+            hab = hby.makeHab(name="sender")
+            msg = hab.makeOwnEvent(sn=0)
+            urls = dict(http="http://127.0.0.1:5982/")
+            pool = forwarding.ClientPool()
+
+            # Streams are sent in one request
+            streamer = forwarding.streamMessengerFrom(pool=pool, hab=hab, pre="ERecipient", urls=urls, msg=bytes(msg),
+                                                      headers={"Signify-Resource": "EAgent"})
+            assert isinstance(streamer, forwarding.StreamMessenger)
+            run([pool, streamer], until=lambda: streamer.done)
+            assert streamer.delivery.error is None
+            assert streamer.rep.status == 204
+            request = RecordingHandler.requests[0]
+            assert request["method"] == "PUT"
+            assert request["body"] == bytes(msg)
+            assert request["headers"]["CESR-DESTINATION"] == "ERecipient"
+            assert request["headers"]["Signify-Resource"] == "EAgent"
+
+            # Messages are sent as separate CESR requests with their attachments in a header
+            RecordingHandler.requests = []
+            messenger = forwarding.messengerFrom(pool=pool, hab=hab, pre="ERecipient", urls=urls)
+            assert isinstance(messenger, forwarding.Messenger)
+            messenger.msgs.append(bytearray(msg + hab.makeOwnEvent(sn=0)))
+            run([pool, messenger], until=lambda: messenger.posted and messenger.idle)
+            assert messenger.posted == 2
+            assert len(messenger.sent) == 2
+            assert [request["body"] for request in RecordingHandler.requests] == [hab.kever.serder.raw] * 2
+            assert "CESR-ATTACHMENT" in RecordingHandler.requests[0]["headers"]
+            assert "Connection" not in RecordingHandler.requests[0]["headers"]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
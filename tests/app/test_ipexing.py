@@ -856,7 +856,8 @@ def test_multisig_grant_admit(seeder, helpers):
 def test_granter(helpers):
     with helpers.openKeria() as (agency, agent, app, client):
         grants = decking.Deck()
-        granter = agenting.Granter(hby=agent.hby, rgy=agent.rgy, agentHab=agent.agentHab, exc=agent.exc, grants=grants)
+        granter = agenting.Granter(hby=agent.hby, rgy=agent.rgy, agentHab=agent.agentHab, exc=agent.exc, grants=grants,
+                                   pool=agency.pool, waiter=agent.waiter)
 
         tock = 0.03125
         limit = 1.0
@@ -871,4 +872,9 @@ def test_granter(helpers):
 
         doist.recur(deeds=deeds)
 
-        assert len(grants) == 1
+        # Grants of incomplete exchanges wait until the exchange is saved
+        assert len(grants) == 0
+        assert agent.waiter.waiting[said][0][1] == msg
+
+        agent.waiter.complete(said=said)
+        assert list(grants) == [msg]
@@ -0,0 +1,151 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.serving module
+
+Testing ASGI serving of the falcon apps
+"""
+import asyncio
+import http.client
+import json
+import socket
+import sys
+import threading
+
+import falcon
+import pytest
+from hio.base import doing
+from keri import kering
+
+from keria.app import serving
+
+
+class EchoEnd:
+
+    @staticmethod
+    def on_post(req, rep):
+        rep.status = falcon.HTTP_201
+        rep.set_header("Signify-Resource", "EAgent")
+        rep.data = json.dumps(dict(body=req.get_media(), q=req.params.get("q"),
+                                   auth=req.get_header("Authorization"))).encode("utf-8")
+
+    @staticmethod
+    def on_get(req, rep):
+        rep.status = falcon.HTTP_200
+        rep.stream = iter([b"", b"one", b"", b"", b"two"])
+
+
+def call(app, method, path, query=b"", headers=None, body=b"", disconnect=False):
+    """ Run a single request through WsgiBridge and return the ASGI messages sent """
+    scope = dict(type="http", method=method, path=path, query_string=query, http_version="1.1", scheme="http",
+                 server=("127.0.0.1", 3901), client=("127.0.0.1", 50000), headers=headers or [])
+    requests = [dict(type="http.request", body=body[:4], more_body=True),
+                dict(type="http.request", body=body[4:], more_body=False)]
+    sent = []
+
+    async def receive():
+        if requests:
+            return requests.pop(0)
+        if disconnect:
+            return dict(type="http.disconnect")
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    async def serve():
+        bridge = serving.WsgiBridge(app)
+        task = asyncio.ensure_future(bridge(scope, receive, send))
+        while not task.done():
+            bridge.process()
+            await asyncio.sleep(0)
+        await task
+
+    asyncio.run(serve())
+    return sent
+
+
+def test_wsgi_bridge():
+    app = falcon.App()
+    app.add_route("/echo", EchoEnd())
+
+    sent = call(app, "POST", "/echo", query=b"q=1", body=b'{"a": "b"}',
+                headers=[(b"content-type", b"application/json"), (b"authorization", b"Signature x")])
+    start, *bodies = sent
+    assert start["type"] == "http.response.start"
+    assert start["status"] == 201
+    assert (b"signify-resource", b"EAgent") in start["headers"]
+    assert json.loads(b"".join(body["body"] for body in bodies)) == dict(body=dict(a="b"), q="1", auth="Signature x")
+    assert bodies[-1]["more_body"] is False
+
+    # Empty chunks of streamed bodies are skipped
+    sent = call(app, "GET", "/echo")
+    assert [message["type"] for message in sent] == ["http.response.start", "http.response.body",
+                                                     "http.response.body", "http.response.body"]
+    assert [message["body"] for message in sent[1:]] == [b"one", b"two", b""]
+
+    sent = call(app, "GET", "/missing")
+    assert sent[0]["status"] == 404
+
+    # Streams stop when the client disconnects
+    sent = call(app, "GET", "/echo", disconnect=True)
+    assert len(sent) <= 2
+
+
+def test_asgi_server_doer(monkeypatch):
+    monkeypatch.setitem(sys.modules, "uvicorn", None)
+    with pytest.raises(kering.ConfigurationError):
+        serving.AsgiServerDoer(app=falcon.App(), port=5632)
+
+
+def test_asgi_server_doer_uvicorn():
+    pytest.importorskip("uvicorn")
+
+    app = falcon.App()
+    app.add_route("/echo", EchoEnd())
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    ticks = []
+
+    class Ticker(doing.Doer):
+        def recur(self, tyme):
+            ticks.append(tyme)
+            return False
+
+    server = serving.AsgiServerDoer(app=app, port=port, host="127.0.0.1")
+    doist = doing.Doist(doers=[server, Ticker()], limit=10.0, tock=0.01, real=True)
+    doist.enter()
+
+    responses = []
+
+    def client():
+        for _ in range(3):
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("POST", "/echo?q=1", body=b'{"a": "b"}', headers={"Content-Type": "application/json"})
+            rep = conn.getresponse()
+            responses.append((rep.status, rep.getheader("Signify-Resource"), json.loads(rep.read())))
+            conn.request("GET", "/echo")
+            rep = conn.getresponse()
+            responses.append((rep.status, None, rep.read()))
+            conn.close()
+
+    try:
+        # The server socket only listens once the event loop has been stepped
+        while server.server.started is False and doist.tyme < doist.limit:
+            doist.recur()
+
+        thread = threading.Thread(target=client, daemon=True)
+        thread.start()
+        while thread.is_alive() and doist.tyme < doist.limit:
+            doist.recur()
+        thread.join(timeout=1)
+    finally:
+        doist.exit()
+
+    assert responses == [(201, "EAgent", dict(body=dict(a="b"), q="1", auth=None)), (200, None, b"onetwo")] * 3
+    assert not server.bridge.pending
+    # hio doers kept running while requests were being served
+    assert len(ticks) > 1
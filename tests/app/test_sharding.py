@@ -0,0 +1,157 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.sharding module
+
+Testing sharding of agents over worker processes
+"""
+import json
+import threading
+from wsgiref import simple_server
+
+import falcon
+from falcon import testing
+from keri.core import coring
+
+from keria.app import sharding
+from keria.app.indirecting import CESR_DESTINATION_HEADER
+from keria.db import basing
+
+
+def test_hash_ring():
+    caids = [coring.Diger(ser=f"controller-{i}".encode("utf-8")).qb64 for i in range(1000)]
+
+    ring = sharding.HashRing(4)
+    owners = [ring.shard(caid) for caid in caids]
+    assert owners == [sharding.HashRing(4).shard(caid) for caid in caids]
+    for shard in range(4):
+        assert 150 < owners.count(shard) < 350
+
+    # Adding a shard only moves controllers onto the new shard
+    grown = sharding.HashRing(5)
+    moved = [(owner, grown.shard(caid)) for caid, owner in zip(caids, owners) if grown.shard(caid) != owner]
+    assert all(shard == 4 for _, shard in moved)
+    assert 100 < len(moved) < 300
+
+    assert sharding.ports(5900, 2) == dict(admin=5906, http=5907, boot=5908)
+
+
+def test_router():
+    adb = basing.AgencyBaser(name="TheAgency", temp=True, reopen=True)
+    caid = "EM1U6zJ7TEI2oPU2rY44v4BnvRSCvqA6nFKg2hAc0XYg"
+    pre = "EAo9uERzWmPLTd7h0pG1KeLTIlUf2SgTTgwnk-MquV_v"
+    adb.aids.pin(keys=(pre,), val=coring.Prefixer(qb64=caid))
+
+    router = sharding.Router(adb=adb, shards=3, shardPort=5950)
+
+    req = testing.create_req(path="/identifiers", headers={"Signify-Resource": caid})
+    assert router.caid("admin", req, b"") == caid
+    req = testing.create_req(path=f"/agent/{caid}")
+    assert router.caid("admin", req, b"") == caid
+    req = testing.create_req(path="/health")
+    assert router.caid("boot", req, b"") is None
+    assert router.shard("boot", req, b"") == 0
+    assert router.caid("boot", req, json.dumps(dict(icp=dict(i=caid))).encode("utf-8")) == caid
+
+    # Managed AIDs are mapped to their controller
+    req = testing.create_req(path="/", headers={CESR_DESTINATION_HEADER: pre})
+    assert router.caid("http", req, b"") == caid
+    req = testing.create_req(path=f"/oobi/{pre}/controller")
+    assert router.caid("http", req, b"") == caid
+    assert router.shard("http", req, b"") == router.ring.shard(caid)
+
+    adb.close(clear=True)
+
+
+def test_shard_error():
+    class NotOwnedEnd:
+        @staticmethod
+        def on_get(req, rep):
+            raise sharding.ShardError("agent for controller is served by another shard")
+
+    app = falcon.App()
+    app.add_error_handler(sharding.ShardError, sharding.onShardError)
+    app.add_route("/identifiers", NotOwnedEnd())
+
+    client = testing.TestClient(app)
+    res = client.simulate_get("/identifiers")
+    assert res.status_code == 503
+    assert res.headers["retry-after"] == "1"
+    assert res.json["description"] == "agent for controller is served by another shard"
+
+
+def test_supervisor_handoff():
+    class Proc:
+        @staticmethod
+        def is_alive():
+            return True
+
+    supervisor = sharding.Supervisor(name="agency", base="", bran=None, workers=2, admin=5901, http=5902, boot=5903,
+                                     shardPort=5950)
+    supervisor.spawn = lambda shard: Proc()
+    supervisor.procs = [Proc(), Proc()]
+    supervisor.adb = basing.AgencyBaser(name="TheAgency", temp=True, reopen=True)
+    supervisor.adb.shrd.pin(keys=("count",), val="2")
+    supervisor.router = sharding.Router(adb=supervisor.adb, shards=2, shardPort=5950)
+    try:
+        assert supervisor.complete() is False
+
+        # Routes only switch over once every previous shard has hibernated the agents moving away
+        supervisor.add()
+        assert supervisor.handoff == 3
+        assert sharding.nextShardCount(supervisor.adb) == 3
+        assert sharding.shardCount(supervisor.adb) == 2
+
+        sharding.acknowledge(supervisor.adb, 0, 3)
+        assert supervisor.complete() is False
+        assert supervisor.router.ring.shards == 2
+
+        sharding.acknowledge(supervisor.adb, 1, 3)
+        assert supervisor.complete() is True
+        assert supervisor.handoff is None
+        assert sharding.nextShardCount(supervisor.adb) is None
+        assert sharding.shardCount(supervisor.adb) == 3
+        assert supervisor.router.ring.shards == 3
+
+        # Acknowledgements of earlier handoffs do not count towards the next one
+        supervisor.add()
+        assert not sharding.handedOff(supervisor.adb, 3, 4)
+    finally:
+        supervisor.adb.close(clear=True)
+
+
+def test_router_forward():
+    class EchoEnd:
+        @staticmethod
+        def on_post(req, rep):
+            rep.status = falcon.HTTP_202
+            rep.set_header("Signify-Resource", "EAgent")
+            rep.data = json.dumps(dict(path=req.path, q=req.params.get("q"), body=req.get_media(),
+                                       resource=req.get_header("Signify-Resource"))).encode("utf-8")
+
+    worker = falcon.App()
+    worker.add_sink(lambda req, rep: EchoEnd.on_post(req, rep), prefix="/")
+    server = simple_server.make_server("127.0.0.1", 5960, worker, server_class=sharding.ThreadingWSGIServer,
+                                       handler_class=sharding.QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    adb = basing.AgencyBaser(name="TheAgency", temp=True, reopen=True)
+    try:
+        router = sharding.Router(adb=adb, shards=1, shardPort=5960)
+        client = testing.TestClient(router.app("admin"))
+
+        res = client.simulate_post("/identifiers/aid", params=dict(q="1"), json=dict(a="b"),
+                                   headers={"Signify-Resource": "ECaid"})
+        assert res.status_code == 202
+        assert res.headers["Signify-Resource"] == "EAgent"
+        assert res.json == dict(path="/identifiers/aid", q="1", body=dict(a="b"), resource="ECaid")
+
+        # Unavailable workers are reported as bad gateway
+        router.shardPort = 5970
+        res = client.simulate_post("/identifiers", json=dict(a="b"))
+        assert res.status_code == 502
+    finally:
+        server.shutdown()
+        server.server_close()
+        adb.close(clear=True)
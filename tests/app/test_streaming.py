@@ -0,0 +1,118 @@
+# -*- encoding: utf-8 -*-
+"""
+KERIA
+keria.app.streaming module
+
+Testing the agent event stream
+"""
+import json
+
+from keria.app import streaming
+from keria.core import longrunning
+
+
+def test_load_ends(helpers):
+    with helpers.openKeria() as (agency, agent, app, client):
+        streaming.loadEnds(app=app)
+        assert app._router is not None
+
+        (end, *_) = app._router.find("/stream")
+        assert isinstance(end, streaming.StreamEnd)
+
+
+def test_streamer(helpers, monkeypatch):
+    with helpers.openKeria() as (agency, agent, app, client):
+        streamer = agent.streamer
+
+        # Nothing is examined while no stream is open
+        agent.monitor.submit("seeded", longrunning.OpTypes.done, metadata=dict(response=dict(seeded=True)))
+        streamer.recur()
+        assert streamer.active is False
+        assert streamer.stamp is None
+
+        # Existing state is seeded without events when the first stream opens
+        body = streaming.StreamIterable(streamer=streamer)
+        assert streamer.active is True
+        assert streamer.eid == 0
+        assert streamer.since(0) == []
+
+        it = iter(body)
+        assert next(it) == b"retry: 5000\n\n"
+        assert next(it) == b""
+
+        # Completed operations, new notifications and key state changes become events
+        agent.monitor.submit("test", longrunning.OpTypes.done, metadata=dict(response=dict(test=True)))
+        assert agent.notifier.add(attrs=dict(r="/test", a=dict(test=True))) is True
+        agent.agentHab.interact()
+        streamer.recur()
+
+        events = streamer.since(0)
+        assert [(eid, event) for eid, event, _ in events] == [(1, "operation"), (2, "notification"), (3, "state")]
+        assert json.loads(events[0][2])["name"] == "done.test"
+        assert json.loads(events[0][2])["response"] == dict(test=True)
+        assert json.loads(events[1][2])["a"] == dict(r="/test", a=dict(test=True))
+        assert json.loads(events[2][2]) == dict(i=agent.agentHab.pre, s="1", d=agent.agentHab.kever.serder.said)
+
+        data = next(it)
+        assert data.startswith(b"id: 1\nevent: operation\ndata: ")
+        assert b"id: 3\nevent: state\ndata: " in data
+        assert next(it) == b""
+
+        # Nothing changed, no new events
+        streamer.recur()
+        assert streamer.eid == 3
+
+        # Changes made while no stream is open become events when the next stream opens
+        body.close()
+        assert streamer.active is False
+        agent.agentHab.interact()
+        streamer.recur()
+        assert streamer.eid == 3
+
+        body = streaming.StreamIterable(streamer=streamer, eid=3)
+        assert [(eid, event) for eid, event, _ in streamer.since(3)] == [(4, "state")]
+        assert json.loads(streamer.since(3)[0][2])["s"] == "2"
+
+        # Streams the server dropped without closing expire
+        streamer.subscribers[body] -= streamer.Lease + 1
+        assert streamer.active is False
+
+        # Resume after a previous event and after an event not logged yet
+        assert [eid for eid, *_ in streamer.since(2)] == [3, 4]
+        body = streaming.StreamIterable(streamer=streamer, eid=99)
+        assert body.eid == 4
+
+        # The log survives the Streamer, a reloaded Agent continues the event IDs and picks up where it left off
+        body.close()
+        agent.agentHab.interact()
+        reloaded = streaming.Streamer(hby=agent.hby, monitor=agent.monitor, notifier=agent.notifier, log=streamer.log)
+        assert reloaded.eid == 4
+        assert [eid for eid, *_ in reloaded.since(2)] == [3, 4]
+
+        body = streaming.StreamIterable(streamer=reloaded, eid=4)
+        assert [(eid, event) for eid, event, _ in reloaded.since(4)] == [(5, "state")]
+        assert json.loads(reloaded.since(4)[0][2])["s"] == "3"
+        body.close()
+
+        # The log only holds the last MaxEvents events
+        monkeypatch.setattr(streaming.Streamer, "MaxEvents", 2)
+        reloaded.push("notification", dict(test=True))
+        assert [eid for eid, *_ in reloaded.since(0)] == [5, 6]
+
+
+def test_stream_end(helpers, monkeypatch):
+    with helpers.openKeria() as (agency, agent, app, client):
+        streaming.loadEnds(app=app)
+        monkeypatch.setattr(streaming.StreamIterable, "Timeout", 0.05)
+
+        res = client.simulate_get(path="/stream", headers={"Last-Event-ID": "last"})
+        assert res.status_code == 400
+
+        streaming.StreamIterable(streamer=agent.streamer)
+        assert agent.notifier.add(attrs=dict(r="/test", a=dict(test=True))) is True
+        agent.streamer.recur()
+
+        res = client.simulate_get(path="/stream", headers={"Last-Event-ID": "0"})
+        assert res.status_code == 200
+        assert res.headers["Content-Type"] == "text/event-stream"
+        assert res.text.startswith("retry: 5000\n\nid: 1\nevent: notification\ndata: ")
@@ -99,6 +99,93 @@ def test_authenticater(mockHelpingNowUTC):
             authn.verify(req)
 
 
+def test_authenticater_cache(monkeypatch, mockHelpingNowUTC):
+    salt = b'0123456789abcdef'
+    with habbing.openHab(name="caid", salt=salt, temp=True) as (controllerHby, controller):
+
+        agency = agenting.Agency(name="agency", base='', bran=None, temp=True)
+        authn = authing.Authenticater(agency=agency, skew=60.0)
+
+        doist = doing.Doist(limit=1.0, tock=0.03125, real=True)
+        doist.enter(doers=[agency])
+
+        agent = agency.create(caid=controller.pre)
+        agentKev = eventing.Kevery(db=agent.agentHab.db, lax=True, local=False)
+        icp = controller.makeOwnInception()
+        parsing.Parser().parse(ims=bytearray(icp), kvy=agentKev)
+
+        def signed(path, timestamp):
+            headers = Hict([
+                ("Content-Type", "application/json"),
+                ("Signify-Resource", controller.pre),
+                ("Signify-Timestamp", timestamp),
+            ])
+            header, qsig = ending.siginput("signify", "GET", path, headers, fields=authn.DefaultFields,
+                                           hab=controller, alg="ed25519", keyid=controller.pre)
+            headers.extend(header)
+            signage = ending.Signage(markers=dict(signify=qsig), indexed=False, signer=None, ordinal=None,
+                                     digest=None, kind=None)
+            headers.extend(ending.signature([signage]))
+            return dict(headers)
+
+        # Requests without a signify signature input are rejected before their timestamp or controller are checked
+        class Unreachable:
+            def get(self, caid=None):
+                raise AssertionError("agent looked up for a request without valid signature headers")
+
+        checker = authing.Authenticater(agency=Unreachable(), skew=60.0)
+        headers = signed("/identifiers", "2022-09-24T00:05:48.196795+00:00")
+        headers["Signature-Input"] = headers["Signature-Input"].replace("signify=", "other=")
+        req = testing.create_req(method="GET", path="/identifiers", headers=headers)
+        assert checker.verify(req) is False
+
+        # Stale timestamps are rejected before the controller is looked up
+        headers = signed("/identifiers", "2022-09-24T00:05:48.196795+00:00")
+        req = testing.create_req(method="GET", path="/identifiers", headers=headers)
+        with pytest.raises(kering.AuthNError):
+            checker.verify(req)
+
+        # Stale timestamps are rejected before any signature verification
+        headers = signed("/identifiers", "2022-09-24T00:05:48.196795+00:00")
+        req = testing.create_req(method="GET", path="/identifiers", headers=headers)
+        with pytest.raises(kering.AuthNError):
+            authn.verify(req)
+
+        headers = signed("/identifiers", "not a timestamp")
+        req = testing.create_req(method="GET", path="/identifiers", headers=headers)
+        with pytest.raises(kering.AuthNError):
+            authn.verify(req)
+        assert len(authn.verified) == 0
+
+        headers = signed("/identifiers", "2020-12-31T23:59:30.000000+00:00")
+        req = testing.create_req(method="GET", path="/identifiers", headers=headers)
+        assert authn.verify(req)
+        assert len(authn.verified) == 1
+
+        # Identical retry is served from the cache without verifying the signature
+        def fail(_):
+            raise AssertionError("signature verified for cached request")
+
+        with monkeypatch.context() as m:
+            m.setattr(authing.ending, "designature", fail)
+            req = testing.create_req(method="GET", path="/identifiers", headers=headers)
+            assert authn.verify(req)
+
+        # Same signature replayed against a different path is verified and rejected
+        req = testing.create_req(method="GET", path="/operations", headers=headers)
+        with pytest.raises(kering.AuthNError):
+            authn.verify(req)
+
+        # Cache is bounded
+        authn.size = 1
+        headers = signed("/operations", "2021-01-01T00:00:00.000000+00:00")
+        req = testing.create_req(method="GET", path="/operations", headers=headers)
+        assert authn.verify(req)
+        assert len(authn.verified) == 1
+        (key, _), = authn.verified.items()
+        assert key[3] == "/operations"
+
+
 class MockAgency:
     def __init__(self, agent=None):
         self.agent = agent
@@ -1,8 +1,15 @@
+import json
+import time
+
+import pytest
+from keri.app.oobiing import Result
+from keri.db import basing
 from keri.help import helping
 
 from keria.app import aiding
 from keri.kering import ValidationError
 from keria.core import longrunning
+from keria.db import basing as keriabasing
 
 
 def test_operations(helpers):
@@ -208,3 +215,150 @@ def test_error(helpers):
         assert res.status_code == 404
         assert res.json == {'title': 'long running operation '
                                      "'query.EBfdlu8R27Fbx-ehrqwImnK-8Cm79sqbAQ4MmvEAYqao' not found"}
+
+
+def test_operation_wait(helpers, monkeypatch):
+    with helpers.openKeria() as (agency, agent, app, client):
+        opResEnd = longrunning.OperationResourceEnd()
+        app.add_route("/operations/{name}", opResEnd)
+
+        url = "http://127.0.0.1:5642/oobi"
+        op = agent.monitor.submit("wit", longrunning.OpTypes.oobi, metadata=dict(oobi=url))
+        assert op.done is False
+
+        res = client.simulate_get(path=f"/operations/{op.name}", params=dict(wait="soon"))
+        assert res.status_code == 400
+
+        # Unfinished operation is returned as is once the wait elapses
+        start = time.perf_counter()
+        res = client.simulate_get(path=f"/operations/{op.name}", params=dict(wait="0.1"))
+        assert res.status_code == 200
+        assert res.json["done"] is False
+        assert time.perf_counter() - start >= 0.1
+
+        # Status is only recalculated when one of the databases operations complete in is written to
+        stamp = agent.monitor.stamp()
+        stamps = []
+        monkeypatch.setattr(agent.monitor, "stamp", lambda: stamps.append(None) or stamp)
+        body = longrunning.OperationIterable(monitor=agent.monitor, name=op.name, operation=op, wait=10.0)
+        it = iter(body)
+        assert next(it) == b""
+        assert next(it) == b""
+        assert len(stamps) == 1  # checked once on creation, then not before the backoff elapses
+
+        # Unchanged stamps back off exponentially
+        body.check = 0.0
+        assert next(it) == b""
+        assert len(stamps) == 2
+        assert body.backoff == 2 * body.MinBackoff
+        body.backoff = body.MaxBackoff
+        body.check = 0.0
+        assert next(it) == b""
+        assert body.backoff == body.MaxBackoff
+        monkeypatch.undo()
+
+        agent.hby.db.roobi.pin(keys=(url,), val=basing.OobiRecord(date=helping.nowIso8601(), state=Result.resolved))
+        assert agent.monitor.stamp() != stamp
+        assert next(it) == b""
+
+        body.check = 0.0
+        data = next(it)
+        assert body.backoff == body.MinBackoff
+        operation = json.loads(data)
+        assert operation["done"] is True
+        assert operation["response"] == dict(oobi=url)
+        with pytest.raises(StopIteration):
+            next(it)
+
+        # Done operations are returned immediately
+        res = client.simulate_get(path=f"/operations/{op.name}", params=dict(wait="30"))
+        assert res.status_code == 200
+        assert res.json["done"] is True
+
+
+def test_operation_index(helpers):
+    with helpers.openKeria() as (agency, agent, app, client):
+        monitor = agent.monitor
+
+        url = "http://127.0.0.1:5642/oobi"
+        pending = monitor.submit("wit", longrunning.OpTypes.oobi, metadata=dict(oobi=url))
+        done = monitor.submit("aid", longrunning.OpTypes.done, metadata=dict(response=dict(d="aid")))
+        assert pending.done is False
+        assert done.done is True
+
+        assert list(monitor.names(done=False)) == ["oobi.wit"]
+        assert list(monitor.names(done=True)) == ["done.aid"]
+        assert list(monitor.names(done=True, type=longrunning.OpTypes.oobi)) == []
+        assert monitor.opr.rets.get(keys=("done.aid",)) == done
+
+        # Only pending operations have their status calculated
+        calls = []
+        status = monitor.status
+
+        def counting(op):
+            calls.append(op.oid)
+            return status(op)
+
+        monitor.status = counting
+        ops = monitor.getOperations()
+        assert [op.name for op in ops] == ["done.aid", "oobi.wit"]
+        assert calls == ["wit"]
+
+        ops = monitor.getOperations(type=longrunning.OpTypes.done)
+        assert [op.name for op in ops] == ["done.aid"]
+        assert calls == ["wit"]
+
+        # Completing moves the operation to the done index with its terminal status
+        agent.hby.db.roobi.pin(keys=(url,), val=basing.OobiRecord(date=helping.nowIso8601(), state=Result.resolved))
+        operation = monitor.get("oobi.wit")
+        assert operation.done is True
+        assert list(monitor.names(done=False)) == []
+        assert list(monitor.names(done=True)) == ["done.aid", "oobi.wit"]
+
+        calls.clear()
+        assert monitor.get("oobi.wit") == operation
+        assert [op.name for op in monitor.getOperations()] == ["done.aid", "oobi.wit"]
+        assert calls == []
+
+        # Submitting again resets the operation to pending
+        agent.hby.db.roobi.rem(keys=(url,))
+        operation = monitor.submit("wit", longrunning.OpTypes.oobi, metadata=dict(oobi=url))
+        assert operation.done is False
+        assert list(monitor.names(done=False)) == ["oobi.wit"]
+        assert monitor.opr.rets.get(keys=("oobi.wit",)) is None
+
+        assert monitor.rem("oobi.wit") is True
+        assert monitor.rem("done.aid") is True
+        assert list(monitor.names(done=False)) == []
+        assert list(monitor.names(done=True)) == []
+        assert monitor.getOperations() == []
+
+
+def test_operation_sweep(helpers):
+    with helpers.openKeria() as (agency, agent, app, client):
+        monitor = agent.monitor
+
+        url = "http://127.0.0.1:5642/oobi"
+        monitor.submit("wit", longrunning.OpTypes.oobi, metadata=dict(oobi=url))
+        for i in range(5):
+            monitor.submit(f"aid{i}", longrunning.OpTypes.done, metadata=dict(response=dict(i=i)))
+
+        assert [name for _, name in keriabasing.seekItemIter(monitor.opr.opds)] == [f"done.aid{i}" for i in range(5)]
+
+        # Nothing is past its retention
+        assert monitor.sweep() == 0
+        assert monitor.sweep(ttl=3600, maxOps=6) == 0
+
+        # Oldest completed operations are removed first, at most limit per sweep
+        assert monitor.sweep(maxOps=2, limit=2) == 2
+        assert list(monitor.names(done=True)) == ["done.aid2", "done.aid3", "done.aid4"]
+        assert monitor.get("done.aid0") is None
+
+        # Completed operations expire, pending ones never do
+        assert monitor.sweep(ttl=0) == 3
+        assert list(monitor.names(done=True)) == []
+        assert list(monitor.names(done=False)) == ["oobi.wit"]
+        assert [name for _, name in keriabasing.seekItemIter(monitor.opr.opds)] == []
+
+        assert monitor.sweep(ttl=0, maxOps=0) == 0
+        assert monitor.get("oobi.wit").done is False
@@ -79,3 +79,57 @@ def test_oobi_end(helpers):
         res = client.simulate_get(path=f"/oobi/{pre}/agent/{agent.agentHab.pre}")
         assert res.status_code == 200
         assert res.headers['Content-Type'] == "application/json+cesr"
+
+
+def test_oobi_end_cache(helpers, monkeypatch):
+    with helpers.openKeria() as (agency, agent, app, client):
+        ending.loadEnds(app=app, agency=agency)
+        app.add_route("/identifiers", aiding.IdentifierCollectionEnd())
+        app.add_route("/identifiers/{name}/endroles", aiding.EndRoleCollectionEnd())
+
+        salt = b'0123456789abcdef'
+        op = helpers.createAid(client, "aid1", salt)
+        pre = op["response"]['i']
+
+        res = client.simulate_get(path=f"/oobi/{pre}")
+        assert res.status_code == 200
+        etag = res.headers["ETag"]
+        data = res.content
+
+        # Cached responses are not rebuilt
+        hab = agent.hby.habs[pre]
+        calls = []
+        replyToOobi = hab.replyToOobi
+        monkeypatch.setattr(hab, "replyToOobi", lambda **kwa: calls.append(kwa) or replyToOobi(**kwa))
+
+        res = client.simulate_get(path=f"/oobi/{pre}")
+        assert res.status_code == 200
+        assert res.headers["ETag"] == etag
+        assert res.content == data
+        assert calls == []
+
+        res = client.simulate_get(path=f"/oobi/{pre}", headers={"If-None-Match": etag})
+        assert res.status_code == 304
+        assert res.content == b""
+
+        res = client.simulate_get(path=f"/oobi/{pre}", headers={"If-None-Match": '"other"'})
+        assert res.status_code == 200
+        assert res.content == data
+
+        # End role changes invalidate cached responses
+        rpy = helpers.endrole(pre, agent.agentHab.pre)
+        sigs = helpers.sign(salt, 0, 0, rpy.raw)
+        res = client.simulate_post(path=f"/identifiers/aid1/endroles", json=dict(rpy=rpy.ked, sigs=sigs))
+        assert res.status_code == 202
+
+        res = client.simulate_get(path=f"/oobi/{pre}", headers={"If-None-Match": etag})
+        assert res.status_code == 200
+        assert res.headers["ETag"] != etag
+        assert len(calls) == 1
+
+        # Least recently used responses are evicted
+        monkeypatch.setattr(ending.OOBIEnd, "MaxEntries", 1)
+        res = client.simulate_get(path=f"/oobi/{pre}/agent/{agent.agentHab.pre}")
+        assert res.status_code == 200
+        (end, *_) = app._router.find("/oobi/AID")
+        assert list(end.cache.keys()) == [(pre, "agent", agent.agentHab.pre)]